@@ -0,0 +1,27 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Continious Discipliner
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The discipliner (gpsdro.discipline) and its support modules, started by
+# gpsdro-symmetricom.py.  Nothing is imported here on purpose, every module
+# is pulled in only by the code that needs it so the MicroPython boards
+# don't pay for what they don't use.
+#
@@ -0,0 +1,335 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Asyncio Serial Transport
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Non-blocking version of gpsdro.transport.SerialTransport, for asyncio on
+# Linux and uasyncio on MicroPython.
+#
+# The transport talks to a port with any() (bytes waiting), readinto(),
+# write() and "await wait(seconds)" (until more may have arrived or the
+# time is up):
+#
+#   TtyPort   -- CPython, a tty read from the event loop with add_reader,
+#                no pyserial needed
+#   UartPort  -- MicroPython, a machine.UART polled with any()
+#
+# Lines are put together by the blocking transport's LineBuffer, so they
+# end at a CR or LF and a part line before the idle gap counts as a line
+# the same way, in the same preallocated buffers.  Only what is already
+# waiting is read, and the buffer keeps the part of a line that was in
+# across a wait, so a timeout in the middle of a line never loses it.  The
+# same ResponseFramer and LatencyStats as the blocking one hand a response
+# back the moment its last line is in.
+#
+#   transport = await AsyncTransport.open("/dev/ttyS4", 57600)
+#   lines = await transport.query("j")
+#
+#   transport = AsyncTransport(UartPort(machine.UART(0, 57600)))
+#
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+from gpsdro.transport import LineBuffer, ResponseFramer, LatencyStats, ticks_us, ticks_diff
+from gpsdro.transport import FRAME_TIMEOUT, FRAME_IDLE
+
+# Seconds between looks at a UART that can't wake the event loop itself
+AIO_POLL			= 0.002
+
+# Most bytes taken from a tty in one read
+AIO_CHUNK			= 1024
+
+
+#
+# Sleep on the event loop, microseconds like the clocks
+#
+async def sleep_us( micros ):
+    await asyncio.sleep(micros / 1000000);
+
+
+#
+# A tty on CPython.  The event loop calls on_readable() when there is data
+# and it is read straight away, wait() just waits for that.
+#
+class TtyPort:
+
+    def __init__( self, fd ):
+        self.fd = fd;
+        self.data = bytearray();
+        self.event = asyncio.Event();
+        self.loop = asyncio.get_event_loop();
+        self.loop.add_reader(fd, self.on_readable);
+
+    #
+    # Open and configure a tty, raw 8N1 at the given baud rate
+    #
+    @classmethod
+    def open( cls, path, baudrate=57600 ):
+        import os, termios, tty
+
+        fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK);
+        tty.setraw(fd);
+        attrs = termios.tcgetattr(fd);
+        speed = getattr(termios, "B" + str(baudrate));
+        attrs[4] = speed;
+        attrs[5] = speed;
+        termios.tcsetattr(fd, termios.TCSANOW, attrs);
+        return cls(fd);
+
+    def on_readable( self ):
+        import os
+        try:
+            data = os.read(self.fd, AIO_CHUNK);
+        except (BlockingIOError, InterruptedError):
+            return;
+        except OSError:
+            # The other end went away, stop the loop calling back
+            self.loop.remove_reader(self.fd);
+            data = b"";
+        if ( data ):
+            self.data += data;
+        self.event.set();
+
+    def any( self ):
+        return len(self.data);
+
+    def readinto( self, buffer ):
+        count = min(len(buffer), len(self.data));
+        buffer[:count] = self.data[:count];
+        del self.data[:count];
+        return count;
+
+    def write( self, data ):
+        import os
+        view = memoryview(data);
+        while ( len(view) ):
+            try:
+                view = view[os.write(self.fd, view):];
+            except BlockingIOError:
+                pass;
+
+    async def wait( self, seconds ):
+        if ( len(self.data) ):
+            return;
+        self.event.clear();
+        try:
+            await asyncio.wait_for(self.event.wait(), seconds);
+        except asyncio.TimeoutError:
+            pass;
+
+    def close( self ):
+        import os
+        self.loop.remove_reader(self.fd);
+        os.close(self.fd);
+
+
+#
+# A machine.UART on MicroPython, or anything else with any(), readinto()
+# and write().  Nothing tells the event loop data came in so it is polled.
+#
+class UartPort:
+
+    def __init__( self, uart, poll=AIO_POLL ):
+        self.uart = uart;
+        self.poll = poll;
+
+    def any( self ):
+        return self.uart.any();
+
+    def readinto( self, buffer ):
+        return self.uart.readinto(buffer) or 0;
+
+    def write( self, data ):
+        self.uart.write(data);
+
+    async def wait( self, seconds ):
+        startTick = ticks_us();
+        while ( not self.uart.any() ):
+            remaining = seconds - (ticks_diff(ticks_us(), startTick) / 1000000);
+            if ( remaining <= 0 ):
+                return;
+            await asyncio.sleep(min(remaining, self.poll));
+
+    def close( self ):
+        pass;
+
+
+class AsyncTransport:
+
+    def __init__( self, port, framer=None, stats=None, timeout=FRAME_TIMEOUT, idle=FRAME_IDLE ):
+        self.port = port;
+        self.framer = framer or ResponseFramer();
+        self.stats = stats or LatencyStats();
+        self.timeout = int(timeout * 1000000);
+        self.idle = idle;
+        self.pipeline = True;
+        self.lock = asyncio.Lock();
+        self.buffer = LineBuffer(port);
+        # When the last byte came in, for the idle gap
+        self.lastTick = 0;
+
+    #
+    # A tty at the given baud rate, opened on the running event loop
+    #
+    @classmethod
+    async def open( cls, path, baudrate=57600, **kwargs ):
+        return cls(TtyPort.open(path, baudrate), **kwargs);
+
+    def close( self ):
+        self.port.close();
+
+    #
+    # Drop anything left over from a previous command so it can't be taken
+    # as part of the next response
+    #
+    def discard( self ):
+        self.buffer.drain();
+        self.lastTick = 0;
+
+    #
+    # Returns a line, upper cased and stripped, or None after waiting
+    # "wait" seconds for one.  A part line stays in the buffer for the next
+    # call, unless the port then goes quiet for the idle gap.
+    #
+    async def readline( self, wait ):
+        buffer = self.buffer;
+        startTick = ticks_us();
+        while True:
+            length = buffer.scan();
+            if ( not length ):
+                if ( buffer.fill(False) ):
+                    self.lastTick = ticks_us();
+                    continue;
+                remaining = wait - (ticks_diff(ticks_us(), startTick) / 1000000);
+                quiet = self.idle - (ticks_diff(ticks_us(), self.lastTick) / 1000000);
+                if ( buffer.length and (quiet <= 0) ):
+                    length = buffer.take();
+                else:
+                    if ( buffer.length ):
+                        remaining = min(remaining, quiet);
+                    if ( remaining <= 0 ):
+                        return None;
+                    await self.port.wait(remaining);
+                    continue;
+            try:
+                return buffer.text(length);
+            except:
+                continue;
+
+    #
+    # Next non-empty response line, "" on the idle gap and None once the
+    # deadline has passed
+    #
+    async def next_line( self, sentTick, timeout, idle ):
+        while True:
+            remaining = timeout - ticks_diff(ticks_us(), sentTick);
+            if ( remaining <= 0 ):
+                return None;
+            wait = remaining / 1000000;
+            if ( idle ):
+                wait = min(wait, self.idle);
+            line = await self.readline(wait);
+            if ( line is None ):
+                if ( idle ):
+                    return "";
+                continue;
+            if ( len(line) ):
+                return line;
+
+    async def query( self, cmd ):
+        async with self.lock:
+            return await self.query_locked(cmd);
+
+    async def query_locked( self, cmd ):
+        self.discard();
+        sentTick = ticks_us();
+        self.port.write(cmd.encode());
+
+        lines = [];
+        marker = self.framer.marker(cmd);
+        if ( marker == "" ):
+            self.stats.record(cmd, ticks_diff(ticks_us(), sentTick));
+            return lines;
+
+        complete = False;
+        while True:
+            line = await self.next_line(sentTick, self.timeout, (marker is None) and len(lines));
+            if ( not line ):
+                break;
+            lines.append(line);
+            if ( self.framer.is_last(marker, line) ):
+                complete = True;
+                break;
+
+        if ( not complete ):
+            if ( marker is not None ):
+                self.framer.forget(cmd);
+            self.framer.learn(cmd, lines);
+
+        self.stats.record(cmd, ticks_diff(ticks_us(), sentTick));
+        return lines;
+
+    #
+    # Same as SerialTransport.query_many, queries written in one go and the
+    # combined response split up again per command
+    #
+    async def query_many( self, cmds ):
+        async with self.lock:
+            sequential = ( (not self.pipeline) or (len(cmds) < 2) );
+            for cmd in cmds:
+                if ( not self.framer.marker(cmd) ):
+                    sequential = True;
+            if ( sequential ):
+                # No await inside comprehensions on MicroPython
+                responses = [];
+                for cmd in cmds:
+                    responses.append(await self.query_locked(cmd));
+                return responses;
+
+            self.discard();
+            sentTick = ticks_us();
+            self.port.write("".join(cmds).encode());
+
+            responses = [];
+            lines = [];
+            index = 0;
+            marker = self.framer.marker(cmds[0]);
+            while ( index < len(cmds) ):
+                line = await self.next_line(sentTick, self.timeout * len(cmds), False);
+                if ( line is None ):
+                    break;
+                lines.append(line);
+                if ( self.framer.is_last(marker, line) ):
+                    self.stats.record(cmds[index], ticks_diff(ticks_us(), sentTick));
+                    responses.append(lines);
+                    lines = [];
+                    index += 1;
+                    if ( index < len(cmds) ):
+                        marker = self.framer.marker(cmds[index]);
+
+            if ( index < len(cmds) ):
+                if ( index > 0 ):
+                    self.pipeline = False;
+                for cmd in cmds[index:]:
+                    responses.append(await self.query_locked(cmd));
+
+            return responses;
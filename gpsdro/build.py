@@ -0,0 +1,170 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Board Build
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Host only -- stages what goes on a MicroPython board, so it doesn't
+# compile the discipliner from source at every boot:
+#
+#   python3 -m gpsdro.build [--out build] [--mpy-cross PATH] [--march ARCH]
+#
+#   build/main.py            the launcher, gpsdro-symmetricom.py
+#   build/gpsdro/*.mpy       the board modules, precompiled with mpy-cross
+#
+# Copy the contents of build/ to the board (e.g. "mpremote cp -r build/. :").
+# mpy-cross is the one from the "mpy_cross" pip package, the one given
+# with --mpy-cross or "mpy-cross" on the PATH, and has to match the
+# firmware's .mpy version.  gpsdro.native needs the board's --march
+# (armv6m for the RP2040, xtensawin for the ESP32-S3, rv32imc for the
+# ESP32-C3) and is copied as source without it.  --source copies
+# everything as source.
+#
+# --manifest writes build/manifest.py instead, for freezing the package
+# into a firmware build ("FROZEN_MANIFEST=.../manifest.py" on the make line).
+# Frozen modules run straight from flash and take no heap to load.
+# main.py still has to be copied to the board's filesystem.
+#
+# The host only modules (emulator, replay, multi, ...) are left out.
+#
+import os
+
+# Everything gpsdro.discipline imports, up front or lazily
+BUILD_BOARD_MODULES	= ( "__init__", "checkpoint", "control", "discipline", "fixed", "histogram",
+                            "holdover", "hotpath", "metrics", "native", "profile", "regression",
+                            "ringsum", "scheduler", "schema", "stability", "telemetry", "transport",
+                            "window" )
+
+# Compiled for the board's architecture or not at all
+BUILD_NATIVE_MODULES	= ( "native", )
+
+BUILD_LAUNCHER		= "gpsdro-symmetricom.py"
+
+
+def package_dir():
+    return os.path.dirname(os.path.abspath(__file__));
+
+
+def copy_file( source, dest ):
+    with open(source, "rb") as inFile:
+        data = inFile.read();
+    with open(dest, "wb") as outFile:
+        outFile.write(data);
+
+
+#
+# The command line to run mpy-cross with, or None if there isn't one
+#
+def find_mpy_cross( path=None ):
+    import shutil, sys
+
+    if ( path ):
+        return [ path ];
+    try:
+        import mpy_cross
+        return [ sys.executable, "-m", "mpy_cross" ];
+    except ImportError:
+        pass;
+    path = shutil.which("mpy-cross");
+    if ( path ):
+        return [ path ];
+    return None;
+
+
+def compile_module( mpyCross, source, dest, march=None ):
+    import subprocess
+
+    command = list(mpyCross);
+    if ( march ):
+        command.append("-march=" + march);
+    command += [ "-o", dest, source ];
+    subprocess.run(command, check=True);
+
+
+#
+# Stage the board files in outDir, returns the list of files written
+#
+def build( outDir, mpyCross=None, march=None ):
+    srcDir = package_dir();
+    pkgDir = os.path.join(outDir, "gpsdro");
+    os.makedirs(pkgDir, exist_ok=True);
+
+    written = [];
+    dest = os.path.join(outDir, "main.py");
+    copy_file(os.path.join(os.path.dirname(srcDir), BUILD_LAUNCHER), dest);
+    written.append(dest);
+
+    for name in BUILD_BOARD_MODULES:
+        source = os.path.join(srcDir, name + ".py");
+        if ( (mpyCross is None) or ((name in BUILD_NATIVE_MODULES) and not march) ):
+            dest = os.path.join(pkgDir, name + ".py");
+            copy_file(source, dest);
+        else:
+            dest = os.path.join(pkgDir, name + ".mpy");
+            compile_module(mpyCross, source, dest, march);
+        written.append(dest);
+    return written;
+
+
+#
+# Freeze manifest for the package, the port's own manifest is included so
+# the firmware keeps its usual frozen modules
+#
+def write_manifest( path ):
+    srcDir = package_dir();
+    with open(path, "w") as outFile:
+        outFile.write("include(\"$(PORT_DIR)/boards/manifest.py\")\n");
+        outFile.write("package(\"gpsdro\", files=(\n");
+        for name in BUILD_BOARD_MODULES:
+            outFile.write("    \"{}.py\",\n".format(name));
+        outFile.write("), base_path=\"{}\")\n".format(os.path.dirname(srcDir)));
+
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stage the GPSDRO discipliner for a MicroPython board");
+    parser.add_argument("--out", default="build", help="output directory");
+    parser.add_argument("--mpy-cross", dest="mpyCross", help="mpy-cross executable");
+    parser.add_argument("--march", help="board architecture for gpsdro.native, e.g. armv6m, xtensawin, rv32imc");
+    parser.add_argument("--source", action="store_true", help="copy the modules as source");
+    parser.add_argument("--manifest", action="store_true", help="write a freeze manifest instead");
+    args = parser.parse_args(argv);
+
+    if ( args.manifest ):
+        os.makedirs(args.out, exist_ok=True);
+        path = os.path.join(args.out, "manifest.py");
+        write_manifest(path);
+        print ("Wrote", path);
+        return 0;
+
+    mpyCross = None;
+    if ( not args.source ):
+        mpyCross = find_mpy_cross(args.mpyCross);
+        if ( mpyCross is None ):
+            print ("mpy-cross not found, install it with \"pip install mpy-cross\", give it with --mpy-cross or use --source");
+            return 1;
+
+    for path in build(args.out, mpyCross, args.march):
+        print ("  {:8d}  {}".format(os.path.getsize(path), path));
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
@@ -0,0 +1,65 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Discipline Checkpoints
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Snapshot of the discipline state written every so often so a restart
+# can pick up where it left off instead of running the full initial slope
+# calculation again.
+#
+# The snapshot is a flat dict of plain lists and numbers saved as JSON, the
+# caller decides what goes in it.  Age is measured with the oscillator's
+# own power-on hours counter, it keeps going through a reset of the board
+# and doesn't need a real time clock.
+#
+from gpsdro.profile import read_atomic, write_atomic
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+CHECKPOINT_FILE		= "gpsdro-checkpoint.json"
+CHECKPOINT_VERSION	= 2
+
+
+def checkpoint_save( state, path=CHECKPOINT_FILE ):
+    state["VERSION"] = CHECKPOINT_VERSION;
+    try:
+        write_atomic(path, json.dumps(state));
+    except OSError as error:
+        print ("Unable to save checkpoint:", error);
+
+
+#
+# Saved state if it was written by the same oscillator (serial number)
+# no more than maxHours power-on hours ago, None otherwise
+#
+def checkpoint_load( serialNumber, powerHours, maxHours, path=CHECKPOINT_FILE ):
+    state = read_atomic(path);
+    if ( (not isinstance(state, dict)) or (state.get("VERSION") != CHECKPOINT_VERSION) ):
+        return None;
+    if ( state.get("S/N") != serialNumber ):
+        return None;
+    if ( (powerHours is None) or (state.get("PWRHRS") is None) ):
+        return None;
+    if ( not (0 <= (powerHours - state["PWRHRS"]) <= maxHours) ):
+        return None;
+    return state;
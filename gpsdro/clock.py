@@ -0,0 +1,58 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Clocks
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Stand-in for the parts of the time module the discipliner uses, so it can
+# be run on virtual time.  Nothing waits, sleep() just moves the clock on.
+#
+#   clock = VirtualClock(start)
+#   clock.sleep(0.01)
+#   clock.monotonic_ns()
+#
+class VirtualClock:
+
+    def __init__( self, start=0 ):
+        self.now = int(start);
+
+    def monotonic_ns( self ):
+        return self.now;
+
+    def monotonic( self ):
+        return self.now / 1000000000;
+
+    def time( self ):
+        return self.now / 1000000000;
+
+    def ticks_us( self ):
+        return self.now // 1000;
+
+    def sleep( self, seconds ):
+        self.now += int(seconds * 1000000000);
+
+    def sleep_ms( self, millis ):
+        self.now += int(millis) * 1000000;
+
+    #
+    # Jump forward to an absolute time, never back
+    #
+    def advance_to( self, nanos ):
+        if ( nanos > self.now ):
+            self.now = int(nanos);
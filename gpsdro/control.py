@@ -0,0 +1,381 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Control Engines
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Frequency control engines for after the initial discipline.  Instead of
+# waiting for the drift window average to pass DDS_DRIFT_LIMIT and moving
+# the DDS a whole step (and then forgetting the phase by moving PPSOFFSET)
+# these look at every tick and steer the phase itself back to zero.
+#
+# Both take the PPS phase in seconds, the rollover corrected delta less
+# PPSOFFSET over the crystal frequency, and hand back the DDS value to
+# set.  Raising the DDS pulls the delta down, so a positive phase wants a
+# higher DDS.
+#
+#   engine = PIEngine(timeConstant=600)
+#   engine.reset(ddsAdjValue)
+#   newDds = engine.update(phase)        # once per PPS tick
+#
+# PIEngine     -- proportional + integral on the phase, the usual type 2
+#                 loop with a time constant and damping.  The integral
+#                 stops growing while the output is at the limit.  The
+#                 phase is a whole crystal count (16.7 ns) with GPS noise
+#                 on top, so the proportional term works on an average of
+#                 it and the DDS only moves once the output is a whole
+#                 deadband away, otherwise every count flicker is a write.
+#
+# KalmanEngine -- two state (phase, frequency) Kalman filter with white and
+#                 random walk FM process noise and the PPS measurement
+#                 noise, the frequency estimate is cancelled and the phase
+#                 estimate steered out over the time constant.  The steer
+#                 is limited so a large phase error can't run away.
+#
+# The DDS only takes DDS_INCR_VALUE steps, the rest of the correction
+# stays in the engine and comes out on later ticks.
+#
+# "python3 -m gpsdro.control" runs the engines and the step adjuster the
+# script uses against the same gpsdro.emulator oscillator and noise for
+# comparison, starting with the DDS off by --start-error.  It shows the
+# Allan deviation of the oscillator's own phase, what the DDS writes do
+# to the output, next to the measured PPS phase.
+#
+from gpsdro.ringsum import RingSum
+
+DDS_BASE_VALUE		= float(1e-11)
+DDS_INCR_VALUE		= float(2e-1)
+
+# Largest correction either engine will make, fractional frequency
+CONTROL_LIMIT		= 5e-9
+
+PI_TIME_CONSTANT	= 600
+PI_DAMPING			= 1.0
+
+# Seconds of phase averaged for the proportional term, and how far (in DDS
+# steps) the output has to be from the DDS value before it is moved
+PI_FILTER			= 120
+PI_DEADBAND			= 1.0
+
+KALMAN_TIME_CONSTANT	= 600
+KALMAN_WHITE_FM		= 1e-22
+KALMAN_RW_FM		= 1e-28
+KALMAN_MEASUREMENT	= 1e-8
+KALMAN_STEER_LIMIT	= 1e-10
+
+
+def clamp( value, limit ):
+    if ( value > limit ):
+        return limit;
+    if ( value < -limit ):
+        return -limit;
+    return value;
+
+
+#
+# Nearest DDS value the oscillator takes
+#
+def dds_quantize( value, step=DDS_INCR_VALUE ):
+    return round(round(value / step) * step, 1);
+
+
+class PIEngine:
+
+    def __init__( self, timeConstant=PI_TIME_CONSTANT, damping=PI_DAMPING, limit=CONTROL_LIMIT, interval=1.0,
+                  filter=PI_FILTER, deadband=PI_DEADBAND ):
+        self.timeConstant = timeConstant;
+        self.damping = damping;
+        self.limit = limit;
+        self.interval = interval;
+        self.smoothing = min(interval / max(filter, interval), 1.0);
+        self.deadband = deadband * DDS_INCR_VALUE;
+        # Closed loop s^2 + Kp s + Ki with wn = 1/T
+        self.kp = 2.0 * damping / timeConstant;
+        self.ki = 1.0 / (timeConstant * timeConstant);
+        self.reset(0.0);
+
+    def reset( self, dds ):
+        self.base = dds;
+        self.dds = dds;
+        self.integral = 0.0;
+        self.phase = 0.0;
+        self.filtered = 0.0;
+        self.count = 0;
+
+    def update( self, phase ):
+        self.phase = phase;
+        # Starts from 0, the phase was just reset, so one noisy first
+        # sample doesn't go straight through Kp
+        self.filtered += (phase - self.filtered) * self.smoothing;
+        self.count += 1;
+
+        integral = self.integral + (self.ki * phase * self.interval);
+        output = (self.kp * self.filtered) + integral;
+        if ( abs(output) <= self.limit ):
+            self.integral = integral;
+        else:
+            # Anti-windup, keep what the integral had and clip the output
+            output = clamp((self.kp * self.filtered) + self.integral, self.limit);
+
+        target = self.base + (output / DDS_BASE_VALUE);
+        if ( abs(target - self.dds) >= self.deadband ):
+            self.dds = dds_quantize(target);
+        return self.dds;
+
+    def report( self ):
+        return "PI {}s   Phase: {:.2e}   Filtered: {:.2e}   Integral: {:.2e}".format(self.timeConstant, self.phase, self.filtered, self.integral);
+
+
+class KalmanEngine:
+
+    def __init__( self, timeConstant=KALMAN_TIME_CONSTANT, whiteFm=KALMAN_WHITE_FM, randomWalkFm=KALMAN_RW_FM,
+                  measurement=KALMAN_MEASUREMENT, steerLimit=KALMAN_STEER_LIMIT, limit=CONTROL_LIMIT, interval=1.0 ):
+        self.timeConstant = timeConstant;
+        self.interval = interval;
+        self.steerLimit = steerLimit;
+        self.limit = limit;
+        self.measVar = measurement * measurement;
+
+        # Process noise for one interval
+        tau = interval;
+        self.q00 = (whiteFm * tau) + (randomWalkFm * tau * tau * tau / 3.0);
+        self.q01 = randomWalkFm * tau * tau / 2.0;
+        self.q11 = randomWalkFm * tau;
+        self.reset(0.0);
+
+    #
+    # The slope calculation leaves the frequency close, the phase starts at
+    # the first measurement
+    #
+    def reset( self, dds ):
+        self.base = dds;
+        self.dds = dds;
+        self.phase = 0.0;
+        self.freq = 0.0;
+        self.p00 = self.measVar;
+        self.p01 = 0.0;
+        self.p11 = 1e-22;
+        self.count = 0;
+
+    def update( self, measured ):
+        tau = self.interval;
+        if ( self.count == 0 ):
+            self.phase = measured;
+        self.count += 1;
+
+        # Predict
+        self.phase += self.freq * tau;
+        p00 = self.p00 + (2.0 * tau * self.p01) + (tau * tau * self.p11) + self.q00;
+        p01 = self.p01 + (tau * self.p11) + self.q01;
+        p11 = self.p11 + self.q11;
+
+        # Update
+        innovation = measured - self.phase;
+        gainS = p00 + self.measVar;
+        k0 = p00 / gainS;
+        k1 = p01 / gainS;
+        self.phase += k0 * innovation;
+        self.freq += k1 * innovation;
+        self.p00 = (1.0 - k0) * p00;
+        self.p01 = (1.0 - k0) * p01;
+        self.p11 = p11 - (k1 * p01);
+
+        # Cancel the frequency, steer the phase out over the time constant
+        steer = clamp(self.phase / self.timeConstant, self.steerLimit);
+        target = self.dds + ((self.freq + steer) / DDS_BASE_VALUE);
+        target = self.base + (clamp((target - self.base) * DDS_BASE_VALUE, self.limit) / DDS_BASE_VALUE);
+        newDds = dds_quantize(target);
+
+        # What the new DDS value does to the phase rate is known
+        self.freq -= (newDds - self.dds) * DDS_BASE_VALUE;
+        self.dds = newDds;
+        return self.dds;
+
+    def report( self ):
+        return "Kalman {}s   Phase: {:.2e}   Freq: {:.2e}   Gain: {:.1e}".format(self.timeConstant, self.phase, self.freq, self.p01 / (self.p00 + self.measVar));
+
+
+#
+# The script's dds_check_and_adjust() as an engine, for comparison.  It
+# works in crystal counts and moves PPSOFFSET when it adjusts, the offset
+# it wants taken off the phase is in self.offset.
+#
+class StepEngine:
+
+    def __init__( self, crystal, window=60, limit=0.75, interval=10 ):
+        self.crystal = crystal;
+        self.window = window;
+        self.driftLimit = limit;
+        self.checkInterval = interval;
+        self.pps = RingSum(window, (window,));
+        self.reset(0.0);
+
+    def reset( self, dds ):
+        self.dds = dds;
+        self.offset = 0;
+        self.pps.clear();
+        self.count = 0;
+        self.due = self.checkInterval;
+
+    def update( self, phase ):
+        counts = int(round(phase * self.crystal));
+        self.pps.push(counts - self.offset);
+        self.count += 1;
+        self.due -= 1;
+        if ( self.due > 0 ):
+            return self.dds;
+        self.due = self.checkInterval;
+        if ( self.count <= self.checkInterval ):
+            return self.dds;
+        ppsval = self.pps.window_sum(self.window);
+        if ( abs(ppsval) / self.window >= self.driftLimit ):
+            multval = round(ppsval / self.window / self.driftLimit, 0);
+            self.dds = round(self.dds + (multval * DDS_INCR_VALUE), 1);
+            self.offset = counts;
+            self.due = self.window * 2;
+        return self.dds;
+
+    def report( self ):
+        return "Step   Offset: {}".format(self.offset);
+
+
+#
+# Closed loop run of one engine on an emulated oscillator.  Same seed, same
+# oscillator and noise, so runs with different engines line up.  The DDS
+# starts "startError" DDS units away from where a slope calculation of
+# "calibrate" seconds would leave it, the engine isn't told.
+#
+# Returns the measured phases (seconds), the oscillator's own phase
+# (whole femtoseconds, for gpsdro.stability), the DDS writes and the mean
+# frequency over the second half.
+#
+def simulate( engine, seconds, seed=1, calibrate=2200, startError=0.0, **oscArgs ):
+    from gpsdro.emulator import SymOscillator
+    from gpsdro.regression import reg_new, reg_add, reg_slope
+
+    osc = SymOscillator(seed=seed, **oscArgs);
+    crystal = osc.crystal;
+
+    def delta():
+        value = osc.register;
+        if ( value > crystal / 2 ):
+            value -= crystal;
+        return value;
+
+    reg = reg_new();
+    for second in range(calibrate):
+        osc.second();
+        reg_add(reg, second, delta());
+    dds = round(reg_slope(reg) / crystal / DDS_BASE_VALUE, 1);
+    if ( (int(dds * 10) % 2) == 1 ):
+        dds += 0.1;
+    dds = round(dds + startError, 1);
+    osc.set_dds(dds);
+    osc.reset_tic();
+    engine.reset(dds);
+
+    phases = [];
+    truePhases = [];
+    commands = 0;
+    freqSum = 0.0;
+    for second in range(seconds):
+        osc.second();
+        counts = delta();
+        phases.append(counts / crystal);
+        truePhases.append(int(round(osc.phase * 1e15 / crystal)));
+        newDds = engine.update(counts / crystal);
+        if ( newDds != osc.dds ):
+            osc.set_dds(newDds);
+            commands += 1;
+        if ( second >= seconds // 2 ):
+            freqSum += osc.frequency();
+    return phases, truePhases, commands, freqSum / max(seconds - (seconds // 2), 1);
+
+
+#
+# Seconds until the phase, averaged over "window" to take the GPS noise
+# out, last left +-bound, and the RMS and max over the second half of the
+# run
+#
+def phase_summary( phases, bound, window=60 ):
+    settled = 0;
+    total = 0.0;
+    for index in range(len(phases)):
+        total += phases[index];
+        if ( index >= window ):
+            total -= phases[index - window];
+        if ( abs(total / min(index + 1, window)) > bound ):
+            settled = index + 1;
+    tail = phases[len(phases) // 2:];
+    rms = (sum(value * value for value in tail) / max(len(tail), 1)) ** 0.5;
+    peak = max(abs(value) for value in tail);
+    return settled, rms, peak;
+
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the DDS control engines on an emulated oscillator");
+    parser.add_argument("--engines", default="step,pi,kalman", help="comma separated, any of step, pi, kalman");
+    parser.add_argument("--seconds", type=int, default=20000);
+    parser.add_argument("--seeds", default="1,2,3", help="comma separated emulator seeds, each engine runs on all of them");
+    parser.add_argument("--calibrate", type=int, default=2200, help="initial slope calculation length");
+    parser.add_argument("--start-error", type=float, default=10.0, help="DDS units the DDS starts away from the calibrated value");
+    parser.add_argument("--pi-tc", type=float, default=PI_TIME_CONSTANT);
+    parser.add_argument("--pi-damping", type=float, default=PI_DAMPING);
+    parser.add_argument("--pi-filter", type=float, default=PI_FILTER, help="seconds of phase averaged for the proportional term");
+    parser.add_argument("--pi-deadband", type=float, default=PI_DEADBAND, help="DDS steps the output moves before the DDS does");
+    parser.add_argument("--kalman-tc", type=float, default=KALMAN_TIME_CONSTANT);
+    parser.add_argument("--kalman-meas", type=float, default=KALMAN_MEASUREMENT, help="PPS measurement noise in s");
+    parser.add_argument("--kalman-wfm", type=float, default=KALMAN_WHITE_FM);
+    parser.add_argument("--kalman-rwfm", type=float, default=KALMAN_RW_FM);
+    parser.add_argument("--offset", type=float, default=7.42e-10, help="free running fractional frequency offset");
+    parser.add_argument("--sawtooth", type=float, default=10.0, help="GPS sawtooth amplitude in ns");
+    parser.add_argument("--jitter", type=float, default=2.0, help="GPS white jitter in ns");
+    parser.add_argument("--bound", type=float, default=10.0, help="settled once the 60s mean phase stays within this many ns");
+    args = parser.parse_args(argv);
+
+    from gpsdro.stability import adev
+
+    # Allan deviation of the oscillator phase over the second half, which
+    # is in femtoseconds
+    taus = ( 1, 10, 100 );
+    oscArgs = { "freqOffset": args.offset, "sawtooth": args.sawtooth * 1e-9, "jitter": args.jitter * 1e-9 };
+    print ("{:8} {:>5} {:>9} {:>7} {:>7} {:>7} {:>9} {:>9} {:>9} {:>10}".format("Engine", "Seed", "Settled s", "RMS ns", "Max ns", "Writes",
+                "ADEV 1s", "10s", "100s", "Mean freq"));
+    for name in args.engines.split(","):
+        for seed in args.seeds.split(","):
+            if ( name == "pi" ):
+                engine = PIEngine(args.pi_tc, args.pi_damping, filter=args.pi_filter, deadband=args.pi_deadband);
+            elif ( name == "kalman" ):
+                engine = KalmanEngine(args.kalman_tc, args.kalman_wfm, args.kalman_rwfm, args.kalman_meas);
+            elif ( name == "step" ):
+                engine = StepEngine(60000000);
+            else:
+                parser.error("unknown engine " + name);
+            phases, truePhases, commands, freq = simulate(engine, args.seconds, int(seed), args.calibrate, args.start_error, **oscArgs);
+            settled, rms, peak = phase_summary(phases, args.bound * 1e-9);
+            deviations = adev(truePhases[len(truePhases) // 2:], 1000000000000000, taus);
+            print ("{:8} {:>5} {:>9} {:>7.2f} {:>7.2f} {:>7} {:>9.2e} {:>9.2e} {:>9.2e} {:>10.2e}".format(name, seed, settled, rms * 1e9, peak * 1e9, commands,
+                        deviations[0], deviations[1], deviations[2], freq));
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
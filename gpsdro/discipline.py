@@ -0,0 +1,1640 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Continious Discipliner
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+import time
+import struct
+import gc
+import os
+import sys
+
+from gpsdro.transport import SerialTransport, FRAME_IDLE, FRAME_IDLE_MS, ticks_us, ticks_diff
+from gpsdro.ringsum import RingSum
+from gpsdro.fixed import ireg_new, ireg_stderr, IREG_SAMPLES, dds_fixed, dds_float, dds_text
+from gpsdro.hotpath import rollover, ireg_add, ireg_slope
+from gpsdro.window import WindowSlope
+from gpsdro.schema import ResponseSchema, SCHEMA_HEALTH
+from gpsdro.schema import parse_banner, parse_delta_reg, parse_control_reg
+from gpsdro.profile import profile_load, profile_save, PROFILE_FILE
+from gpsdro.checkpoint import checkpoint_load, checkpoint_save, CHECKPOINT_FILE
+from gpsdro.histogram import TimingStats
+from gpsdro.scheduler import TimerScheduler
+from gpsdro.holdover import DriftModel, HOLDOVER_STEP
+
+#
+# System Specific Data, filled in by platform_config() when main() starts.
+# Nothing platform specific happens on import, "serial" and "machine" are
+# only imported by platform_setup() and the optional parts (telemetry,
+# metrics, stability, control engines, capture) when they are turned on.
+#
+SYSTEM_DATA         = None
+OVERCLOCK_SYS       = 0
+STATUS_LED			= 0
+
+#
+# Linux only, GPSDRO_PORT overrides the port (e.g. the gpsdro.emulator pty)
+# and GPSDRO_SPEEDUP runs all the timing faster to match an accelerated
+# emulator.  GPSDRO_PROFILE moves the saved oscillator profile, set it to
+# "" to always probe, GPSDRO_CHECKPOINT does the same for the discipline
+# checkpoint.  GPSDRO_TELEMETRY turns on the binary telemetry log and
+# GPSDRO_CAPTURE records every exchange with the oscillator for
+# "python3 -m gpsdro.replay".  They are read by platform_config().
+#
+SERIAL_PORT         = "/dev/ttyS4"
+SIM_SPEEDUP         = 1
+CAPTURE_FILE        = ""
+
+#
+# Constants
+#
+RUBIDIUM			= 1
+GPS					= 2
+
+SYM_UNKNOWN	    	= 0
+SYM_SA22C	    	= 22
+SYM_X72		    	= 72
+SYM_X99		    	= 99
+
+POLL_PPS			= 1000
+
+#
+# Used for the dds disciplining and tracking
+#
+STATE_INITIAL		= 0
+STATE_RUNNING		= 1
+STATE_HOLDOVER		= 2
+STATE_JAMSYNCH		= 3
+STATE_CALCSLOPE		= 4
+STATE_US_DISCIPLINE	= 5
+STATE_S_DISCIPLINE	= 6
+STATE_DISCIPLINE	= 7
+STATE_UL_DISCIPLINE	= 8
+
+STATE_POS_COUNTER	= 0
+STATE_POS_DDS		= 1
+STATE_POS_REG		= 2
+STATE_POS_OLD_DDS	= 3
+STATE_POS_TIMESTAMP	= 4
+
+STATE_HOLD_START    = 0
+STATE_HOLD_CURRENT  = 1
+STATE_HOLD_SHORT    = 2
+STATE_HOLD_LONGER   = 3
+STATE_HOLD_FOREVER  = 4
+
+STATE_HLD_COUNTER	= 0
+STATE_HLD_DDS		= 1
+STATE_HLD_OLD_DDS	= 2
+STATE_HLD_PPS   	= 3
+STATE_HLD_LAST_PPS  = 4
+STATE_HLD_STATE     = 5
+STATE_HLD_TIMESTAMP	= 6
+
+HLD_STATE_OFF       = 0
+HLD_STATE_START     = 1
+HLD_STATE_RB_LOCK   = 2
+HLD_STATE_RUN       = 3
+
+PPS_ROLLOVER        = 864000000
+PPS_TRIGGER         = 10000
+
+DISCIPLINE_ENTRIES	= 2200
+#DISCIPLINE_ENTRIES	= 0
+
+#
+# Adaptive slope calculation, instead of exactly the number of samples asked
+# for it stops once the DDS correction is known to within half a DDS step
+# (DISCIPLINE_CONFIDENCE standard errors) and keeps going up to
+# DISCIPLINE_MAX_FACTOR times that many when the PPS is noisy.
+#
+DISCIPLINE_ADAPTIVE	= 1
+DISCIPLINE_MIN_ENTRIES	= 300
+DISCIPLINE_MAX_FACTOR	= 4
+DISCIPLINE_CONFIDENCE	= 2.0
+
+#
+# These values coded constants for doing calculations.
+#
+DDS_BASE_VALUE		= float(1e-11)
+DDS_LOW_VALUE		= float(2e-12)
+DDS_CAL_VALUE		= float(2e-11)
+DDS_INCR_VALUE		= float(2e-1)
+DDS_INCR_FIXED		= 2
+
+
+DDS_CHECK_INTERVAL	= 10
+#
+# Used for short term tweaking of the DDS
+#
+# PPS weighted - 10 second window, 1 sawtooth
+# it creates a +/-20 ns variation using a GPS PPS
+#DDS_DRIFT_LIMIT    = 1.05
+#DDS_DRIFT_WINDOW   = 10
+# Weighted against 6 sawtooth pattern
+# Still testing this -- allows for better tracking
+# and keeps it to about +/- 5ns..
+DDS_DRIFT_LIMIT	    = 0.75
+DDS_DRIFT_WINDOW    = 60
+DDS_DRIFT_THRESHOLD	= DDS_DRIFT_LIMIT * DDS_DRIFT_WINDOW
+
+#
+# DDS control after the initial discipline (gpsdro.control).  "step" is the
+# drift window adjuster above, "pi" and "kalman" look at every tick and
+# steer the phase back to zero over CONTROL_TIME_CONSTANT seconds instead.
+# KALMAN_MEASUREMENT is the PPS noise in seconds, GPS sawtooth and all.
+# GPSDRO_ENGINE on Linux.
+#
+CONTROL_ENGINE		= "step"
+CONTROL_TIME_CONSTANT	= 600
+PI_DAMPING			= 1.0
+KALMAN_MEASUREMENT	= 1e-8
+
+#
+# Sliding window slopes, in seconds.  Costs 4 bytes of RAM per second of
+# the longest window so trim it on the smaller boards if needed.
+#
+SLOPE_WINDOWS		= (100, 1000, 10000)
+
+#
+# Health fields decoded from the "w" dump, None for all of them.  Listing
+# just the ones needed, e.g. ("IFPGACTL", "DCURTEMP", "DHTRVOLT", "DMP17",
+# "PWRHRS", "PWRTICKS"), skips decoding the rest.
+#
+STATUS_FIELDS		= None
+
+#
+# Warm start, the discipline state is saved every CHECKPOINT_INTERVAL
+# seconds and reused after a restart if it is from the same oscillator and
+# no more than CHECKPOINT_MAX_HOURS power-on hours old.  The restored DDS
+# value is checked over CHECKPOINT_VERIFY seconds first, the slope has to
+# be within CHECKPOINT_VERIFY_LIMIT DDS units (plus 3 standard errors).
+#
+CHECKPOINT_INTERVAL	= 600
+CHECKPOINT_MAX_HOURS	= 1
+CHECKPOINT_VERIFY	= 120
+CHECKPOINT_VERIFY_LIMIT	= 1.0
+
+#
+# Binary per tick telemetry (gpsdro.telemetry), written to TELEMETRY_FILE
+# plus ".tick" and ".health".  About 2MB a day so it is off by default,
+# that fills the flash on a Pico in a day.
+#
+TELEMETRY_FILE		= ""
+
+#
+# HTTP port for the metrics endpoint (gpsdro.metrics), /metrics for
+# Prometheus and /status for JSON, 0 for none.  GPSDRO_METRICS on Linux.
+# The board has to be on the network already (boot.py on a Pico W/ESP32).
+#
+METRICS_PORT		= 0
+
+#
+# Running Allan / modified Allan deviation and MTIE of the PPS phase for
+# these taus in seconds, shown with the health output, e.g. (1, 10, 100,
+# 1000).  Keeps 3 x the longest tau of phase values, empty to turn it off.
+#
+STABILITY_TAUS		= ()
+
+#
+# Global Variables
+#
+symModelArray 			= {};
+symCrystal				= 0;
+symStatusArray			= {};
+symSumsArray			= [[int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)],
+                           [int(0),int(0),ireg_new(),int(0), int(0)]];
+symHoldoverArray        = [ [int(0),int(0),int(0),int(0),int(0),int(0),int(0)],
+                            [int(0),int(0),int(0),int(0),int(0),int(0),int(0)],
+                            [int(0),int(0),int(0),int(0),int(0),int(0),int(0)],
+                            [int(0),int(0),int(0),int(0),int(0),int(0),int(0)],
+                            [int(0),int(0),int(0),int(0),int(0),int(0),int(0)] ];
+
+bufferStr				= "";
+bufferArray				= {};
+
+# Register values from a batch, allocated once
+symRegisterValues		= [None, None, None, None];
+
+symTransport			= None;
+symHealthSchema			= None;
+symTelemetry			= None;
+symStability			= None;
+symMetrics				= None;
+symTimingPoll			= None;
+symTimingRequest		= 0;
+symCapture				= None;
+symScheduler			= None;
+symEngine				= None;
+symDrift				= None;
+
+# Boot timing, ticks_us() when the launcher started and when main() did,
+# reported at the first PPS read
+symBootTick				= None;
+symMainTick				= 0;
+
+#
+# Trackers
+#
+POLL_HEALTH_OFFSET	= POLL_PPS/2
+POLL_DDS_OFFSET		= POLL_PPS/4
+
+# Main loop tasks, a lower number goes first when several are due
+TASK_PPS			= "pps"
+TASK_DDS			= "dds"
+TASK_HEALTH			= "health"
+TASK_SAMPLE			= "sample"
+
+TASK_PRIO_PPS		= 0
+TASK_PRIO_DDS		= 1
+TASK_PRIO_HEALTH	= 2
+
+# The window sums are kept running so only the largest window is stored,
+# DDS_DRIFT_WINDOW can go up to hours without the check getting slower.
+PPS_AVG_TRK			= DDS_DRIFT_WINDOW
+
+symPPS 					= RingSum(PPS_AVG_TRK, (DDS_DRIFT_WINDOW,));
+symSlopes				= WindowSlope(SLOPE_WINDOWS);
+
+# Microsecond histograms, how late each tick starts and how long the
+# status read, a slope sample and the DDS check take.  The serial round
+# trips are in symTransport.stats.
+symTiming				= TimingStats(("late", "status", "slope", "dds"));
+symPPScounter 			= 0;
+
+#
+# ******** REMEMBER BASE IS 2e-11 ********
+# so if it's a 1.234e-10, it's actually, 12.34 starting value
+#
+# Kept in tenths (gpsdro.fixed), 12.3 is 123
+#
+ddsAdjValue 			= int(0);
+#ddsAdjValue 			= int(-742);
+ddsAdjValueOld 			= int(0);
+
+# Utility Functions
+
+#
+# Use to display platform specific information and storage details
+# This has been tuned for the Raspberry Pi Pico and ESP32-S3
+#
+# Other platforms running micropython should be added here before
+# running because it exits if it is not found!
+#
+def platform_setup():
+    global rubidium, STATUS_LED, POLL_PPS, serial, machine
+    
+    osData = SYSTEM_DATA;
+    storageData = os.statvfs("/");
+    storageSize = storageData[1] * storageData[2];
+    storageFree = storageData[0] * storageData[3];
+    storageUsed = storageSize - storageFree;
+    KB = 1024
+    MB = 1024 * 1024
+
+    print (osData);
+    print("Size : {:,} bytes, {:,} KB, {} MB".format(storageSize, storageSize / KB, storageSize / MB))
+    print("Used : {:,} bytes, {:,} KB, {} MB".format(storageUsed, storageUsed / KB, storageUsed / MB))
+    print("Free : {:,} bytes, {:,} KB, {} MB".format(storageFree, storageFree / KB, storageFree / MB))
+    
+    # Set up the UART, it's declared global once thsi is setup it's usable 
+    # by all.
+    #
+    # Pico: UART 0, TX=0, RX=1
+    # ESP32-S3 - Pins 43 and 44 are dedicated console out, in standalone 
+    #     mode it doesn't work! Usingf UART1 locations for Pico
+    #     but mapped to the BPI-Pico-S3
+    # ESP-C3 - Pins 21 and 20 are teh dedicated console out
+    # 
+    # ESP32-S3: UART 1, TX=18, RX=16
+    # ESP32-C3: UART 1, TX=6, RX=5
+    #
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        import serial
+    else:
+        import machine
+
+    if (SYSTEM_DATA .nodename == "rp2" ):
+        print ("Speed:", machine.freq());
+        if (OVERCLOCK_SYS):
+            print ("Overclocking to", 150000000);
+            machine.freq(150000000);
+        print ("Setting up UART for Raspberry Pi Pico..");
+        rubidium = machine.UART(0, tx=machine.Pin(0), rx=machine.Pin(1), rxbuf=1024, timeout=FRAME_IDLE_MS, timeout_char=10);
+        STATUS_LED = machine.Pin(25, machine.Pin.OUT);
+    elif ( SYSTEM_DATA.machine.find("ESP32S3") > 0 ):
+        print ("Speed:", machine.freq());
+        if (OVERCLOCK_SYS):
+            print ("Overclocking to", 240000000);
+            machine.freq(240000000);
+        print ("Setting up UART for ESP32-S3..");
+        rubidium = machine.UART(1, tx=machine.Pin(18), rx=machine.Pin(16), rxbuf=1024, timeout=FRAME_IDLE_MS, timeout_char=10);
+        STATUS_LED = machine.Pin(46, machine.Pin.OUT);
+    elif ( SYSTEM_DATA.machine.find("ESP32C3") >= 0 ):
+        print ("Speed:", machine.freq());
+        if (OVERCLOCK_SYS):
+            print ("Overclocking to", 160000000);
+            machine.freq(160000000);
+        print ("Setting up UART for ESP32-C3..");
+        rubidium = machine.UART(1, tx=machine.Pin(0), rx=machine.Pin(1), rxbuf=1024, timeout=FRAME_IDLE_MS, timeout_char=10);
+        STATUS_LED = machine.Pin(8, machine.Pin.OUT);
+    elif ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        print ("Setting up UART for Linux..");
+        rubidium = serial.Serial(SERIAL_PORT, timeout=FRAME_IDLE);        
+        POLL_PPS = int(1000000000 / SIM_SPEEDUP)
+    else:
+        print ("********** Platform not found aborting ************")
+        exit(1);
+    
+
+#
+# Works out the platform and, on Linux, takes the GPSDRO_* overrides from
+# the environment.  Done first thing in main() rather than on import so
+# the module can be imported (and precompiled) without side effects.
+#
+def platform_config():
+    global SYSTEM_DATA, SERIAL_PORT, SIM_SPEEDUP, PROFILE_FILE, CHECKPOINT_FILE, CAPTURE_FILE
+    global CONTROL_ENGINE, TELEMETRY_FILE, METRICS_PORT
+
+    SYSTEM_DATA = os.uname();
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        SERIAL_PORT = os.environ.get("GPSDRO_PORT", SERIAL_PORT)
+        SIM_SPEEDUP = float(os.environ.get("GPSDRO_SPEEDUP", SIM_SPEEDUP))
+        PROFILE_FILE = os.environ.get("GPSDRO_PROFILE", PROFILE_FILE)
+        CHECKPOINT_FILE = os.environ.get("GPSDRO_CHECKPOINT", CHECKPOINT_FILE)
+        CAPTURE_FILE = os.environ.get("GPSDRO_CAPTURE", CAPTURE_FILE)
+        CONTROL_ENGINE = os.environ.get("GPSDRO_ENGINE", CONTROL_ENGINE)
+        TELEMETRY_FILE = os.environ.get("GPSDRO_TELEMETRY", TELEMETRY_FILE)
+        METRICS_PORT = int(os.environ.get("GPSDRO_METRICS", METRICS_PORT))
+
+
+#
+# Cold start to the first PPS read, and how much of that was loading the
+# code before main() was called
+#
+def boot_report():
+    global symBootTick
+
+    now = ticks_us();
+    print ("Boot: {:.0f} ms to the first PPS read, {:.0f} ms of it loading the code".format(ticks_diff(now, symBootTick) / 1000,
+                ticks_diff(symMainTick, symBootTick) / 1000));
+    symBootTick = None;
+
+
+#
+#  This handles the abstraction of micropython time and regualr python time
+#
+def get_current_tick():
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        return time.monotonic_ns();
+    else:
+        return time.ticks_ms();
+
+
+#
+#  This handles the difference addition
+#
+def add_offset_to_current( offsetTick ):
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        return time.monotonic_ns() + offsetTick;
+    else:
+        return time.ticks_add(time.ticks_ms(), int(offsetTick));
+
+
+#
+#  This returns the difference
+#
+def diff_offset_to_current( offsetTick ):
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        return time.monotonic_ns() - offsetTick;
+    else:
+        return time.ticks_diff (time.ticks_ms(), int(offsetTick));
+
+
+#
+#  Sleep for a number of microseconds
+#
+def sleep_us( micros ):
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        time.sleep(micros / 1000000);
+    else:
+        time.sleep_us(int(micros));
+
+
+#
+#  What the scheduler does while it waits, a metrics scrape is answered
+#  straight away
+#
+def idle_wait( micros ):
+    if ( (symMetrics is not None) and (micros >= 1000) ):
+        symMetrics.poll(int(micros // 1000));
+    else:
+        sleep_us(micros);
+
+
+#
+#  Tick difference in microseconds
+#
+def tick_to_us( tickDiff ):
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        return int(tickDiff // 1000);
+    else:
+        return int(tickDiff * 1000);
+
+
+#
+# The timing histograms are printed on request, "kill -USR1" on Linux or
+# "t" typed on the console on MicroPython
+#
+def setup_timing_request():
+    global symTimingPoll
+
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        import signal
+        signal.signal(signal.SIGUSR1, request_timing_dump);
+    else:
+        import select
+        symTimingPoll = select.poll();
+        symTimingPoll.register(sys.stdin, select.POLLIN);
+
+
+def request_timing_dump( signalNumber=None, frame=None ):
+    global symTimingRequest
+    symTimingRequest = 1;
+
+
+def timing_dump_requested():
+    global symTimingRequest
+
+    if ( (symTimingPoll is not None) and symTimingPoll.poll(0) ):
+        if ( sys.stdin.read(1) in ("t", "T") ):
+            symTimingRequest = 1;
+    if ( symTimingRequest ):
+        symTimingRequest = 0;
+        return 1;
+    return 0;
+
+
+#
+# Hand the metrics endpoint a fresh snapshot, done with the health output
+# so a scrape only ever sends what was rendered here
+#
+def update_metrics( holdOverState ):
+    slopes = {};
+    for name, whichArray in ( ("running", STATE_RUNNING), ("calcslope", STATE_CALCSLOPE), ("initial", STATE_INITIAL) ):
+        slopes[name] = (return_slope(whichArray), return_slope_error(whichArray));
+
+    symMetrics.snapshot.update({ "MODEL": symModelArray, "STATUS": symStatusArray, "SLOPES": slopes,
+                                 "DDS": dds_float(ddsAdjValue), "HOLDOVER": holdOverState, "COUNTER": symPPScounter,
+                                 "SERIAL": symTransport.stats.histograms, "TIMING": symTiming });
+
+
+def print_timing():
+    print ("-------------------------");
+    print ("Serial round trip:");
+    print (symTransport.stats.histograms.report());
+    print ("Loop timing:");
+    print (symTiming.report());
+    print ("-------------------------");
+
+
+#
+# Rollover adjustment on PPS based on how the Symmetricom units handle
+# it via their internal crystal
+#
+def pps_rollover_correction( val ):
+    return rollover(val, symCrystal);
+
+
+#
+# Use to reset some constants for the internal oscillator
+#
+def redefine_constants():
+    global DDS_CAL_VALUE, DDS_BASE_VALUE, DDS_LOW_VALUE, DDS_INCR_VALUE, DDS_INCR_FIXED
+    global POLL_HEALTH_OFFSET, POLL_DDS_OFFSET, symCrystal
+
+    symCrystal = int(symModelArray["CRYSTAL"]);
+    DDS_CAL_VALUE = 1 / symCrystal;
+    DDS_INCR_VALUE = DDS_LOW_VALUE / DDS_BASE_VALUE;
+    DDS_INCR_FIXED = dds_fixed(DDS_INCR_VALUE);
+    POLL_HEALTH_OFFSET	= POLL_PPS / 2;
+    POLL_DDS_OFFSET		= POLL_PPS / 4;
+
+
+#
+# This gets the response to the last command sent, it returns as soon as
+# the response is complete rather than waiting for the read timeout.
+#
+# Note: to reduce fragmentation in the stack, this was moved up globally
+#       so buffers are reallocated constantly in the functions.
+#
+def get_serial_data( type, bufParam ):
+    global bufferStr, bufferArray
+
+    bufferArray = symTransport.receive();
+    bufferStr = "\r\n".join(bufferArray);
+          
+
+#
+# This sends the message to the serial port make sure you call
+# get_serial_data after to ensure you flush the buffer.
+#
+def send_serial_data( type, bufParam ):
+    symTransport.send(bufParam);
+
+
+#
+# (Re)open the serial port at the given baud rate with a fresh transport,
+# the learned end markers and latency stats are carried over.
+#
+def open_serial_port( baudRate ):
+    global rubidium, symTransport, symCapture
+
+    if ( SYSTEM_DATA.sysname.find("Linux") >= 0 ):
+        rubidium.close();
+        rubidium = serial.Serial(SERIAL_PORT, timeout=FRAME_IDLE, baudrate=baudRate, bytesize=8, parity=serial.PARITY_NONE, stopbits=1);
+    else:
+        rubidium.init(baudrate=baudRate, bits=8, parity=None, stop=1);
+        rubidium.flush();
+    if ( symTransport is None ):
+        symTransport = SerialTransport(rubidium);
+    else:
+        symTransport = SerialTransport(rubidium, symTransport.framer, symTransport.stats);
+
+    if ( CAPTURE_FILE ):
+        from gpsdro.replay import CaptureTransport
+
+        if ( symCapture is None ):
+            symCapture = open(CAPTURE_FILE, "a");
+        symTransport = CaptureTransport(symTransport, symCapture);
+
+
+#
+# Checks the oscillator on the port is still the one in the saved profile,
+# one "i" at the saved baud rate and a look at the serial number.
+#
+def confirm_symmetricom_model( profile ):
+    global symModelArray, bufferStr, bufferArray, symTransport, symHealthSchema
+
+    open_serial_port(profile["BAUD"]);
+    symTransport.framer.markers.update(profile.get("MARKERS", {}));
+    send_serial_data(RUBIDIUM, "i");
+    get_serial_data(RUBIDIUM, 0);
+
+    for x in bufferArray:
+        if ( (x.find("SERIAL CODE IS ") >= 0) and (x.find("-H,") >= 0) ):
+            if ( x[x.find("SERIAL CODE IS ",)+15:x.find("-H,")]+"-H" == profile["MODEL"].get("S/N") ):
+                symModelArray = dict(profile["MODEL"]);
+                symHealthSchema = ResponseSchema(SCHEMA_HEALTH, symModelArray["MODELENUM"], STATUS_FIELDS);
+                return True;
+    return False;
+
+
+#
+# Used to get Model details from the "i" command
+#
+# A saved profile for the port is tried first, the full probe of both baud
+# rates only happens when there isn't one or the oscillator changed.
+#
+def get_symmetricom_model():
+    global symModelArray, bufferStr, bufferArray, rubidium, symTransport, symHealthSchema
+
+    if ( PROFILE_FILE ):
+        profile = profile_load(SERIAL_PORT, PROFILE_FILE);
+        if ( (profile is not None) and confirm_symmetricom_model(profile) ):
+            print ("Using saved profile for", SERIAL_PORT, "at", profile["BAUD"], "baud..");
+            return;
+
+    # This block is used to test for the 2 known
+    # baud rates
+    baudRate = 9600;
+    open_serial_port(baudRate);
+    send_serial_data(RUBIDIUM, "i");
+    get_serial_data(RUBIDIUM, 0);
+    
+    # Sometimes the try and catch just doesn't work
+    # and it needs to be done again..  Happens.. 
+    if ( len(bufferStr) < 4 ):
+        baudRate = 57600;
+        open_serial_port(baudRate);
+        send_serial_data(RUBIDIUM, "i");
+        get_serial_data(RUBIDIUM, 0);
+
+    parse_banner(bufferArray, symModelArray);
+
+    symHealthSchema = ResponseSchema(SCHEMA_HEALTH, symModelArray["MODELENUM"], STATUS_FIELDS);
+
+    if ( PROFILE_FILE and ("S/N" in symModelArray) ):
+        profile_save(SERIAL_PORT, { "BAUD": baudRate, "MODEL": symModelArray, "MARKERS": symTransport.framer.markers }, PROFILE_FILE);
+
+
+#
+# Used to get PPS Delta from the "j" command
+#
+def get_pps_delta( ):
+    get_batch_messages("j");
+
+
+#
+# Parses the "j" response
+#
+def parse_pps_delta( lineArray ):
+    global symStatusArray
+
+    update_pps_delta(parse_delta_reg(lineArray, symModelArray["MODELENUM"]));
+
+
+def update_pps_delta( tempVal ):
+    global symStatusArray
+
+    if ( symBootTick is not None ):
+        boot_report();
+    if ( tempVal is not None ):
+        symStatusArray["LAST1PPSDELTA"] = symStatusArray["1PPSDELTA"];
+        symStatusArray["1PPSDELTA"] = tempVal;
+        symStatusArray["DIFF1PPSDELTA"] = pps_rollover_correction(symStatusArray["LAST1PPSDELTA"]) - pps_rollover_correction(symStatusArray["1PPSDELTA"]);
+
+
+#
+# Used to get Health details from the "w" command
+#
+def get_status_message():
+    global bufferStr, bufferArray
+    
+    startTick = ticks_us();
+    send_serial_data(RUBIDIUM, 'w');
+
+    get_serial_data(RUBIDIUM, 0);
+    parse_status_message(bufferArray);
+    symTiming.record("status", ticks_diff(ticks_us(), startTick));
+
+
+#
+# Parses the "w" response, the decoders for each field are fixed per model
+# (gpsdro.schema) so it is one pass over the lines.
+#
+def parse_status_message( lineArray ):
+    global symStatusArray
+
+    symHealthSchema.parse(lineArray, symStatusArray);
+
+
+#
+# Used to reset the 1PPS Delta
+#
+def set_tic_message( value ):
+    global bufferStr, bufferArray
+    
+    stringVal = "k"+str(value)
+    
+    send_serial_data(RUBIDIUM, stringVal);
+    get_serial_data(RUBIDIUM, 0);
+
+
+#
+# Used to set the D for frequency disciplining, the value is in tenths
+#
+def set_dds_message( value ):
+    global bufferStr, bufferArray
+    
+    stringVal = "f"+dds_text(value)
+    
+    send_serial_data(RUBIDIUM, stringVal);
+    get_serial_data(RUBIDIUM, 0);
+
+
+#
+# Used to get the control register
+#
+def get_control_reg_message():
+    get_batch_messages("p");
+
+
+#
+# Parses the "p" response
+#
+def parse_control_reg_message( lineArray ):
+    update_control_reg(parse_control_reg(lineArray));
+
+
+def update_control_reg( tempVal ):
+    if ( tempVal is not None ):
+        symStatusArray["IFPGACTL"] = tempVal;
+
+
+#
+# Used to send several queries in one go, e.g. "jp" for the delta and the
+# lock status on the same PPS tick.  The combined response is split up by
+# the transport and each part parsed as if it was asked for on its own.
+#
+# If the firmware can't take queued commands the transport falls back to
+# one at a time by itself.
+#
+# Just "j" and "p", i.e. most ticks, don't go through strings at all, the
+# transport decodes the register values straight out of its buffer into
+# symRegisterValues.
+#
+def get_batch_messages( cmdList ):
+    decimalRegs = "";
+    if ( symModelArray["MODELENUM"] == SYM_X99 ):
+        decimalRegs = "j";
+    if ( symTransport.query_registers(cmdList, symRegisterValues, decimalRegs) ):
+        for index in range(len(cmdList)):
+            if ( cmdList[index] == "j" ):
+                update_pps_delta(symRegisterValues[index]);
+            elif ( cmdList[index] == "p" ):
+                update_control_reg(symRegisterValues[index]);
+        return;
+
+    responseArray = symTransport.query_many(cmdList);
+
+    for cmd, lineArray in zip(cmdList, responseArray):
+        if ( cmd == "j" ):
+            parse_pps_delta(lineArray);
+        elif ( cmd == "p" ):
+            parse_control_reg_message(lineArray);
+        elif ( cmd == "w" ):
+            parse_status_message(lineArray);
+            
+            
+#
+# Used to set the the control register
+#
+def set_control_reg_message( value ):
+    global bufferStr, bufferArray
+    
+    stringVal = "q"+str(value)
+
+    send_serial_data(RUBIDIUM, stringVal);
+    get_serial_data(RUBIDIUM, 0);
+
+
+#
+# Use to help calcualte a slope value for disciplining
+#
+# Credits: This was taken from Lady Heather from Mark Sims.
+#
+# The sums are kept as a streaming least squares fit (gpsdro.regression)
+# so they don't lose precision on long runs.
+#
+def pps_cal_list( whichArray, inVal, countVal ):
+    global symSumsArray
+
+    symSumsArray[whichArray][STATE_POS_COUNTER]	= int(countVal);
+    ireg_add(symSumsArray[whichArray][STATE_POS_REG], countVal, inVal);
+
+
+#
+# Used to copy entire sections from one entry to another for summary array.
+#
+def shift_pps_cal_entry ( fromArray, toArray ):
+    global symSumsArray
+    
+    symSumsArray[toArray] = symSumsArray[fromArray];
+
+
+#
+# Use to reset an entry for the summary array
+#
+def reset_pps_cal_entry ( whihcArray ):
+    global symSumsArray
+    
+    symSumsArray[whihcArray] = [int(0),int(0),ireg_new(),int(0), int(0)];
+     
+    
+#
+# Use to fill an detials for holdover Entry
+#
+def record_hold_details ( whihcArray, curTick, curDds, oldDds, hldState  ):
+    global symHoldoverArray
+
+    symHoldoverArray[whihcArray][STATE_HLD_COUNTER] = curTick;
+    symHoldoverArray[whihcArray][STATE_HLD_DDS] = curDds;
+    symHoldoverArray[whihcArray][STATE_HLD_OLD_DDS] = oldDds;
+    symHoldoverArray[whihcArray][STATE_HLD_PPS] = symStatusArray["1PPSDELTA"];
+    symHoldoverArray[whihcArray][STATE_HLD_LAST_PPS] = symStatusArray["LAST1PPSDELTA"];
+    symHoldoverArray[whihcArray][STATE_HLD_STATE] = hldState;
+
+
+#
+# Used to copy entire sections from one entry to another for Holdover array.
+#
+def shift_hold_details ( fromArray, toArray ):
+    global symHoldoverArray
+    
+    symHoldoverArray[toArray] = symHoldoverArray[fromArray];
+
+
+#
+# Use to reset an entry for the Holdover array
+#
+def reset_hold_details ( whihcArray ):
+    global symHoldoverArray
+    
+    symHoldoverArray[whihcArray] = [int(0),int(0),int(0),int(0),int(0),int(0),int(0)];
+  
+  
+#
+# This is used to calculate the slope and the DDS
+#
+# Credits: This was taken from Lady Heather from Mark Sims.
+# Looks like a variation be a Linear Extrapolation?
+#
+# Returned as a fractional frequency, PPS counts per second over the
+# crystal frequency.
+#
+def return_slope ( whichArray ):
+    global symSumsArray
+    
+    # Oops we reset the array and got here, it happens?
+    if ( symSumsArray[whichArray][STATE_POS_COUNTER] == 0 ):
+        return float(0.0);
+
+    return ireg_slope(symSumsArray[whichArray][STATE_POS_REG]) / symModelArray["CRYSTAL"];
+
+
+#
+# Standard error of the slope above, same units
+#
+def return_slope_error ( whichArray ):
+    global symSumsArray
+
+    return ireg_stderr(symSumsArray[whichArray][STATE_POS_REG]) / symModelArray["CRYSTAL"];
+
+
+#
+# True once the slope is known well enough to pick the DDS value, the
+# confidence interval is narrower than one DDS step.
+#
+def slope_settled ( whichArray ):
+    global symSumsArray
+
+    if ( symSumsArray[whichArray][STATE_POS_REG][IREG_SAMPLES] < DISCIPLINE_MIN_ENTRIES ):
+        return False;
+
+    halfWidth = DISCIPLINE_CONFIDENCE * return_slope_error(whichArray) / DDS_BASE_VALUE;
+    return ( halfWidth < (DDS_INCR_VALUE / 2) );
+
+
+#
+# Slope over just the last "window" seconds, same units as return_slope
+#
+def return_window_slope ( window ):
+    global symSlopes
+
+    return symSlopes.slope(window) / symModelArray["CRYSTAL"];
+
+
+#
+# The phase jumps when the tic counter is reset and no readings are taken
+# in holdover, the stability figures start a new segment
+#
+def restart_stability():
+    if ( symStability is not None ):
+        symStability.restart();
+
+
+###
+### Calculate slope
+###
+### This rountine is called at the start to determine the proper DDS value
+### so provide more consistent behaviour without hard coding it or pre-tuning
+### the Symmetricom.
+###
+### disciplineDuration is the number of samples to take.  With
+### DISCIPLINE_ADAPTIVE it is a budget instead, the run ends as soon as the
+### slope has settled and can go on to DISCIPLINE_MAX_FACTOR times it.
+###
+def calculate_slope( whichArray, inDdsValue, disciplineDuration ):
+    global ddsAdjValue, DDS_CAL_VALUE, DDS_BASE_VALUE, DDS_LOW_VALUE, DDS_INCR_VALUE
+    global symSumsArray, STATUS_LED
+
+
+
+    get_pps_delta();
+    get_status_message();
+    if ( inDdsValue == 0 ):
+        print ("Calculating a new DDS value ( 0.0 )..");
+        ddsAdjValue = inDdsValue;
+    else: 
+        print ( "Calculating DDS value with offSet (", dds_float(inDdsValue), ").." );
+        ddsAdjValue = inDdsValue;
+    
+    
+    print ("  Setting DDS to: ", dds_float(ddsAdjValue));
+    oldDdsAdjValue = ddsAdjValue;
+    set_dds_message( ddsAdjValue );
+    get_pps_delta();
+
+#   Should be used to get a proper start with current delta as 0 so we can 
+#   track drift properly. We could calcualte based on delta long term but 
+#   have to test
+#
+    print ("  Resetting PPS Delta to: 0 ");
+    set_tic_message( symStatusArray["1PPSDELTA"] );    
+    print ("    Waiting for PPS reset.", end="");
+    get_pps_delta();
+    retryTracker = 1;
+    while ( symStatusArray["1PPSDELTA"] != 0 ):
+        print (".", end="");
+        get_pps_delta();
+        time.sleep(1 / SIM_SPEEDUP);
+        if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):  
+            STATUS_LED.toggle();
+        retryTracker += 1;
+        if (retryTracker > 10):
+            set_tic_message( symStatusArray["1PPSDELTA"] );
+            retryTracker = 1;
+    print ("");
+    
+    loopTracker = 1;
+    valueTracker = 0;
+    valueCounter = int(0);
+
+    # Only this run's samples go into the slope
+    reset_pps_cal_entry(whichArray);
+
+    adaptive = ( DISCIPLINE_ADAPTIVE and (disciplineDuration > 0) );
+    entryLimit = disciplineDuration;
+    if ( adaptive ):
+        entryLimit = DISCIPLINE_MAX_FACTOR * disciplineDuration;
+
+    get_batch_messages("jp");
+    print ("  Start disciplining (", disciplineDuration, ")..");
+    symScheduler.add(TASK_SAMPLE, TASK_PRIO_PPS, tick_to_us(POLL_PPS), tick_to_us(POLL_PPS));
+
+    while ( (loopTracker) and (valueCounter < entryLimit) ):
+
+        symScheduler.wait(TASK_SAMPLE, idle_wait);
+        sampleTick = ticks_us();
+        get_batch_messages("jp");
+        if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):  
+            STATUS_LED.toggle();
+        pps_cal_list(whichArray, pps_rollover_correction(symStatusArray["1PPSDELTA"]), valueCounter);
+        
+        if ( symStatusArray["IFPGACTL"] & 0x0002 ):
+            print ("    Rubidium lock bad, exiting..");
+            loopTracker = 0;
+        elif ( abs(symStatusArray["DIFF1PPSDELTA"]) >= PPS_TRIGGER ):
+            print ("    PPS Spike / Loss detected, exiting..");
+            loopTracker = 0;
+        else:
+            valueTracker += pps_rollover_correction(symStatusArray["1PPSDELTA"]);
+            valueCounter = valueCounter + 1;
+            settled = ( adaptive and slope_settled(whichArray) );
+            symTiming.record("slope", ticks_diff(ticks_us(), sampleTick));
+            if ( settled ):
+                print ("    Slope settled after", valueCounter, "entries..");
+                break;
+
+            if ( (valueCounter % 200) == 0 ):
+                totalAverage = valueTracker / valueCounter;
+                slope = return_slope( whichArray );
+                print ("    Current Count: ", valueCounter, "-- current Delta: ", symStatusArray["1PPSDELTA"], "(", pps_rollover_correction(symStatusArray["1PPSDELTA"]), ")","-- Total Values:", valueTracker, "-- Average: ", totalAverage, "-- Slope: {:.5e}".format(slope) );
+            elif ( (valueCounter % 100) == 0 ):
+                print ("    Current Count: ", valueCounter, "-- current Delta: ", symStatusArray["1PPSDELTA"], "(", pps_rollover_correction(symStatusArray["1PPSDELTA"]), ")");
+
+            # wait() took the sample off the schedule, only put the next
+            # one on when there is going to be one
+            if ( valueCounter < entryLimit ):
+                symScheduler.repeat(TASK_SAMPLE);
+        
+    if ( loopTracker ):
+        if (valueCounter == 0):
+            totalAverage = 0.0;
+        else:
+            totalAverage = valueTracker / valueCounter;
+            
+        slope = return_slope( whichArray );
+        print ("  Total value: {:}  -- Entries: {:}  --Average: {:}  -- Slope: {:.5e} ({:.1e})".format(valueTracker, valueCounter, totalAverage, slope, return_slope_error( whichArray )) );
+        
+        # Convert this slope to entry compatible unit format for the command
+        # line, in tenths and rounded up to a whole DDS step
+        slope = return_slope( whichArray ) / DDS_BASE_VALUE;
+        ddsCheckVal = dds_fixed(slope);
+        
+        
+        if ( (ddsCheckVal % 2) == 1 ):
+            ddsCheckVal = ddsCheckVal + 1;
+            
+        ddsNewVal = ddsAdjValue + ddsCheckVal;
+        symSumsArray[whichArray][STATE_POS_COUNTER] = valueCounter;
+        symSumsArray[whichArray][STATE_POS_OLD_DDS] = oldDdsAdjValue;
+        symSumsArray[whichArray][STATE_POS_TIMESTAMP] = symPPScounter;
+
+        if (abs(ddsCheckVal) > DDS_INCR_FIXED):
+            print ("  Current DDS Value: ", dds_float(ddsAdjValue), "  -- DDS Offset: ", dds_float(ddsCheckVal), " -- New DDS Value: ", dds_float(ddsNewVal));
+            symSumsArray[whichArray][STATE_POS_DDS] = ddsNewVal;
+            ddsAdjValue = ddsNewVal;
+            
+            print ("    Setting DDS to: ", dds_float(ddsAdjValue));
+            set_dds_message( ddsAdjValue );
+        else:
+            symSumsArray[whichArray][STATE_POS_DDS] = oldDdsAdjValue;
+            print ("  The value of change is lower than 0.2 on the DDS, no change will be made..");
+  
+        get_pps_delta();
+        print ("  Resetting PPS Delta to: 0 ");
+        set_tic_message( symStatusArray["1PPSDELTA"] );    
+        print ("    Waiting for PPS reset.", end="");
+        get_pps_delta();
+        retryTracker = 1;
+        while ( symStatusArray["1PPSDELTA"] != 0 ):
+            print (".", end="");
+            get_pps_delta();
+            time.sleep(1 / SIM_SPEEDUP);
+            if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):  
+                STATUS_LED.toggle();
+            retryTracker += 1;
+            if (retryTracker > 10):
+                set_tic_message( symStatusArray["1PPSDELTA"] );
+                retryTracker = 1;
+        print ("");  
+
+        # The phase just jumped back to 0, start the windows over
+        symSlopes.clear();
+        restart_stability();
+        
+        return 0;
+    else:
+        print ("  Not enough data points something went wrong DDS Value not changed..");
+        return 1;
+            
+            
+#
+# Used to track the values returned by the 1PPS Delta
+# 
+# Tracking 1 second and store in the PPS array
+#
+#
+def track_pps_average( inValue ):
+    value = pps_rollover_correction(inValue);
+    
+    global symPPS
+    global symPPScounter, symStatusArray
+    
+    symPPS.push(value - symStatusArray["PPSOFFSET"]);
+    symPPScounter += 1;
+    
+    # Rollover handling
+    if (symPPScounter == PPS_ROLLOVER): symPPScounter = 0;
+    
+
+#
+# Used to addjust the DDS by 0.2 at a time
+#
+# I had code that tried to adjust for larger jumps but realized it
+# was mostly noise so we need a way to handle it.
+#                    
+def dds_check_and_adjust():
+    global symPPS
+    global symPPScounter, ddsAdjValue, ddsAdjValueOld
+
+    if (symPPScounter > DDS_CHECK_INTERVAL):
+        
+        ppsval = symPPS.window_sum(DDS_DRIFT_WINDOW);
+                   
+        if ( abs(ppsval) >= DDS_DRIFT_THRESHOLD ):
+            multval = int(round( ppsval/DDS_DRIFT_WINDOW/DDS_DRIFT_LIMIT, 0 ));
+ 
+# This code was removed if there is PPS spike it throws it off
+# too much there's probably a better way to do this!
+#
+# Values should be whole values and no fractions!
+#            if (abs(ppsval) > 1000):
+#                multval = 100;
+#            elif (abs(ppsval) > 100):
+#                multval = 10;
+#
+            
+            ddsAdjValueOld = ddsAdjValue;
+            ddsAdjValue = ddsAdjValue + ( multval * DDS_INCR_FIXED );
+        
+#            set_tic_message( symStatusArray["1PPSDELTA"] );
+            symStatusArray["PPSOFFSET"] = (pps_rollover_correction(symStatusArray["1PPSDELTA"]));
+            set_dds_message( ddsAdjValue );
+            
+            return 1;
+        else:
+            return 0;
+    else:
+        return 0;
+
+#
+# PI or Kalman engine in place of dds_check_and_adjust(), run every tick on
+# the phase the step adjuster would see
+#
+def engine_adjust():
+    global ddsAdjValue, ddsAdjValueOld
+
+    phase = (pps_rollover_correction(symStatusArray["1PPSDELTA"]) - symStatusArray["PPSOFFSET"]) / symModelArray["CRYSTAL"];
+    newDds = dds_fixed(symEngine.update(phase));
+    if ( newDds != ddsAdjValue ):
+        ddsAdjValueOld = ddsAdjValue;
+        ddsAdjValue = newDds;
+        set_dds_message( ddsAdjValue );
+        return 1;
+    return 0;
+
+
+#
+# Start of a PPS holdover, fits the drift model.  With no history of its
+# own yet (e.g. a warm start from an older checkpoint) the model is seeded
+# from the DISCIPLINE and UL_DISCIPLINE slots: the DDS value each ran at
+# plus its slope.
+#
+def holdover_begin():
+    if ( not len(symDrift.times) ):
+        seeds = [];
+        for whichArray in ( STATE_DISCIPLINE, STATE_UL_DISCIPLINE ):
+            if ( symSumsArray[whichArray][STATE_POS_COUNTER] > 0 ):
+                seeds.append(( symSumsArray[whichArray][STATE_POS_TIMESTAMP] - (symSumsArray[whichArray][STATE_POS_COUNTER] / 2),
+                               dds_float(symSumsArray[whichArray][STATE_POS_OLD_DDS]) + (return_slope(whichArray) / DDS_BASE_VALUE) ));
+        seeds.sort();
+        for when, value in seeds:
+            symDrift.add(when, value);
+
+    if ( symDrift.begin(symPPScounter) ):
+        print ("    Holdover model:", symDrift.report());
+    else:
+        print ("    No drift history, DDS held at", dds_float(ddsAdjValue));
+
+
+#
+# Scheduled DDS correction through a PPS holdover
+#
+def holdover_adjust( elapsed ):
+    global ddsAdjValue
+
+    if ( (symDrift.fitted is None) or (elapsed % HOLDOVER_STEP) ):
+        return 0;
+    newDds = dds_fixed(symDrift.holdover_dds(symPPScounter));
+    if ( newDds != ddsAdjValue ):
+        ddsAdjValue = newDds;
+        set_dds_message( ddsAdjValue );
+        return 1;
+    return 0;
+
+
+#
+# Saves everything needed to carry on disciplining after a restart
+#
+def save_checkpoint():
+    global symSumsArray, symHoldoverArray, symPPS, symPPScounter
+
+    ppsValues = [];
+    for age in range(symPPS.count - 1, -1, -1):
+        ppsValues.append(symPPS.recent(age));
+
+    checkpoint_save({ "S/N": symModelArray["S/N"],
+                      "PWRHRS": symStatusArray.get("PWRHRS"),
+                      "DDS": ddsAdjValue,
+                      "DDS_OLD": ddsAdjValueOld,
+                      "PPSOFFSET": symStatusArray["PPSOFFSET"],
+                      "PPSCOUNTER": symPPScounter,
+                      "PPS": ppsValues,
+                      "SUMS": symSumsArray,
+                      "HOLDOVER": symHoldoverArray,
+                      "DRIFT": symDrift.state() }, CHECKPOINT_FILE);
+
+
+#
+# Runs the saved DDS value for a short while and checks the PPS isn't
+# drifting away, returns 0 if it's good.
+#
+def verify_checkpoint( duration ):
+    verifyReg = ireg_new();
+    valueCounter = 0;
+
+    get_batch_messages("jp");
+    symScheduler.add(TASK_SAMPLE, TASK_PRIO_PPS, tick_to_us(POLL_PPS), tick_to_us(POLL_PPS));
+    while ( valueCounter < duration ):
+        symScheduler.wait(TASK_SAMPLE, idle_wait);
+        get_batch_messages("jp");
+        if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):
+            STATUS_LED.toggle();
+        if ( symStatusArray["IFPGACTL"] & 0x0002 ):
+            print ("    Rubidium lock bad..");
+            return 1;
+        if ( abs(symStatusArray["DIFF1PPSDELTA"]) >= PPS_TRIGGER ):
+            print ("    PPS Spike / Loss detected..");
+            return 1;
+        ireg_add(verifyReg, valueCounter, pps_rollover_correction(symStatusArray["1PPSDELTA"]));
+        valueCounter += 1;
+        if ( valueCounter < duration ):
+            symScheduler.repeat(TASK_SAMPLE);
+
+    slope = ireg_slope(verifyReg) / symModelArray["CRYSTAL"];
+    slopeError = ireg_stderr(verifyReg) / symModelArray["CRYSTAL"];
+    print ("  Verify slope: {:.4e} ({:.1e})".format(slope, slopeError));
+    if ( abs(slope) > ((CHECKPOINT_VERIFY_LIMIT * DDS_BASE_VALUE) + (3 * slopeError)) ):
+        return 1;
+    return 0;
+
+
+#
+# Picks up from the last checkpoint, returns 1 if the main loop can be
+# started straight away.  Even when the checkpoint doesn't verify its DDS
+# value is kept as the starting point for the full slope calculation.
+#
+def restore_checkpoint():
+    global symSumsArray, symHoldoverArray, symPPS, symPPScounter
+    global ddsAdjValue, ddsAdjValueOld
+
+    if ( not CHECKPOINT_FILE ):
+        return 0;
+    checkpoint = checkpoint_load(symModelArray["S/N"], symStatusArray.get("PWRHRS"), CHECKPOINT_MAX_HOURS, CHECKPOINT_FILE);
+    if ( checkpoint is None ):
+        return 0;
+
+    print ("Found checkpoint, verifying DDS value (", dds_float(checkpoint["DDS"]), ")..");
+    ddsAdjValue = checkpoint["DDS"];
+    set_dds_message( ddsAdjValue );
+    if ( verify_checkpoint(CHECKPOINT_VERIFY) ):
+        print ("  Checkpoint did not verify, running a full slope calculation..");
+        return 0;
+
+    ddsAdjValueOld = checkpoint["DDS_OLD"];
+    symStatusArray["PPSOFFSET"] = checkpoint["PPSOFFSET"];
+    symPPScounter = checkpoint["PPSCOUNTER"];
+    symSumsArray = checkpoint["SUMS"];
+    symHoldoverArray = checkpoint["HOLDOVER"];
+    if ( "DRIFT" in checkpoint ):
+        symDrift.restore(checkpoint["DRIFT"]);
+    symPPS.clear();
+    for value in checkpoint["PPS"]:
+        symPPS.push(value);
+    print ("  Checkpoint verified, resuming..");
+    return 1;
+
+
+#
+# Maiu function -- it all runs here!
+#
+#
+# "bootTick" is ticks_us() as early as the launcher could take it, for the
+# boot time report
+#
+def main( bootTick=None ):
+    global symPPS, symPPScounter, symBootTick, symMainTick
+    global symStatusArray, symSumsArray, symTelemetry, symStability, symMetrics, symScheduler, symEngine, symDrift
+
+    symMainTick = ticks_us();
+    symBootTick = bootTick;
+    if ( symBootTick is None ):
+        symBootTick = symMainTick;
+    platform_config();
+
+    # Enable Garbage Collection    
+    gc.enable();
+    setup_timing_request();
+    
+    # Obtain and intitialize all model information
+    platform_setup();
+    symScheduler = TimerScheduler(ticks_us, ticks_diff, sleep_us);
+    get_symmetricom_model();
+    get_status_message();
+    redefine_constants();
+    set_control_reg_message(0);
+
+    print ("Model:", symModelArray["MODELTEXT"], "-- S/N:", symModelArray["S/N"], "-- Service Pin:", symModelArray["SRVC"] ) ;
+    symDrift = DriftModel(symModelArray["CRYSTAL"]);
+    
+    # Inititalize
+    symStatusArray["1PPSDELTA"] = 0;
+    symStatusArray["PPSOFFSET"] = 0;
+
+    if ( symStatusArray["IFPGACTL"] & 0x0002 ):
+        print ("Rubidium lock is bad, wait until lock is good.",end="");
+        while ( symStatusArray["IFPGACTL"] & 0x0002):
+            print (".",end=""); 
+            get_control_reg_message();
+            time.sleep(2 / SIM_SPEEDUP);
+            if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):  
+                STATUS_LED.toggle();
+        print ("");
+    else:
+        print ("Rubidium lock is good.");
+
+    # Warm start if the last run left a checkpoint for this oscillator,
+    # the tic counter is left alone so the phase carries on
+    if ( not restore_checkpoint() ):
+        # Used to reset the tic counter
+        # Reports this maybe an issue on larger value drifts.
+        set_tic_message( "5FFFFFF90" );
+#        set_tic_message( "90" );
+        get_pps_delta();
+    
+        # Initial disciplining
+        while ( calculate_slope(STATE_INITIAL, ddsAdjValue, DISCIPLINE_ENTRIES) ):
+#        while ( calculate_slope(STATE_INITIAL, ddsAdjValue, 0) ):
+            print ("Failed Slope calculation, restarting..");
+        
+
+    get_status_message();
+    print ("-------------------------");
+    print ("Model: ", symModelArray);
+    print ("Health: ", symStatusArray);
+    print ("-------------------------");
+    print ("Starting Main Loop");
+    timeTracker = get_current_tick();
+
+    if ( TELEMETRY_FILE ):
+        from gpsdro.telemetry import TelemetryWriter
+
+        symTelemetry = TelemetryWriter(TELEMETRY_FILE);
+    if ( METRICS_PORT ):
+        from gpsdro.metrics import MetricsSnapshot, MetricsServer
+
+        symMetrics = MetricsServer(MetricsSnapshot());
+        symMetrics.listen(METRICS_PORT);
+        print ("Metrics on port", METRICS_PORT);
+    if ( STABILITY_TAUS ):
+        from gpsdro.stability import StabilityTracker
+
+        symStability = StabilityTracker(symModelArray["CRYSTAL"], STABILITY_TAUS);
+    if ( CONTROL_ENGINE == "pi" ):
+        from gpsdro.control import PIEngine
+
+        symEngine = PIEngine(CONTROL_TIME_CONSTANT, PI_DAMPING);
+    elif ( CONTROL_ENGINE == "kalman" ):
+        from gpsdro.control import KalmanEngine
+
+        symEngine = KalmanEngine(CONTROL_TIME_CONSTANT, measurement=KALMAN_MEASUREMENT);
+    if ( symEngine is not None ):
+        print ("Control engine:", CONTROL_ENGINE);
+        symEngine.reset(dds_float(ddsAdjValue));
+    
+    pollUs = tick_to_us(POLL_PPS);
+    symScheduler.add(TASK_PPS, TASK_PRIO_PPS, pollUs, pollUs);
+    symScheduler.add(TASK_HEALTH, TASK_PRIO_HEALTH, 5*pollUs);
+    if ( symEngine is None ):
+        symScheduler.add(TASK_DDS, TASK_PRIO_DDS, tick_to_us(POLL_DDS_OFFSET + (DDS_CHECK_INTERVAL*POLL_PPS)));
+    loopTracker = 1;
+    holdOverState = HLD_STATE_OFF;
+    holdOverTime = 0;
+    healthFresh = 0;
+
+    #  This is the "tick" loop where all the tracking and processing occurs,
+    #  it sleeps until the next task is due
+    while loopTracker:
+
+        task = symScheduler.next(idle_wait);
+
+        # 1 PPS processing -- on a fixed grid, how late it runs goes in
+        # the "late" histogram
+        if ( task == TASK_PPS ):
+            symTiming.record("late", symScheduler.late);
+            symScheduler.repeat(TASK_PPS);
+
+            # Lock status comes with every delta, the health dump rides
+            # along on the tick before it is due to be displayed
+            if ( symScheduler.remaining(TASK_HEALTH) < pollUs ):
+                get_batch_messages("jpw");
+                healthFresh = 1;
+                symScheduler.at(TASK_HEALTH, 0);
+            else:
+                get_batch_messages("jp");
+            if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):  
+                STATUS_LED.toggle();
+
+            if ( symTelemetry is not None ):
+                symTelemetry.tick(symPPScounter, symStatusArray["1PPSDELTA"], pps_rollover_correction(symStatusArray["1PPSDELTA"]),
+                                  symStatusArray["PPSOFFSET"], dds_float(ddsAdjValue), holdOverState, symStatusArray["IFPGACTL"] & 0x0002);
+
+#
+# This is the rough holdover code I put in for now, there's more than can be
+# done here this is just a place holder.
+#
+#
+            if ( holdOverState  == HLD_STATE_OFF ):
+                if ( symStatusArray["IFPGACTL"] & 0x0002 ):
+                    print ("*** Rubidium lock bad, going into Holdover..");
+                    record_hold_details ( STATE_HOLD_START, symPPScounter, ddsAdjValue, ddsAdjValueOld, HLD_STATE_OFF );
+                    holdOverState = HLD_STATE_RB_LOCK;
+                    holdOverTime = symPPScounter;
+                    restart_stability();
+                    symDrift.restart();
+                    track_pps_average(0);
+                    continue;
+                elif ( abs(symStatusArray["DIFF1PPSDELTA"]) >= PPS_TRIGGER ):
+                    print ("*** PPS Spike / Loss detected, going into Holdover....");
+                    record_hold_details ( STATE_HOLD_START, symPPScounter, ddsAdjValue, ddsAdjValueOld, HLD_STATE_OFF );
+                    holdOverState = HLD_STATE_START;
+                    holdOverTime = symPPScounter;
+                    restart_stability();
+                    holdover_begin();
+                    track_pps_average(0);
+                    continue;
+            elif ( holdOverState == HLD_STATE_START ):
+                if ( symStatusArray["IFPGACTL"] & 0x0002 ):
+                    holdOverState = HLD_STATE_RB_LOCK;
+                elif ( abs(symStatusArray["DIFF1PPSDELTA"]) >= PPS_TRIGGER ):
+                    print ("*** PPS is back after", symPPScounter - holdOverTime, "s, time error bound {:.1f} ns".format(symDrift.time_error_bound(symPPScounter - holdOverTime) * 1e9));
+                    holdOverState = HLD_STATE_OFF;
+                    reset_pps_cal_entry(STATE_CALCSLOPE);
+                    reset_hold_details ( STATE_HOLD_START );
+                    if ( symEngine is not None ):
+                        symEngine.reset(dds_float(ddsAdjValue));
+                else:
+                    # Keep the DDS on the learned drift
+                    holdover_adjust(symPPScounter - holdOverTime);
+                
+                track_pps_average(0);
+                continue;
+            elif ( holdOverState == HLD_STATE_RB_LOCK ):
+                if ( not(symStatusArray["IFPGACTL"] & 0x0002) ):
+                    print ("*** Rubidium lock is good, leaving Holdover....");
+                    while ( calculate_slope(STATE_HOLDOVER, ddsAdjValue, DISCIPLINE_ENTRIES) ):
+                        print ("Failed Slope calculation, restarting..");
+
+                    reset_pps_cal_entry(STATE_CALCSLOPE);
+                    reset_hold_details ( STATE_HOLD_START );
+
+                    for retryTracker in range(DDS_DRIFT_WINDOW):
+                        symPPS.push(0);
+
+                    # The tic counter was just reset, the drift sample and
+                    # the engine start over
+                    symDrift.restart();
+                    if ( symEngine is not None ):
+                        symStatusArray["PPSOFFSET"] = 0;
+                        symEngine.reset(dds_float(ddsAdjValue));
+                        
+                    holdOverState = HLD_STATE_OFF;
+                    holdOverTime = 0;
+                continue;
+
+            # Rollover handling 
+            if( symSumsArray[STATE_RUNNING][STATE_POS_COUNTER]+1 > PPS_ROLLOVER):
+                reset_pps_cal_entry(STATE_RUNNING);
+
+            if( symSumsArray[STATE_CALCSLOPE][STATE_POS_COUNTER]+1 > PPS_ROLLOVER):
+                reset_pps_cal_entry(STATE_CALCSLOPE);
+
+            ppsDelta = pps_rollover_correction(symStatusArray["1PPSDELTA"]);
+            pps_cal_list(STATE_RUNNING, ppsDelta, symSumsArray[STATE_RUNNING][STATE_POS_COUNTER]+1);
+            pps_cal_list(STATE_CALCSLOPE, ppsDelta, symSumsArray[STATE_CALCSLOPE][STATE_POS_COUNTER]+1);
+            symSlopes.push(ppsDelta);
+            if ( symStability is not None ):
+                symStability.push(ppsDelta);
+            track_pps_average(symStatusArray["1PPSDELTA"]);
+            symDrift.tick(symPPScounter, ppsDelta, ddsAdjValue);
+
+            if ( symEngine is not None ):
+                ddsTick = ticks_us();
+                engine_adjust();
+                symTiming.record("dds", ticks_diff(ticks_us(), ddsTick));
+
+            if ( CHECKPOINT_FILE and ((symPPScounter % CHECKPOINT_INTERVAL) == 0) ):
+                save_checkpoint();
+
+        #
+        # This is where the DDS adjustment occurs - This uses the brute force 
+        # method, we will see how well this works and may switch over to using 
+        # the CALCSLOPE values in the long term
+        #                    
+        elif ( task == TASK_DDS ):
+
+#
+# Don't adjust anything in holdover state
+#
+            if ( holdOverState ):
+                symScheduler.at(TASK_DDS, (DDS_DRIFT_WINDOW*2)*pollUs);
+                continue;
+                
+            ddsTick = ticks_us();
+            adjusted = dds_check_and_adjust();
+            symTiming.record("dds", ticks_diff(ticks_us(), ddsTick));
+            if ( adjusted ):
+                symScheduler.at(TASK_DDS, (DDS_DRIFT_WINDOW*2)*pollUs);
+
+                # We will consider any adjustment that exceeds 
+                # DISCIPLINE_ENTRIES period as the last disciplined value. 
+                if  ( (symSumsArray[STATE_CALCSLOPE][STATE_POS_COUNTER]) >= (DISCIPLINE_ENTRIES) ):
+                    if  ( (symSumsArray[STATE_CALCSLOPE][STATE_POS_COUNTER]) >= (2*DISCIPLINE_ENTRIES) ):
+                        shift_pps_cal_entry(STATE_CALCSLOPE,STATE_UL_DISCIPLINE);
+                        symSumsArray[STATE_UL_DISCIPLINE][STATE_POS_DDS] = ddsAdjValue;
+                        symSumsArray[STATE_UL_DISCIPLINE][STATE_POS_OLD_DDS] = ddsAdjValueOld;
+                        symSumsArray[STATE_UL_DISCIPLINE][STATE_POS_TIMESTAMP] = symPPScounter;
+                    else:
+                        shift_pps_cal_entry(STATE_CALCSLOPE,STATE_DISCIPLINE);
+                        symSumsArray[STATE_DISCIPLINE][STATE_POS_DDS] = ddsAdjValue;
+                        symSumsArray[STATE_DISCIPLINE][STATE_POS_OLD_DDS] = ddsAdjValueOld;
+                        symSumsArray[STATE_DISCIPLINE][STATE_POS_TIMESTAMP] = symPPScounter;
+
+                # We will condier any adjustment that is shoter than 
+                # DISCIPLINE_ENTRIES period as the last holdover value. 
+                if  ( (symSumsArray[STATE_CALCSLOPE][STATE_POS_COUNTER]) < (DISCIPLINE_ENTRIES) ):
+                    if  ( (symSumsArray[STATE_CALCSLOPE][STATE_POS_COUNTER]) < (DISCIPLINE_ENTRIES/2)):
+                        shift_pps_cal_entry(STATE_CALCSLOPE, STATE_US_DISCIPLINE);
+                        symSumsArray[STATE_US_DISCIPLINE][STATE_POS_DDS] = ddsAdjValue;
+                        symSumsArray[STATE_US_DISCIPLINE][STATE_POS_OLD_DDS] = ddsAdjValueOld;
+                        symSumsArray[STATE_US_DISCIPLINE][STATE_POS_TIMESTAMP] = symPPScounter;
+
+                    else:
+                        shift_pps_cal_entry(STATE_CALCSLOPE, STATE_S_DISCIPLINE);
+                        symSumsArray[STATE_S_DISCIPLINE][STATE_POS_DDS] = ddsAdjValue;
+                        symSumsArray[STATE_S_DISCIPLINE][STATE_POS_OLD_DDS] = ddsAdjValueOld;
+                        symSumsArray[STATE_S_DISCIPLINE][STATE_POS_TIMESTAMP] = symPPScounter;
+
+                reset_pps_cal_entry(STATE_CALCSLOPE);
+            else:
+                symScheduler.at(TASK_DDS, DDS_CHECK_INTERVAL*pollUs);
+                
+        # Display stuff here lowest priority to everything
+        elif ( task == TASK_HEALTH ):
+            if ( not healthFresh ):
+                get_status_message();
+            healthFresh = 0;
+            symScheduler.at(TASK_HEALTH, 10*pollUs);
+
+            if ( symTelemetry is not None ):
+                symTelemetry.health_record(symPPScounter, symStatusArray.get("DCURTEMP", 0.0), symStatusArray.get("DMP17", 0.0), symStatusArray.get("DHTRVOLT", 0.0));
+            
+            rblock = "Good";
+            if (symStatusArray["IFPGACTL"] & 0x0002): rblock = "Bad";
+            
+            holdState = "False";
+            if (holdOverState): holdState = "True";
+            
+            slopeR = return_slope( STATE_RUNNING );
+            slopeC = return_slope( STATE_CALCSLOPE );
+            dSums =  symPPS.window_sum(DDS_DRIFT_WINDOW);
+
+# Model: SA22C               HoldOver: False         Service Pin: LOW
+# S/N: 123456789-H           Crystal:     60000000   In Voltage: 14.88893
+# Rb Lock: Good              Current Temp:   54.25   Lamp Voltage: 13.52071
+# PPS Delta: 5999999 ( -1)   Adjusted:     4 ( -5)   Counter: 383624
+# R Slope: 5.3234e-12 (1.2e-14)   P.Hours:       123456   P.Ticks: 12345678
+# C Slope: -2.2213e-11 (3.1e-13)   DDS Adjust:     -10.2   Averages: 1.0e-11
+# W Slope: 100s 1.2e-11   1000s 3.4e-12   10000s* 5.6e-13
+# ADEV: 1s 2.1e-10   10s 2.3e-11   100s 3.0e-12   MTIE 100s 4.2e-08   TIE 1.1e-07
+
+            if ( SYSTEM_DATA.sysname.find("Linux") < 0 ):
+                print("-- GC Memory Alloc:", gc.mem_alloc(), "GC Memory Free:", gc.mem_free(), "GC Collected:", gc.collect());
+            print ("Model: {:18}   HoldOver: {:11}   Service: {}".format( symModelArray["MODELTEXT"], holdState,symModelArray["SRVC"]) );
+            print ("S/N: {:20}   Crystal: {:12}   In Voltage: {}".format( symModelArray["S/N"], symModelArray["CRYSTAL"], symStatusArray["DHTRVOLT"]) );
+            print ("Rb Lock: {:16}   Current Temp: {:7.4}   Lamp Voltage: {:}".format( rblock, symStatusArray["DCURTEMP"], symStatusArray["DMP17"]) ) ;
+            print ("PPS Delta: {:8} ({:3})   Adjusted: {:5} ({:3})   Counter: {}".format(symStatusArray["1PPSDELTA"], pps_rollover_correction(symStatusArray["1PPSDELTA"]), pps_rollover_correction(symStatusArray["1PPSDELTA"]) - symStatusArray["PPSOFFSET"], symStatusArray["PPSOFFSET"], symPPScounter));
+            print ("R Slope: {:.4e} ({:.1e})   P.Hours: {:12}   P.Ticks: {:}".format(slopeR, return_slope_error(STATE_RUNNING), symStatusArray["PWRHRS"], symStatusArray["PWRTICKS"]) );
+            print ("C Slope: {:.4e} ({:.1e})   DDS Adjust: {:9}   Averages: {:}".format(slopeC, return_slope_error(STATE_CALCSLOPE), dds_float(ddsAdjValue), dSums/DDS_DRIFT_WINDOW) );
+            windowText = "";
+            for window in SLOPE_WINDOWS:
+                partial = "*";
+                if ( symSlopes.full(window) ): partial = "";
+                windowText += "{}s{} {:.1e}   ".format(window, partial, return_window_slope(window));
+            print ("W Slope: {}".format(windowText.strip()) );
+            if ( symStability is not None ):
+                stabilityText = "";
+                for tau in STABILITY_TAUS:
+                    stabilityText += "{}s {:.1e}   ".format(tau, symStability.adev(tau));
+                print ("ADEV: {}MTIE {}s {:.1e}   TIE {:.1e}".format(stabilityText, max(STABILITY_TAUS), symStability.mtie(max(STABILITY_TAUS)), symStability.tie()) );
+            if ( symEngine is not None ):
+                print ("Engine: {}".format(symEngine.report()) );
+            if ( holdOverState == HLD_STATE_START ):
+                print ("Holdover: {}s   TE bound: {:.1f} ns   Model: {}".format(symPPScounter - holdOverTime, symDrift.time_error_bound(symPPScounter - holdOverTime) * 1e9, symDrift.report()) );
+            print ("Serial: {}".format(symTransport.stats.report()) );
+            print("Sum Array: ", symSumsArray);
+            if ( timing_dump_requested() ):
+                print_timing();
+            if ( symMetrics is not None ):
+                update_metrics(holdOverState);
+        elif ( task is None ):
+            loopTracker = 0;
+        
+
+    # Flush before quitting.
+    get_serial_data(RUBIDIUM, 0);
+
+
+#
+# Called on the way out, Ctrl-C included.  The last telemetry batch is
+# only in memory until it is written.
+#
+def shutdown():
+    if ( symTelemetry is not None ):
+        symTelemetry.close();
@@ -0,0 +1,542 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Emulator
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Linux only -- this opens a pseudo-terminal and answers like a Symmetricom
+# SA.22c, X72 or X99 would so gpsdro-symmetricom.py can be run and timed
+# without a unit on the bench.
+#
+#   python3 -m gpsdro.emulator --model sa22c --speedup 100 --link /tmp/ttySYM
+#   GPSDRO_PORT=/tmp/ttySYM GPSDRO_SPEEDUP=100 python3 gpsdro-symmetricom.py
+#
+# The oscillator model (SymOscillator) has no I/O in it so it can also be
+# driven directly from other tools.  EmulatedPort answers the same way in
+# process on a virtual clock, for the tests and simulations that talk to
+# an oscillator without a pseudo-terminal or waiting for the wall clock.
+#
+import os
+import sys
+import time
+import math
+import random
+import struct
+import select
+import signal
+import termios
+import threading
+import tty
+
+SYM_SA22C			= 22
+SYM_X72				= 72
+SYM_X99				= 99
+
+EMU_CRYSTAL			= 60000000
+EMU_DDS_BASE		= 1e-11
+EMU_LOCK_BAD		= 0x0002
+
+# Arguments for k/f/q are finished by CR/LF, the next command or this idle gap
+EMU_ARG_TIMEOUT		= 0.02
+EMU_ARG_CHARS		= b"0123456789ABCDEF.+-"
+EMU_QUERY_CMDS		= b"iwjp"
+
+# Read timeout of an EmulatedPort, the idle gap gpsdro.transport frames on
+EMU_READ_TIMEOUT	= 0.02
+
+EMU_MODELS			= { "sa22c": SYM_SA22C, "x72": SYM_X72, "x99": SYM_X99 }
+
+# Banner text, firmware version and date for the "i" command
+EMU_BANNERS			= {
+    SYM_SA22C: ( "SA.22c by Symmetricom, Copyright 2005-2009", "1.08", "11/18/09" ),
+    SYM_X72: ( "X72 by Symmetricom, Copyright 2003-2008", "1.10", "08/12/08" ),
+    SYM_X99: ( "X 99 by Symmetricom, Copyright 2009", "2.02", "03/27/09" ),
+}
+
+
+#
+# Symmetricom floats come out as the 8 hex digits of the IEEE single with a
+# trailing "." on the SA.22c and X72.
+#
+def hex_float( value ):
+    return "{:08X}.".format(struct.unpack('>I', struct.pack('>f', value))[0]);
+
+
+#
+# Rubidium oscillator and GPS 1PPS model.
+#
+# Phase is kept in crystal counts of internal 1PPS against the external 1PPS,
+# a fast oscillator pulls the delta register down, a positive DDS value pulls
+# it down further which is what the discipliner expects.
+#
+# Everything is advanced one PPS edge at a time through second().
+#
+class SymOscillator:
+
+    def __init__( self, model=SYM_SA22C, seed=None, freqOffset=7.42e-10, aging=5e-13,
+                  randomWalk=2e-14, sawtooth=10e-9, jitter=2e-9,
+                  dropoutRate=0.0, dropoutLength=30, unlockRate=0.0, unlockLength=120,
+                  unlockOffset=5e-8, serialCode="0A1B2C3D" ):
+        self.rand = random.Random(seed);
+        self.model = model;
+        self.crystal = EMU_CRYSTAL;
+        self.serialCode = serialCode;
+
+        # Frequency model, fractional units, aging is per day
+        self.freqOffset = freqOffset;
+        self.aging = aging;
+        self.randomWalk = randomWalk;
+        self.walk = 0.0;
+        self.dds = 0.0;
+
+        # GPS PPS model, seconds
+        self.sawtooth = sawtooth;
+        self.sawRate = 0.2137 + self.rand.random() * 0.01;
+        self.sawPhase = self.rand.random();
+        self.jitter = jitter;
+
+        # Fault model, rates are per second
+        self.dropoutRate = dropoutRate;
+        self.dropoutLength = dropoutLength;
+        self.unlockRate = unlockRate;
+        self.unlockLength = unlockLength;
+        self.unlockOffset = unlockOffset;
+        self.dropout = 0;
+        self.unlocked = 0;
+
+        self.simTime = 0;
+        self.powerHours = 20000 + self.rand.randrange(20000);
+        self.phase = 0.0;
+        self.register = 0;
+        self.frozen = 0;
+        self.ctlReg = 0;
+
+    #
+    # Current total fractional frequency error of the 1PPS derived from the
+    # crystal against the external 1PPS
+    #
+    def frequency( self ):
+        freq = self.freqOffset + self.walk + (self.aging * self.simTime / 86400) + (self.dds * EMU_DDS_BASE);
+        if (self.unlocked): freq += self.unlockOffset;
+        return freq;
+
+    #
+    # GPS receiver noise on the external 1PPS, sawtooth plus some white jitter
+    # in crystal counts
+    #
+    def gps_noise( self ):
+        self.sawPhase = (self.sawPhase + self.sawRate) % 1.0;
+        noise = self.sawtooth * (2.0 * self.sawPhase - 1.0) + self.rand.gauss(0.0, self.jitter);
+        return noise * self.crystal;
+
+    #
+    # Temperature follows a slow cycle like an equipment room does
+    #
+    def temperature( self ):
+        return 54.25 + 0.6 * math.sin(2.0 * math.pi * self.simTime / 21600.0);
+
+    #
+    # Advance a single PPS edge
+    #
+    def second( self ):
+        if (self.randomWalk):
+            self.walk += self.rand.gauss(0.0, self.randomWalk);
+        self.phase -= self.frequency() * self.crystal;
+        self.simTime += 1;
+
+        if (self.unlocked):
+            self.unlocked -= 1;
+        elif (self.unlockRate and (self.rand.random() < self.unlockRate)):
+            self.unlocked = self.unlockLength;
+
+        if (self.dropout):
+            self.dropout -= 1;
+        elif (self.dropoutRate and (self.rand.random() < self.dropoutRate)):
+            self.dropout = self.dropoutLength;
+            # With no external edge the register holds whatever it last latched
+            self.frozen = int(self.register + (self.crystal / 3)) % self.crystal;
+
+        if (self.dropout):
+            self.register = self.frozen;
+        else:
+            self.register = int(round(self.phase + self.gps_noise())) % self.crystal;
+
+    #
+    # "k" clears the delta register, it reads 0 until the next edge latches
+    #
+    def reset_tic( self ):
+        self.phase = 0.0;
+        self.register = 0;
+
+    def set_dds( self, value ):
+        self.dds = value;
+
+    def set_control( self, value ):
+        self.ctlReg = value & ~EMU_LOCK_BAD;
+
+    def control( self ):
+        if (self.unlocked):
+            return self.ctlReg | EMU_LOCK_BAD;
+        return self.ctlReg;
+
+    #
+    # Health values as (name, kind, value), kind is "x" for the always hex
+    # registers, "i" for integers and "f" for floats.
+    #
+    def health( self ):
+        temp = self.temperature();
+        gauss = self.rand.gauss;
+        return ( ( "IFPGACTL", "x", self.control() ),
+                 ( "DMP17", "f", 13.52 + gauss(0.0, 0.002) ),
+                 ( "DMP5", "f", 5.01 + gauss(0.0, 0.001) ),
+                 ( "DHTRVOLT", "f", 14.89 - 0.35 * (temp - 54.25) + gauss(0.0, 0.002) ),
+                 ( "DLVTHERM", "f", 3.87 + gauss(0.0, 0.001) ),
+                 ( "DLVOUT", "f", 7.21 + gauss(0.0, 0.002) ),
+                 ( "DRVTHERM", "f", 4.02 + gauss(0.0, 0.001) ),
+                 ( "DRVOUT", "f", 6.95 + gauss(0.0, 0.002) ),
+                 ( "DCURTEMP", "f", temp + gauss(0.0, 0.01) ),
+                 ( "DCIPLOCK", "i", 0 if self.unlocked else 1 ),
+                 ( "PWRHRS", "i", self.powerHours + (self.simTime // 3600) ),
+                 ( "PWRTICKS", "i", self.simTime % 3600 ),
+                 ( "LMPSTRTS", "i", 3 ) );
+
+
+#
+# Response bytes of one command to the oscillator, carried out on it
+#
+def command_response( osc, cmd, arg ):
+    hexModel = (osc.model != SYM_X99);
+
+    if (cmd == "i"):
+        banner = EMU_BANNERS[osc.model];
+        if (hexModel):
+            crystal = "{:X}.0Hz".format(osc.crystal);
+        else:
+            crystal = "{:d}Hz".format(osc.crystal);
+        lines = ( banner[0],
+                  "Version " + banner[1] + " of " + banner[2],
+                  "Serial Code is " + osc.serialCode + "-H, Beverly, MA",
+                  "Crystal: " + crystal + ", Ctl Reg: {:04X}, Tic: 0".format(osc.control()),
+                  "1PPS: ON, Srvc: LOW, FC: 00000000" );
+    elif (cmd == "w"):
+        lines = [];
+        for name, kind, value in osc.health():
+            if (kind == "x"):
+                text = "{:04X}".format(value);
+            elif (kind == "f"):
+                text = hex_float(value) if hexModel else "{:.5f}".format(value);
+            else:
+                text = "{:X}".format(value) if hexModel else str(value);
+            lines.append(name + ": " + text);
+    elif (cmd == "j"):
+        if (hexModel):
+            lines = ( "1PPS Delta Reg: {:X}".format(osc.register), );
+        else:
+            lines = ( "1PPS Delta Reg: {:d}".format(osc.register), );
+    elif (cmd == "p"):
+        lines = ( "Control Reg: {:04X}".format(osc.control()), );
+    elif (cmd == "k"):
+        osc.reset_tic();
+        lines = ();
+    elif (cmd == "f"):
+        try:
+            osc.set_dds(float(arg));
+        except ValueError:
+            pass;
+        lines = ();
+    elif (cmd == "q"):
+        try:
+            osc.set_control(int(arg, 16));
+        except ValueError:
+            pass;
+        lines = ();
+    else:
+        lines = ();
+
+    return "".join([line + "\r\n" for line in lines]).encode("ascii");
+
+
+#
+# Pseudo-terminal front end that speaks the Symmetricom command set.
+#
+# speedup   -- simulated seconds per wall clock second
+# stepped   -- ignore the wall clock, every "j" is one PPS edge
+# queued    -- False emulates firmware that drops commands sent while busy
+# baudrate  -- only answer when the port is opened at this rate
+# latency   -- seconds before the unit starts answering a query
+#
+class SymEmulator:
+
+    def __init__( self, oscillator, speedup=1.0, stepped=False, queued=True, baudrate=None, latency=0.0 ):
+        self.osc = oscillator;
+        self.speedup = float(speedup);
+        self.stepped = stepped;
+        self.queued = queued;
+        self.baudrate = baudrate;
+        self.latency = latency;
+
+        self.masterFd, self.slaveFd = os.openpty();
+        # Keep our own slave open so the client can close and re-open the
+        # port (baud probing) without the master side seeing a hangup
+        tty.setraw(self.slaveFd);
+        self.port = os.ttyname(self.slaveFd);
+
+        self.startTime = time.monotonic();
+        self.cmd = None;
+        self.arg = bytearray();
+        self.running = False;
+        self.counts = {};
+
+    #
+    # Bring the oscillator up to the current simulated time
+    #
+    def sync( self ):
+        if (self.stepped):
+            return;
+        target = int((time.monotonic() - self.startTime) * self.speedup);
+        while (self.osc.simTime < target):
+            self.osc.second();
+
+    #
+    # The slave termios is shared with whoever has the port open
+    #
+    def baud_matches( self ):
+        if (self.baudrate is None):
+            return True;
+        speed = termios.tcgetattr(self.slaveFd)[5];
+        return speed == getattr(termios, "B" + str(self.baudrate));
+
+    def response( self, cmd, arg ):
+        data = command_response(self.osc, cmd, arg);
+        if (self.stepped and (cmd == "j")):
+            self.osc.second();
+        return data;
+
+    #
+    # Run the pending command, returns 1 if something was executed
+    #
+    def finish( self ):
+        if (self.cmd is None):
+            return 0;
+
+        cmd = self.cmd;
+        arg = self.arg.decode("ascii");
+        self.cmd = None;
+        self.arg = bytearray();
+
+        if (not self.baud_matches()):
+            return 1;
+
+        self.sync();
+        self.counts[cmd] = self.counts.get(cmd, 0) + 1;
+        data = self.response(cmd, arg);
+        if (data):
+            if (self.latency):
+                time.sleep(self.latency);
+            os.write(self.masterFd, data);
+        return 1;
+
+    #
+    # Commands are single lower case letters, anything after them from the
+    # argument set belongs to that command
+    #
+    def feed( self, data ):
+        executed = 0;
+
+        for c in data:
+            if ((not self.queued) and executed):
+                break;
+            if (0x61 <= c <= 0x7a):
+                executed += self.finish();
+                self.cmd = chr(c);
+                if (c in EMU_QUERY_CMDS):
+                    executed += self.finish();
+            elif (c == 0x0d or c == 0x0a):
+                executed += self.finish();
+            elif ((self.cmd is not None) and (c in EMU_ARG_CHARS)):
+                self.arg.append(c);
+
+    def serve_forever( self ):
+        self.running = True;
+        while (self.running):
+            if (self.cmd is None):
+                timeout = 0.1;
+            else:
+                timeout = EMU_ARG_TIMEOUT;
+            try:
+                readable = select.select([self.masterFd], [], [], timeout)[0];
+            except (OSError, ValueError):
+                break;
+            if (readable):
+                try:
+                    data = os.read(self.masterFd, 1024);
+                except OSError:
+                    data = b"";
+                self.feed(data);
+            else:
+                self.finish();
+
+    #
+    # Run in a background thread, handy for in process benchmarks
+    #
+    def start( self ):
+        thread = threading.Thread(target=self.serve_forever, daemon=True);
+        thread.start();
+        return thread;
+
+    def stop( self ):
+        self.running = False;
+
+    def close( self ):
+        self.running = False;
+        os.close(self.masterFd);
+        os.close(self.slaveFd);
+
+
+#
+# The pyserial port calls the discipliner makes, answered in process on a
+# virtual clock, anything with monotonic() and sleep() in seconds.  The
+# oscillator is brought up to the clock's time when a command is written
+# and the response is there straight away.  An empty read takes the
+# port's read timeout on the clock, like a real one, so a caller waiting
+# for the next PPS edge moves time on.
+#
+class EmulatedPort:
+
+    def __init__( self, oscillator, clock, timeout=EMU_READ_TIMEOUT ):
+        self.osc = oscillator;
+        self.clock = clock;
+        self.timeout = timeout;
+        self.pending = bytearray();
+        self.counts = {};
+
+    def write( self, data ):
+        cmds = [];
+        for c in data:
+            if (0x61 <= c <= 0x7a):
+                cmds.append([chr(c), bytearray()]);
+            elif (len(cmds) and (c in EMU_ARG_CHARS)):
+                cmds[-1][1].append(c);
+
+        target = int(self.clock.monotonic());
+        while (self.osc.simTime < target):
+            self.osc.second();
+        for cmd, arg in cmds:
+            self.counts[cmd] = self.counts.get(cmd, 0) + 1;
+            self.pending += command_response(self.osc, cmd, arg.decode("ascii"));
+        return len(data);
+
+    @property
+    def in_waiting( self ):
+        return len(self.pending);
+
+    def readinto( self, buffer ):
+        if (not self.pending):
+            self.clock.sleep(self.timeout);
+            return 0;
+        count = min(len(buffer), len(self.pending));
+        buffer[:count] = self.pending[:count];
+        del self.pending[:count];
+        return count;
+
+    def read( self, size=1 ):
+        buffer = bytearray(size);
+        return bytes(buffer[:self.readinto(buffer)]);
+
+    def readline( self ):
+        if (not self.pending):
+            self.clock.sleep(self.timeout);
+            return b"";
+        end = self.pending.find(b"\n");
+        if (end < 0):
+            end = len(self.pending) - 1;
+        line = bytes(self.pending[:end+1]);
+        del self.pending[:end+1];
+        return line;
+
+    def reset_input_buffer( self ):
+        self.pending = bytearray();
+
+    def flush( self ):
+        pass;
+
+    def close( self ):
+        pass;
+
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Symmetricom rubidium oscillator emulator on a pseudo-terminal");
+    parser.add_argument("--model", choices=sorted(EMU_MODELS), default="sa22c");
+    parser.add_argument("--speedup", type=float, default=1.0, help="simulated seconds per wall clock second");
+    parser.add_argument("--step", action="store_true", help="advance one PPS edge per 'j' instead of the wall clock");
+    parser.add_argument("--seed", type=int, default=None);
+    parser.add_argument("--offset", type=float, default=7.42e-10, help="free running fractional frequency offset");
+    parser.add_argument("--aging", type=float, default=5e-13, help="fractional frequency aging per day");
+    parser.add_argument("--sawtooth", type=float, default=10.0, help="GPS sawtooth amplitude in ns");
+    parser.add_argument("--jitter", type=float, default=2.0, help="GPS white jitter in ns");
+    parser.add_argument("--dropout-rate", type=float, default=0.0, help="PPS dropouts per second");
+    parser.add_argument("--dropout-length", type=int, default=30, help="PPS dropout length in seconds");
+    parser.add_argument("--unlock-rate", type=float, default=0.0, help="Rb lock losses per second");
+    parser.add_argument("--unlock-length", type=int, default=120, help="Rb lock loss length in seconds");
+    parser.add_argument("--baud", type=int, default=None, help="only answer at this baud rate");
+    parser.add_argument("--no-queue", action="store_true", help="drop commands sent while busy");
+    parser.add_argument("--latency", type=float, default=0.0, help="response latency in ms");
+    parser.add_argument("--link", default=None, help="symlink to create for the slave port");
+    args = parser.parse_args(argv);
+
+    model = EMU_MODELS[args.model];
+    osc = SymOscillator(model, seed=args.seed, freqOffset=args.offset, aging=args.aging,
+                        sawtooth=args.sawtooth * 1e-9, jitter=args.jitter * 1e-9,
+                        dropoutRate=args.dropout_rate, dropoutLength=args.dropout_length,
+                        unlockRate=args.unlock_rate, unlockLength=args.unlock_length);
+    emu = SymEmulator(osc, speedup=args.speedup, stepped=args.step, queued=not args.no_queue,
+                      baudrate=args.baud, latency=args.latency / 1000.0);
+
+    port = emu.port;
+    if (args.link):
+        if (os.path.islink(args.link)):
+            os.unlink(args.link);
+        os.symlink(emu.port, args.link);
+        port = args.link;
+
+    if (args.step):
+        mode = "stepped";
+    else:
+        mode = "{:g}x".format(args.speedup);
+    print("Emulating", EMU_BANNERS[model][0].split(" by ")[0], "on", port, "(" + mode + ")");
+    sys.stdout.flush();
+
+    # Background jobs don't get SIGINT, let a plain kill clean up the link too
+    signal.signal(signal.SIGTERM, lambda signum, frame: emu.stop());
+
+    try:
+        emu.serve_forever();
+    except KeyboardInterrupt:
+        pass;
+    finally:
+        print("Commands:", emu.counts, "-- Simulated seconds:", osc.simTime);
+        if (args.link and os.path.islink(args.link)):
+            os.unlink(args.link);
+        emu.close();
+
+
+if __name__ == "__main__":
+    main();
@@ -0,0 +1,139 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Fixed Point Discipline Values
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Integers for the values the 1 PPS loop keeps, so it doesn't box a float
+# on MicroPython for every sum and comes out the same on a Pico (single
+# precision) as on Linux:
+#
+#   - DDS values are whole tenths of a 1e-11 step, -74.2 is -742.  They
+#     only become floats to be shown, and dds_text() makes the "f" command
+#     argument without going through a float at all.
+#   - The slope sums are exact sums of x, y, x*x, x*y and y*y.  Nothing is
+#     lost however big they get (Python ints, mpz on MicroPython) and the
+#     slope is one division of two exact integers at the end.
+#
+#   reg = ireg_new()
+#   ireg_add(reg, counter, delta)
+#   ireg_slope(reg)                 # counts per sample, float
+#
+# gpsdro.regression is still used where the inputs are floats to begin
+# with (the holdover model, the stability estimates).
+#
+DDS_SCALE			= 10
+
+# Integer estimator positions
+IREG_SAMPLES		= 0
+IREG_SUM_X			= 1
+IREG_SUM_Y			= 2
+IREG_SUM_XX			= 3
+IREG_SUM_XY			= 4
+IREG_SUM_YY			= 5
+
+
+def dds_fixed( value ):
+    return int(round(value * DDS_SCALE));
+
+
+def dds_float( fixed ):
+    return fixed / DDS_SCALE;
+
+
+#
+# "f" command argument, e.g. "-74.2" or "0.0", the same as str() of the
+# float would give
+#
+def dds_text( fixed ):
+    text = str(abs(fixed) // DDS_SCALE) + "." + str(abs(fixed) % DDS_SCALE);
+    if ( fixed < 0 ):
+        return "-" + text;
+    return text;
+
+
+#
+# num / den rounded to the nearest integer, halves to even like round(),
+# den has to be positive
+#
+def div_round( num, den ):
+    quotient, remainder = divmod(num, den);
+    if ( (2 * remainder > den) or ((2 * remainder == den) and (quotient & 1)) ):
+        quotient += 1;
+    return quotient;
+
+
+def ireg_new():
+    return [0, 0, 0, 0, 0, 0];
+
+
+#
+# Add a point, both integers
+#
+def ireg_add( reg, x, y ):
+    reg[IREG_SAMPLES] += 1;
+    reg[IREG_SUM_X] += x;
+    reg[IREG_SUM_Y] += y;
+    reg[IREG_SUM_XX] += x * x;
+    reg[IREG_SUM_XY] += x * y;
+    reg[IREG_SUM_YY] += y * y;
+
+
+#
+# n^2 times the x variance and the x/y covariance, exact
+#
+def ireg_sxx( reg ):
+    return (reg[IREG_SAMPLES] * reg[IREG_SUM_XX]) - (reg[IREG_SUM_X] * reg[IREG_SUM_X]);
+
+
+def ireg_sxy( reg ):
+    return (reg[IREG_SAMPLES] * reg[IREG_SUM_XY]) - (reg[IREG_SUM_X] * reg[IREG_SUM_Y]);
+
+
+#
+# Slope in y units per x unit, 0 until there are two distinct points
+#
+def ireg_slope( reg ):
+    if ( reg[IREG_SAMPLES] < 2 ):
+        return float(0.0);
+    sxx = ireg_sxx(reg);
+    if ( sxx <= 0 ):
+        return float(0.0);
+    return ireg_sxy(reg) / sxx;
+
+
+#
+# Standard error of the slope from the residuals, 0 until there are three
+# points.  The residual sum is worked out exactly and brought down to the
+# size of the data before it becomes a float, single precision floats
+# can't hold the products.
+#
+def ireg_stderr( reg ):
+    n = reg[IREG_SAMPLES];
+    if ( n < 3 ):
+        return float(0.0);
+    sxx = ireg_sxx(reg);
+    if ( sxx <= 0 ):
+        return float(0.0);
+    sxy = ireg_sxy(reg);
+    syy = (n * reg[IREG_SUM_YY]) - (reg[IREG_SUM_Y] * reg[IREG_SUM_Y]);
+    residual = ((syy * sxx) - (sxy * sxy)) // sxx;
+    if ( residual <= 0 ):
+        return float(0.0);
+    return (residual / sxx / (n - 2)) ** 0.5;
@@ -0,0 +1,128 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Timing Histograms
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Fixed bucket histograms of times in microseconds, cheap enough to leave
+# running on a Pico.  Bucket b counts the values from 2^(b-1) up to 2^b - 1
+# (bucket 0 is 0), the last one takes everything longer, so 24 buckets go
+# up to about 8 seconds.
+#
+# Recording is a few shifts and an array store, the counts are
+# preallocated and nothing else is created, so it doesn't make garbage
+# for the collector in the tick loop.  Percentiles come out as the top of
+# the bucket they land in, i.e. to within a factor of two.
+#
+#   symTiming = TimingStats(("late", "status"))
+#   symTiming.record("late", 1250)
+#   print (symTiming.report())
+#
+from array import array
+
+HIST_BUCKETS		= 24
+
+
+class Histogram:
+
+    def __init__( self, buckets=HIST_BUCKETS ):
+        self.counts = array('L', [0] * buckets);
+        self.last = buckets - 1;
+        self.count = 0;
+        self.minimum = 0;
+        self.maximum = 0;
+
+    def record( self, micros ):
+        if ( micros < 0 ):
+            micros = 0;
+        bucket = 0;
+        value = micros;
+        last = self.last;
+        while ( value and (bucket < last) ):
+            value >>= 1;
+            bucket += 1;
+        self.counts[bucket] += 1;
+
+        if ( (self.count == 0) or (micros < self.minimum) ):
+            self.minimum = micros;
+        if ( micros > self.maximum ):
+            self.maximum = micros;
+        self.count += 1;
+
+    #
+    # Upper edge of the bucket holding the given fraction of the values,
+    # capped at the largest value seen
+    #
+    def percentile( self, fraction ):
+        if ( self.count == 0 ):
+            return 0;
+        wanted = fraction * self.count;
+        seen = 0;
+        for bucket in range(len(self.counts)):
+            seen += self.counts[bucket];
+            if ( seen >= wanted ):
+                return min((1 << bucket) - 1, self.maximum);
+        return self.maximum;
+
+    def clear( self ):
+        for bucket in range(len(self.counts)):
+            self.counts[bucket] = 0;
+        self.count = 0;
+        self.minimum = 0;
+        self.maximum = 0;
+
+    #
+    # count min/50%/90%/99%/max in ms
+    #
+    def summary( self ):
+        return "{:7} {:9.3f} {:9.3f} {:9.3f} {:9.3f} {:9.3f}".format(self.count, self.minimum / 1000,
+                    self.percentile(0.5) / 1000, self.percentile(0.9) / 1000, self.percentile(0.99) / 1000, self.maximum / 1000);
+
+
+#
+# A named set of histograms, all made up front
+#
+class TimingStats:
+
+    def __init__( self, names, buckets=HIST_BUCKETS ):
+        self.names = tuple(names);
+        self.histograms = {};
+        for name in self.names:
+            self.histograms[name] = Histogram(buckets);
+
+    def record( self, name, micros ):
+        self.histograms[name].record(micros);
+
+    def get( self, name ):
+        return self.histograms.get(name);
+
+    def clear( self ):
+        for name in self.names:
+            self.histograms[name].clear();
+
+    #
+    # One line per histogram that has seen something
+    #
+    def report( self ):
+        text = "{:8} {:>7} {:>9} {:>9} {:>9} {:>9} {:>9}  (ms)".format("", "count", "min", "50%", "90%", "99%", "max");
+        for name in self.names:
+            histogram = self.histograms[name];
+            if ( histogram.count ):
+                text += "\n{:8} {}".format(name, histogram.summary());
+        return text;
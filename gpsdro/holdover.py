@@ -0,0 +1,327 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Holdover Prediction
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Learns how the DDS value the oscillator needs drifts (aging and random
+# wander) while the PPS is good, and keeps the frequency on track through
+# a GPS outage instead of freezing the last DDS value.
+#
+# Every "interval" disciplined ticks one sample is taken: the mean DDS
+# value over the interval plus the slope of the PPS delta over it, i.e.
+# the DDS value that would have had no drift at all.  The last "history"
+# samples are kept.  At the start of holdover
+#
+#   - the aging is the slope of a straight line through all of them,
+#     dropped when it isn't significant
+#   - the mean square difference of samples k apart is 2 x the
+#     measurement noise plus k x the frequency wander (random walk), a
+#     straight line through it for k up to HOLDOVER_LAGS gives both
+#   - the DDS value now is an exponentially weighted mean of the samples,
+#     aging removed, over the time constant where the wander and the
+#     measurement noise balance out
+#
+# and from then on
+#
+#   model.holdover_dds(counter)
+#
+# gives the DDS value to set every HOLDOVER_STEP ticks, dithered between
+# the two nearest DDS steps so it averages out to the prediction, and
+#
+#   model.time_error_bound(elapsed)
+#
+# is HOLDOVER_SIGMA standard deviations of the time error built up after
+# "elapsed" seconds from the error of the DDS value and the aging plus the
+# wander.
+#
+# "python3 -m gpsdro.holdover" disciplines an emulated oscillator, drops
+# the PPS and compares the time error with the DDS frozen, predicted, and
+# the bound, then the RMS of both over the seeds.  What the prediction
+# can win back is the aging, the wander is unpredictable: with the
+# emulator's default random walk (2e-14) it is about a third off the RMS
+# after 4 hours and worse than freezing for some seeds, with a tenth of
+# that (--random-walk 2e-15) it is nearly all of it.
+#
+import math
+
+from gpsdro.regression import reg_new, reg_add, reg_slope, reg_stderr, REG_SAMPLES, REG_MEAN_X, REG_MEAN_Y
+from gpsdro.fixed import ireg_new, dds_fixed, IREG_SAMPLES, DDS_SCALE
+from gpsdro.hotpath import ireg_add, ireg_slope
+
+DDS_BASE_VALUE		= float(1e-11)
+DDS_INCR_VALUE		= float(2e-1)
+
+HOLDOVER_INTERVAL	= 600
+HOLDOVER_HISTORY	= 288
+HOLDOVER_MIN_SAMPLES	= 2
+HOLDOVER_STEP		= 10
+HOLDOVER_SIGMA		= 3.0
+HOLDOVER_LAGS		= 12
+
+# Aging is only used if it is this many standard errors away from 0
+HOLDOVER_AGING_SIGNIFICANCE	= 2.0
+
+# Fitted model positions
+FIT_START			= 0
+FIT_DDS				= 1
+FIT_AGING			= 2
+FIT_DDS_VAR			= 3
+FIT_AGING_ERR		= 4
+FIT_WANDER			= 5
+FIT_TAU				= 6
+FIT_SAMPLES			= 7
+
+
+class DriftModel:
+
+    def __init__( self, crystal, interval=HOLDOVER_INTERVAL, history=HOLDOVER_HISTORY ):
+        self.crystal = crystal;
+        self.interval = interval;
+        self.history = history;
+        self.times = [];
+        self.values = [];
+        self.restart();
+        self.fitted = None;
+        self.dither = 0.0;
+
+    #
+    # Drop the part filled sample, e.g. after a tic reset or a holdover
+    #
+    def restart( self ):
+        self.reg = ireg_new();
+        self.ddsSum = 0;
+
+    def add( self, when, value ):
+        self.times.append(when);
+        self.values.append(value);
+        if ( len(self.times) > self.history ):
+            self.times.pop(0);
+            self.values.pop(0);
+
+    #
+    # One disciplined tick, "delta" is the rollover corrected PPS delta in
+    # counts (not less PPSOFFSET, it has to be continuous) and "dds" the
+    # DDS value in tenths (gpsdro.fixed).  All integers until the sample
+    # is taken.
+    #
+    def tick( self, counter, delta, dds ):
+        reg = self.reg;
+        ireg_add(reg, reg[IREG_SAMPLES], delta);
+        self.ddsSum += dds;
+        if ( reg[IREG_SAMPLES] >= self.interval ):
+            samples = reg[IREG_SAMPLES];
+            self.add(counter - (samples / 2), (self.ddsSum / samples / DDS_SCALE) + (ireg_slope(reg) / self.crystal / DDS_BASE_VALUE));
+            self.restart();
+
+    #
+    # Fit the model for a holdover starting at "start", returns False if
+    # there aren't enough samples
+    #
+    def fit( self, start ):
+        times = self.times;
+        values = self.values;
+        count = len(times);
+        if ( count < HOLDOVER_MIN_SAMPLES ):
+            self.fitted = None;
+            return False;
+
+        # Aging, straight line through everything
+        meanT = sum(times) / count;
+        meanV = sum(values) / count;
+        sxx = 0.0;
+        sxy = 0.0;
+        for index in range(count):
+            dt = times[index] - meanT;
+            sxx += dt * dt;
+            sxy += dt * (values[index] - meanV);
+        aging = 0.0;
+        if ( sxx > 0.0 ):
+            aging = sxy / sxx;
+        residual = 0.0;
+        for index in range(count):
+            error = values[index] - meanV - (aging * (times[index] - meanT));
+            residual += error * error;
+        agingError = 0.0;
+        if ( (count > 2) and (sxx > 0.0) ):
+            agingError = ((residual / (count - 2)) / sxx) ** 0.5;
+        if ( (count <= 2) or (abs(aging) < (HOLDOVER_AGING_SIGNIFICANCE * agingError)) ):
+            aging = 0.0;
+
+        # Measurement noise and wander per second from the differences
+        lagReg = reg_new();
+        for lag in range(1, min(HOLDOVER_LAGS, count - 1) + 1):
+            total = 0.0;
+            spacing = 0.0;
+            for index in range(lag, count):
+                dt = times[index] - times[index - lag];
+                step = values[index] - values[index - lag] - (aging * dt);
+                total += step * step;
+                spacing += dt;
+            reg_add(lagReg, spacing / (count - lag), total / (count - lag));
+        wander = 0.0;
+        wanderLimit = 0.0;
+        noise = residual / count;
+        if ( lagReg[REG_SAMPLES] >= 2 ):
+            wander = max(reg_slope(lagReg), 0.0);
+            noise = max((lagReg[REG_MEAN_Y] - (wander * lagReg[REG_MEAN_X])) / 2, 0.0);
+            # Too small to see doesn't mean none, the bound uses at least this
+            wanderLimit = max(wander, reg_stderr(lagReg));
+
+        # Averaging time constant, longer when the wander is small
+        span = max(times[-1] - times[0], self.interval);
+        tau = span;
+        if ( wander > 0.0 ):
+            tau = min(max((noise * self.interval / wander) ** 0.5, self.interval), span);
+
+        # DDS value at the start, weighted towards the latest samples.  Its
+        # error is the noise over the effective number of samples plus the
+        # wander since their weighted mean age.
+        weightSum = 0.0;
+        weightSq = 0.0;
+        total = 0.0;
+        age = 0.0;
+        for index in range(count):
+            weight = math.exp((times[index] - times[-1]) / tau);
+            weightSum += weight;
+            weightSq += weight * weight;
+            total += weight * (values[index] + (aging * (start - times[index])));
+            age += weight * (start - times[index]);
+        dds = total / weightSum;
+        ddsVar = (noise * weightSq / (weightSum * weightSum)) + (wanderLimit * age / weightSum);
+
+        self.fitted = ( start, dds, aging, ddsVar, agingError, wanderLimit, tau, count );
+        return True;
+
+    def predict( self, when ):
+        return self.fitted[FIT_DDS] + (self.fitted[FIT_AGING] * (when - self.fitted[FIT_START]));
+
+    #
+    # Fit the model for a holdover starting now, False if there's nothing
+    # to go on and the DDS has to stay where it is
+    #
+    def begin( self, counter ):
+        self.restart();
+        self.dither = 0.0;
+        return self.fit(counter);
+
+    #
+    # DDS value for this tick of the holdover, the rounding left over is
+    # carried to the next one so the mean follows the prediction
+    #
+    def holdover_dds( self, counter ):
+        wanted = self.predict(counter) + self.dither;
+        value = round(round(wanted / DDS_INCR_VALUE) * DDS_INCR_VALUE, 1);
+        self.dither = wanted - value;
+        return value;
+
+    #
+    # Time error bound in seconds after "elapsed" seconds of holdover
+    #
+    def time_error_bound( self, elapsed ):
+        if ( self.fitted is None ):
+            return 0.0;
+        fitted = self.fitted;
+        variance = (fitted[FIT_DDS_VAR] * elapsed * elapsed) + ((fitted[FIT_AGING_ERR] * elapsed * elapsed / 2) ** 2) + \
+                   (fitted[FIT_WANDER] * elapsed * elapsed * elapsed / 3);
+        return HOLDOVER_SIGMA * (variance ** 0.5) * DDS_BASE_VALUE;
+
+    def report( self ):
+        if ( self.fitted is None ):
+            return "{} samples, no prediction".format(len(self.times));
+        fitted = self.fitted;
+        return "DDS {:.2f}   Aging {:.1e}/day   Wander {:.1e}   Tau {:.0f}s   Samples {}".format(fitted[FIT_DDS],
+                    fitted[FIT_AGING] * 86400 * DDS_BASE_VALUE, (fitted[FIT_WANDER] ** 0.5) * DDS_BASE_VALUE, fitted[FIT_TAU], fitted[FIT_SAMPLES]);
+
+    #
+    # For the checkpoint
+    #
+    def state( self ):
+        return [self.times, self.values];
+
+    def restore( self, state ):
+        self.times = list(state[0]);
+        self.values = list(state[1]);
+
+
+def main( argv=None ):
+    import argparse
+
+    from gpsdro.emulator import SymOscillator
+    from gpsdro.control import KalmanEngine, StepEngine
+
+    parser = argparse.ArgumentParser(description="Frozen vs predicted DDS through a PPS outage on an emulated oscillator");
+    parser.add_argument("--learn", type=int, default=172800, help="seconds disciplined before the outage");
+    parser.add_argument("--outage", type=int, default=14400, help="outage length in seconds");
+    parser.add_argument("--engine", choices=("step", "kalman"), default="step", help="control before the outage");
+    parser.add_argument("--seeds", default="1,2,3");
+    parser.add_argument("--aging", type=float, default=5e-12, help="fractional frequency aging per day");
+    parser.add_argument("--random-walk", type=float, default=2e-14, help="random walk FM per second");
+    args = parser.parse_args(argv);
+
+    print ("{:>6} {:>10} {:>12} {:>12} {:>12}   {}".format("Seed", "Outage s", "Frozen ns", "Predicted ns", "Bound ns", "Model"));
+    frozenSq = 0.0;
+    predictedSq = 0.0;
+    better = 0;
+    seeds = args.seeds.split(",");
+    for seed in seeds:
+        results = [];
+        for predicted in ( False, True ):
+            osc = SymOscillator(seed=int(seed), aging=args.aging, randomWalk=args.random_walk);
+            crystal = osc.crystal;
+            osc.set_dds(round(-osc.freqOffset / DDS_BASE_VALUE / DDS_INCR_VALUE) * DDS_INCR_VALUE);
+            osc.reset_tic();
+            if ( args.engine == "kalman" ):
+                engine = KalmanEngine();
+            else:
+                engine = StepEngine(crystal);
+            engine.reset(osc.dds);
+            model = DriftModel(crystal);
+
+            for second in range(args.learn):
+                osc.second();
+                delta = osc.register;
+                if ( delta > crystal / 2 ):
+                    delta -= crystal;
+                model.tick(second, delta, dds_fixed(osc.dds));
+                osc.set_dds(engine.update(delta / crystal));
+
+            # The outage, the true phase keeps going underneath
+            startPhase = osc.phase;
+            model.begin(args.learn);
+            for second in range(args.outage):
+                if ( predicted and (model.fitted is not None) and ((second % HOLDOVER_STEP) == 0) ):
+                    osc.set_dds(model.holdover_dds(args.learn + second));
+                osc.second();
+            results.append(abs(osc.phase - startPhase) / crystal);
+
+        frozenSq += results[0] * results[0];
+        predictedSq += results[1] * results[1];
+        if ( results[1] < results[0] ):
+            better += 1;
+
+        print ("{:>6} {:>10} {:>12.1f} {:>12.1f} {:>12.1f}   {}".format(seed, args.outage, results[0] * 1e9, results[1] * 1e9,
+                    model.time_error_bound(args.outage) * 1e9, model.report()));
+    print ("{:>6} {:>10} {:>12.1f} {:>12.1f}   Predicted better for {} of {}".format("RMS", args.outage,
+                (frozenSq / len(seeds)) ** 0.5 * 1e9, (predictedSq / len(seeds)) ** 0.5 * 1e9, better, len(seeds)));
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
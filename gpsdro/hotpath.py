@@ -0,0 +1,133 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Per Tick Arithmetic
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The arithmetic done on every PPS tick, in one place so it can be swapped
+# for machine code on a board:
+#
+#   rollover(value, crystal)   delta register wrapped into +/- crystal/2
+#   ring_push(...)             RingSum.push() on its arrays
+#   ireg_add(reg, x, y)        gpsdro.fixed
+#   ireg_slope(reg)            gpsdro.fixed
+#
+# On MicroPython with the native emitter built in, gpsdro.native replaces
+# them with @micropython.viper (rollover) and @micropython.native (the
+# sums) versions.  Everywhere else, or if the port can't compile them,
+# the plain Python ones below are used.  HOTPATH_EMITTER says which.
+#
+# "micropython -m gpsdro.hotpath [ticks]" (or python3) times a tick's worth
+# of these both ways.
+#
+from gpsdro.fixed import ireg_new, ireg_add, ireg_slope
+
+HOTPATH_EMITTER		= "bytecode"
+
+# Ticks the benchmark runs by default
+HOTPATH_BENCH_TICKS	= 20000
+
+
+def rollover( value, crystal ):
+    if ( value > (crystal >> 1) ):
+        return value - crystal;
+    return value;
+
+
+#
+# Push "value" into the ring "data" at "pos", each window sum in "sums"
+# drops the entry "spans" back.  "data" is an array('l'), the sums are
+# Python ints.
+#
+def ring_push( data, sums, spans, count, pos, size, value ):
+    for index in range(count):
+        old = pos - spans[index];
+        if ( old < 0 ):
+            old += size;
+        sums[index] += value - data[old];
+    data[pos] = value;
+
+
+HOTPATH_BYTECODE	= ( rollover, ring_push, ireg_add, ireg_slope );
+
+try:
+    from gpsdro.native import rollover, ring_push, ireg_add, ireg_slope
+    HOTPATH_EMITTER = "native";
+except ( ImportError, SyntaxError ):
+    pass;
+
+HOTPATH_SELECTED	= ( rollover, ring_push, ireg_add, ireg_slope );
+
+
+#
+# us per tick for one set of the functions: a rollover, two regression
+# points, a ring push and a slope, like the script's main loop
+#
+def bench( functions, ticks ):
+    from array import array
+    from gpsdro.transport import ticks_us, ticks_diff
+
+    rolloverFn, ringPushFn, regAddFn, regSlopeFn = functions;
+    crystal = 60000000;
+    size = 600;
+    data = array('l', [0] * size);
+    sums = [0];
+    spans = (60,);
+    running = ireg_new();
+    calc = ireg_new();
+    pos = 0;
+    slope = 0.0;
+
+    start = ticks_us();
+    for tick in range(ticks):
+        delta = rolloverFn((tick * 7919) % crystal, crystal);
+        regAddFn(running, tick, delta);
+        regAddFn(calc, tick, delta);
+        ringPushFn(data, sums, spans, 1, pos, size, delta);
+        pos += 1;
+        if ( pos == size ):
+            pos = 0;
+        slope = regSlopeFn(running);
+    micros = ticks_diff(ticks_us(), start);
+    return micros / ticks, slope;
+
+
+def main( argv=None ):
+    import sys
+
+    if ( argv is None ):
+        argv = sys.argv[1:];
+    ticks = HOTPATH_BENCH_TICKS;
+    if ( len(argv) ):
+        ticks = int(argv[0]);
+
+    print ("Emitter:", HOTPATH_EMITTER, "--", ticks, "ticks");
+    bytecode, slopeBytecode = bench(HOTPATH_BYTECODE, ticks);
+    print ("  bytecode {:8.2f} us/tick".format(bytecode));
+    if ( HOTPATH_SELECTED[0] is not HOTPATH_BYTECODE[0] ):
+        selected, slopeSelected = bench(HOTPATH_SELECTED, ticks);
+        print ("  {:8} {:8.2f} us/tick   {:.2f}x".format(HOTPATH_EMITTER, selected, bytecode / selected));
+        if ( slopeSelected != slopeBytecode ):
+            print ("  slopes differ: {} {}".format(slopeBytecode, slopeSelected));
+            return 1;
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
@@ -0,0 +1,281 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Metrics Endpoint
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Small HTTP endpoint with the discipliner state for monitoring:
+#
+#   GET /metrics    Prometheus text format
+#   GET /status     JSON
+#
+# The discipliner hands a state dict to MetricsSnapshot.update() when it has
+# new health data and both bodies are rendered there and then.  A request
+# only ever sends the last rendered bytes, it never touches the serial
+# port or waits on the discipliner.
+#
+#   state = { "MODEL": symModelArray, "STATUS": symStatusArray,
+#             "SLOPES": { "running": (slope, stderr), ... },
+#             "DDS": ddsAdjValue, "HOLDOVER": holdOverState,
+#             "COUNTER": symPPScounter,
+#             "SERIAL": LatencyStats.histograms, "TIMING": TimingStats }
+#
+# MetricsServer runs either way:
+#
+#   server.listen(port) then server.poll(ms) from an idle loop, plain
+#   non-blocking sockets, CPython or MicroPython (Pico W, ESP32)
+#
+#   await server.start(port) on an asyncio / uasyncio event loop
+#
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+from gpsdro.transport import ticks_us, ticks_diff
+
+METRICS_PREFIX		= "gpsdro_"
+METRICS_QUANTILES	= ( 0.5, 0.9, 0.99 )
+
+# Longest a polled request may take, reading it and answering it, in ms
+METRICS_REQUEST_MS	= 50
+
+
+class MetricsSnapshot:
+
+    def __init__( self ):
+        self.metrics = b"";
+        self.status = b"{}";
+
+    def update( self, state ):
+        self.metrics = render_prometheus(state).encode();
+        self.status = render_json(state).encode();
+
+
+def prometheus_label( value ):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"");
+
+
+def is_number( value ):
+    return ( isinstance(value, (int, float)) and (not isinstance(value, bool)) );
+
+
+#
+# Every number in the status array goes out as gpsdro_status{field=...},
+# the rest get a metric of their own
+#
+def render_prometheus( state ):
+    model = state.get("MODEL", {});
+    serial = "serial=\"" + prometheus_label(model.get("S/N", "")) + "\"";
+    lines = [];
+
+    def metric( name, kind, helpText ):
+        lines.append("# HELP " + METRICS_PREFIX + name + " " + helpText);
+        lines.append("# TYPE " + METRICS_PREFIX + name + " " + kind);
+
+    def sample( name, labels, value ):
+        lines.append("{}{}{{{}}} {}".format(METRICS_PREFIX, name, labels, repr(float(value))));
+
+    metric("info", "gauge", "Oscillator model and serial number");
+    sample("info", serial + ",model=\"" + prometheus_label(model.get("MODELTEXT", "")) + "\"", 1);
+
+    metric("status", "gauge", "Numeric fields of the w health dump and the 1PPS delta");
+    status = state.get("STATUS", {});
+    for field in sorted(status):
+        if ( is_number(status[field]) ):
+            sample("status", serial + ",field=\"" + prometheus_label(field) + "\"", status[field]);
+
+    metric("slope", "gauge", "PPS delta slope as fractional frequency");
+    metric("slope_stderr", "gauge", "Standard error of the slope");
+    slopes = state.get("SLOPES", {});
+    for name in sorted(slopes):
+        labels = serial + ",state=\"" + name + "\"";
+        sample("slope", labels, slopes[name][0]);
+        sample("slope_stderr", labels, slopes[name][1]);
+
+    metric("dds", "gauge", "DDS adjustment in 1e-11 steps");
+    sample("dds", serial, state.get("DDS", 0));
+    metric("holdover", "gauge", "Holdover state, 0 when disciplining");
+    sample("holdover", serial, state.get("HOLDOVER", 0));
+    metric("pps_counter", "counter", "PPS ticks processed");
+    sample("pps_counter", serial, state.get("COUNTER", 0));
+
+    for name, helpText in ( ("SERIAL", "Serial round trip per command"), ("TIMING", "Loop timing") ):
+        stats = state.get(name);
+        if ( stats is None ):
+            continue;
+        key = name.lower();
+        metric(key + "_seconds", "gauge", helpText + ", quantiles from power of two buckets");
+        metric(key + "_count", "counter", helpText + ", samples");
+        for item in stats.names:
+            histogram = stats.get(item);
+            if ( not histogram.count ):
+                continue;
+            labels = serial + ",name=\"" + prometheus_label(item) + "\"";
+            for quantile in METRICS_QUANTILES:
+                sample(key + "_seconds", labels + ",quantile=\"" + str(quantile) + "\"", histogram.percentile(quantile) / 1000000);
+            sample(key + "_seconds", labels + ",quantile=\"1\"", histogram.maximum / 1000000);
+            sample(key + "_count", labels, histogram.count);
+
+    lines.append("");
+    return "\n".join(lines);
+
+
+def render_json( state ):
+    snapshot = {};
+    for key in ( "MODEL", "STATUS" ):
+        section = {};
+        values = state.get(key, {});
+        for field in values:
+            if ( is_number(values[field]) or isinstance(values[field], str) ):
+                section[field] = values[field];
+        snapshot[key] = section;
+
+    snapshot["SLOPES"] = {};
+    slopes = state.get("SLOPES", {});
+    for name in slopes:
+        snapshot["SLOPES"][name] = { "SLOPE": slopes[name][0], "STDERR": slopes[name][1] };
+
+    for key in ( "DDS", "HOLDOVER", "COUNTER" ):
+        snapshot[key] = state.get(key, 0);
+
+    for key in ( "SERIAL", "TIMING" ):
+        stats = state.get(key);
+        if ( stats is None ):
+            continue;
+        section = {};
+        for item in stats.names:
+            histogram = stats.get(item);
+            if ( histogram.count ):
+                section[item] = { "COUNT": histogram.count, "MIN_US": histogram.minimum, "MAX_US": histogram.maximum,
+                                  "P50_US": histogram.percentile(0.5), "P90_US": histogram.percentile(0.9),
+                                  "P99_US": histogram.percentile(0.99) };
+        snapshot[key] = section;
+
+    return json.dumps(snapshot);
+
+
+class MetricsServer:
+
+    def __init__( self, snapshot ):
+        self.snapshot = snapshot;
+        self.listener = None;
+        self.poller = None;
+
+    #
+    # Whole HTTP response for a request line, from the cached bodies
+    #
+    def response( self, requestLine ):
+        parts = requestLine.split();
+        path = b"";
+        if ( len(parts) >= 2 ):
+            path = parts[1].split(b"?")[0];
+
+        if ( path == b"/metrics" ):
+            status, kind, body = b"200 OK", b"text/plain; version=0.0.4", self.snapshot.metrics;
+        elif ( path in (b"/status", b"/status.json") ):
+            status, kind, body = b"200 OK", b"application/json", self.snapshot.status;
+        else:
+            status, kind, body = b"404 Not Found", b"text/plain", b"/metrics or /status\n";
+        return (b"HTTP/1.0 " + status + b"\r\nContent-Type: " + kind + b"\r\nContent-Length: " +
+                str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body);
+
+    #
+    # Polled mode, a non-blocking listening socket checked from the idle
+    # part of the main loop
+    #
+    def listen( self, port, host="0.0.0.0" ):
+        import socket, select
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM);
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1);
+        listener.bind(socket.getaddrinfo(host, port)[0][-1]);
+        listener.listen(2);
+        listener.setblocking(False);
+        self.listener = listener;
+        self.poller = select.poll();
+        self.poller.register(listener, select.POLLIN);
+
+    #
+    # Wait up to "wait" ms for a connection and answer it.  Reading the
+    # request and sending the answer get METRICS_REQUEST_MS between them, a
+    # client that is slower than that is dropped, so the caller is never
+    # held up for long.
+    #
+    def poll( self, wait=0 ):
+        if ( not self.poller.poll(wait) ):
+            return 0;
+        try:
+            client, address = self.listener.accept();
+        except OSError:
+            return 0;
+        startTick = ticks_us();
+        try:
+            request = b"";
+            while ( (request.find(b"\r\n\r\n") < 0) and (request.find(b"\n\n") < 0) and (len(request) < 2048) ):
+                client.settimeout(self.time_left(startTick));
+                data = client.recv(512);
+                if ( not data ):
+                    break;
+                request += data;
+            client.settimeout(self.time_left(startTick));
+            client.sendall(self.response(request.split(b"\n")[0]));
+        except OSError:
+            pass;
+        client.close();
+        return 1;
+
+    #
+    # Seconds left of a polled request, OSError once there are none
+    #
+    def time_left( self, startTick ):
+        left = METRICS_REQUEST_MS * 1000 - ticks_diff(ticks_us(), startTick);
+        if ( left <= 0 ):
+            raise OSError("request too slow");
+        return left / 1000000;
+
+    def close( self ):
+        if ( self.listener is not None ):
+            self.listener.close();
+            self.listener = None;
+
+    #
+    # Event loop mode
+    #
+    async def handle( self, reader, writer ):
+        try:
+            requestLine = await reader.readline();
+            while True:
+                line = await reader.readline();
+                if ( (not line) or (line in (b"\r\n", b"\n")) ):
+                    break;
+            writer.write(self.response(requestLine));
+            await writer.drain();
+        except OSError:
+            pass;
+        writer.close();
+        await writer.wait_closed();
+
+    async def start( self, port, host="0.0.0.0" ):
+        try:
+            import asyncio
+        except ImportError:
+            import uasyncio as asyncio
+
+        return await asyncio.start_server(self.handle, host, port);
@@ -0,0 +1,203 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Multi Unit Discipliner
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Disciplines several oscillators from one Linux host, one serial port
+# each, from one process:
+#
+#   python3 -m gpsdro.multi /dev/ttyUSB0 /dev/ttyUSB1 /dev/ttyAMA2
+#
+# Every port gets its own instance of gpsdro/discipline.py, loaded as a
+# module of its own, so everything the discipliner keeps in module globals
+# (status and model arrays, slope sums, PPS drift window, DDS value,
+# transport) belongs to that unit and the units can't see each other.  A
+# unit runs the discipliner's own main(): the same probe, slope
+# calculation, DDS adjustment, holdover handling, histograms and profile /
+# checkpoint.
+#
+# The script blocks on its port, so each unit's main() has a thread of its
+# own started from the asyncio loop, which waits on them, reports and
+# takes SIGUSR1 for all of them.  Every --report seconds a line per unit
+# shows the counter, delta, DDS, how late its PPS ticks started (50%, 99%,
+# max) and its "j" round trip, so you can see how the host keeps up as
+# units are added.  A unit that stops is reported, the rest carry on.
+#
+import asyncio
+import os
+import threading
+
+from gpsdro.fixed import dds_float
+
+UNIT_REPORT			= 60
+UNIT_SCRIPT			= os.path.join(os.path.dirname(os.path.abspath(__file__)), "discipline.py")
+
+
+#
+# A fresh module of the discipliner for the port.  The settings it reads
+# from the environment are set just while it is loaded and configured;
+# profile and checkpoint go in "stateDir", named after the port, or aren't
+# kept.
+#
+def load_unit( port, stateDir="", speedup=1, scriptPath=UNIT_SCRIPT, quiet=False ):
+    import importlib.util
+
+    name = os.path.basename(port);
+    settings = { "GPSDRO_PORT": port, "GPSDRO_SPEEDUP": str(speedup), "GPSDRO_PROFILE": "", "GPSDRO_CHECKPOINT": "",
+                 "GPSDRO_CAPTURE": "", "GPSDRO_TELEMETRY": "", "GPSDRO_METRICS": "0" };
+    if ( stateDir ):
+        settings["GPSDRO_PROFILE"] = os.path.join(stateDir, name + "-profile.json");
+        settings["GPSDRO_CHECKPOINT"] = os.path.join(stateDir, name + "-checkpoint.json");
+
+    saved = {};
+    for key in settings:
+        saved[key] = os.environ.get(key);
+    os.environ.update(settings);
+    try:
+        spec = importlib.util.spec_from_file_location("gpsdro_unit", scriptPath);
+        script = importlib.util.module_from_spec(spec);
+        spec.loader.exec_module(script);
+        script.platform_config();
+    finally:
+        for key in saved:
+            if ( saved[key] is None ):
+                del os.environ[key];
+            else:
+                os.environ[key] = saved[key];
+
+    # The settings were read above, the other units' are in the
+    # environment by the time main() runs.  Signals only reach the main
+    # thread, run_units() passes SIGUSR1 on.
+    script.platform_config = lambda: None;
+    script.setup_timing_request = lambda: None;
+    script.print = unit_printer(name, quiet);
+    return script;
+
+
+def unit_printer( name, quiet ):
+    def unit_print( *args, **kwargs ):
+        if ( not quiet ):
+            print (name + ":", *args, **kwargs);
+    return unit_print;
+
+
+#
+# Runs the unit's main() on a thread, the future has its exception or None
+# once it stops
+#
+def start_unit( loop, name, script ):
+    done = loop.create_future();
+
+    def finished( error ):
+        if ( not done.done() ):
+            done.set_result(error);
+
+    def run():
+        error = None;
+        try:
+            script.main();
+        except BaseException as caught:
+            error = caught;
+        try:
+            loop.call_soon_threadsafe(finished, error);
+        except RuntimeError:
+            # Loop already gone, Ctrl-C
+            pass;
+
+    threading.Thread(target=run, name=name, daemon=True).start();
+    return done;
+
+
+def unit_report( name, script ):
+    if ( script.symTransport is None ):
+        return "{:10} starting".format(name);
+    late = script.symTiming.get("late");
+    serial = script.symTransport.stats.histograms.get("j");
+    return "{:10} {:>14} {:8} {:>9} {:>8.1f} {:9.3f} {:9.3f} {:9.3f} {:9.3f}".format(name, script.symModelArray.get("S/N", "?"),
+                script.symPPScounter, script.symStatusArray.get("1PPSDELTA", 0), dds_float(script.ddsAdjValue),
+                late.percentile(0.5) / 1000, late.percentile(0.99) / 1000, late.maximum / 1000, serial.percentile(0.99) / 1000);
+
+
+async def report_loop( names, scripts, interval ):
+    while True:
+        await asyncio.sleep(interval);
+        print ("{:10} {:>14} {:>8} {:>9} {:>8} {:>9} {:>9} {:>9} {:>9}".format("Unit", "S/N", "Counter", "Delta",
+                    "DDS", "late 50%", "late 99%", "late max", "j 99%"));
+        for name, script in zip(names, scripts):
+            print (unit_report(name, script));
+
+
+#
+# Starts every unit and waits until they have all stopped, returns what
+# each one stopped with (None or the exception)
+#
+async def run_units( names, scripts, interval ):
+    import signal
+
+    loop = asyncio.get_event_loop();
+
+    def timing_dump( signalNumber=None, frame=None ):
+        for script in scripts:
+            script.request_timing_dump();
+
+    if ( threading.current_thread() is threading.main_thread() ):
+        signal.signal(signal.SIGUSR1, timing_dump);
+
+    units = [];
+    for name, script in zip(names, scripts):
+        units.append(start_unit(loop, name, script));
+    reporter = asyncio.ensure_future(report_loop(names, scripts, interval));
+    try:
+        results = await asyncio.gather(*units);
+    finally:
+        reporter.cancel();
+
+    for name, error in zip(names, results):
+        if ( error is not None ):
+            print ("{}: stopped, {!r}".format(name, error));
+    return results;
+
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Discipline several Symmetricom oscillators from one process");
+    parser.add_argument("ports", nargs="+", help="serial port of each oscillator");
+    parser.add_argument("--state", default="", help="directory for each unit's profile and checkpoint, none if not given");
+    parser.add_argument("--report", type=float, default=UNIT_REPORT, help="seconds between timing reports");
+    parser.add_argument("--speedup", type=float, default=float(os.environ.get("GPSDRO_SPEEDUP", 1)), help="match an accelerated gpsdro.emulator");
+    parser.add_argument("--quiet", action="store_true", help="only the timing reports, not each unit's own output");
+    args = parser.parse_args(argv);
+
+    names = [];
+    scripts = [];
+    for port in args.ports:
+        names.append(os.path.basename(port));
+        scripts.append(load_unit(port, args.state, args.speedup, quiet=args.quiet));
+
+    try:
+        results = asyncio.run(run_units(names, scripts, args.report / args.speedup));
+    except KeyboardInterrupt:
+        return 0;
+    return int(any(error is not None for error in results));
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
@@ -0,0 +1,82 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Native Per Tick Arithmetic
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# MicroPython only, machine code versions of gpsdro.hotpath.  Don't import
+# this directly, gpsdro.hotpath falls back to the plain Python versions
+# when it fails (ImportError on CPython, SyntaxError on a port without the
+# native emitter).
+#
+# rollover() is viper, machine words and no objects at all, which is
+# plenty for the delta register.  The window and slope sums outgrow a
+# machine word so they stay Python ints and are native, the same code as
+# gpsdro.hotpath and gpsdro.fixed compiled instead of interpreted, and
+# give the same results.
+#
+import micropython
+
+from micropython import const
+
+# Positions in a gpsdro.fixed estimator
+_IREG_SAMPLES		= const(0)
+_IREG_SUM_X			= const(1)
+_IREG_SUM_Y			= const(2)
+_IREG_SUM_XX		= const(3)
+_IREG_SUM_XY		= const(4)
+_IREG_SUM_YY		= const(5)
+
+
+@micropython.viper
+def rollover( value: int, crystal: int ) -> int:
+    if ( value > (crystal >> 1) ):
+        return value - crystal;
+    return value;
+
+
+@micropython.native
+def ring_push( data, sums, spans, count, pos, size, value ):
+    for index in range(count):
+        old = pos - spans[index];
+        if ( old < 0 ):
+            old += size;
+        sums[index] += value - data[old];
+    data[pos] = value;
+
+
+@micropython.native
+def ireg_add( reg, x, y ):
+    reg[_IREG_SAMPLES] += 1;
+    reg[_IREG_SUM_X] += x;
+    reg[_IREG_SUM_Y] += y;
+    reg[_IREG_SUM_XX] += x * x;
+    reg[_IREG_SUM_XY] += x * y;
+    reg[_IREG_SUM_YY] += y * y;
+
+
+@micropython.native
+def ireg_slope( reg ):
+    n = reg[_IREG_SAMPLES];
+    if ( n < 2 ):
+        return float(0.0);
+    sxx = (n * reg[_IREG_SUM_XX]) - (reg[_IREG_SUM_X] * reg[_IREG_SUM_X]);
+    if ( sxx <= 0 ):
+        return float(0.0);
+    return ((n * reg[_IREG_SUM_XY]) - (reg[_IREG_SUM_X] * reg[_IREG_SUM_Y])) / sxx;
@@ -0,0 +1,104 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Saved Profiles
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# What was found out about the oscillator on each port -- baud rate, the
+# model details from "i" and the learned response end markers -- kept in
+# a small JSON file on the flash so a restart can skip the baud probing
+# and the model discovery.
+#
+#   {
+#     "/dev/ttyS4": { "BAUD": 57600, "MODEL": {...}, "MARKERS": {...} }
+#   }
+#
+# The file is always replaced in one go (write a temp file and rename) so
+# a reset in the middle of a save can't leave half a profile behind.  On
+# FAT the old file has to be removed before the rename, a reset between
+# the two leaves only the temp file and that is read instead.
+#
+import os
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+PROFILE_FILE		= "gpsdro-profile.json"
+
+
+#
+# Write a whole file so it is either the old or the new one after a reset
+#
+def write_atomic( path, data ):
+    tempPath = path + ".tmp";
+    mode = "w";
+    if ( isinstance(data, (bytes, bytearray)) ):
+        mode = "wb";
+    with open(tempPath, mode) as tempFile:
+        tempFile.write(data);
+    try:
+        os.rename(tempPath, path);
+    except OSError:
+        # FAT won't rename over an existing file
+        os.remove(path);
+        os.rename(tempPath, path);
+
+
+#
+# JSON saved by write_atomic(), from the temp file if the reset came
+# between the remove and the rename.  None if there's nothing readable.
+#
+def read_atomic( path ):
+    for readPath in ( path, path + ".tmp" ):
+        try:
+            with open(readPath) as readFile:
+                return json.load(readFile);
+        except ValueError:
+            return None;
+        except OSError:
+            pass;
+    return None;
+
+
+def profile_load_all( path=PROFILE_FILE ):
+    profiles = read_atomic(path);
+    if ( not isinstance(profiles, dict) ):
+        return {};
+    return profiles;
+
+
+#
+# Profile saved for a port, None if there isn't one
+#
+def profile_load( port, path=PROFILE_FILE ):
+    profile = profile_load_all(path).get(port);
+    if ( (not isinstance(profile, dict)) or ("BAUD" not in profile) or ("MODEL" not in profile) ):
+        return None;
+    return profile;
+
+
+def profile_save( port, profile, path=PROFILE_FILE ):
+    profiles = profile_load_all(path);
+    profiles[port] = profile;
+    try:
+        write_atomic(path, json.dumps(profiles));
+    except OSError as error:
+        print ("Unable to save profile:", error);
@@ -0,0 +1,85 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Streaming Regression
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Least squares slope of the PPS delta against the sample counter, updated
+# one point at a time.
+#
+# The old raw XX/YY/XY sums grew with the square of the counter and the
+# slope came from subtracting two huge products, with single precision
+# floats on the Pico that falls apart within hours.  Here the means and
+# the centred co-moments are updated Welford style so every term stays
+# the size of the spread of the data, not of the data itself.
+#
+# Each estimator is a small flat list so it can sit in a symSumsArray slot.
+#
+REG_SAMPLES			= 0
+REG_MEAN_X			= 1
+REG_MEAN_Y			= 2
+REG_SXX				= 3
+REG_SYY				= 4
+REG_SXY				= 5
+
+
+def reg_new():
+    return [int(0), float(0), float(0), float(0), float(0), float(0)];
+
+
+#
+# Add a point, x is the counter and y the PPS delta
+#
+def reg_add( reg, x, y ):
+    n = reg[REG_SAMPLES] + 1;
+    reg[REG_SAMPLES] = n;
+
+    dx = x - reg[REG_MEAN_X];
+    dy = y - reg[REG_MEAN_Y];
+    reg[REG_MEAN_X] += dx / n;
+    reg[REG_MEAN_Y] += dy / n;
+
+    dyNew = y - reg[REG_MEAN_Y];
+    reg[REG_SXX] += dx * (x - reg[REG_MEAN_X]);
+    reg[REG_SYY] += dy * dyNew;
+    reg[REG_SXY] += dx * dyNew;
+
+
+#
+# Slope in y units per x unit, 0 until there are two distinct points
+#
+def reg_slope( reg ):
+    if ( (reg[REG_SAMPLES] < 2) or (reg[REG_SXX] <= 0) ):
+        return float(0.0);
+    return reg[REG_SXY] / reg[REG_SXX];
+
+
+#
+# Standard error of the slope from the residuals, 0 until there are three
+# points to work it out from
+#
+def reg_stderr( reg ):
+    n = reg[REG_SAMPLES];
+    if ( (n < 3) or (reg[REG_SXX] <= 0) ):
+        return float(0.0);
+
+    residual = reg[REG_SYY] - (reg[REG_SXY] * reg[REG_SXY] / reg[REG_SXX]);
+    if ( residual <= 0 ):
+        return float(0.0);
+    return (residual / (n - 2) / reg[REG_SXX]) ** 0.5;
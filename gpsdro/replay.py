@@ -0,0 +1,375 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Capture and Replay
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Capture every exchange with the oscillator and play it back into the
+# unmodified discipliner on virtual time.
+#
+# Capture -- set GPSDRO_CAPTURE=<file> and every command and its response
+# lines are appended to the file with the monotonic time it was sent:
+#
+#   <nanoseconds> TAB <command> TAB <line>|<line>|...
+#
+# Replay -- the script is loaded with a fake serial module and a virtual
+# clock, then main() is run as is.  Responses come off the tape by command
+# letter:
+#
+#   j       -- the next recorded one not more than REPLAY_SLACK behind the
+#              current time, the clock jumps forward to it if it is ahead
+#              (it is what paces the PPS ticks)
+#   i w p   -- the latest recorded one up to REPLAY_SLACK ahead
+#   others  -- no response, the command is a decision and is logged
+#
+# Decisions are logged against the number of the "j" response they came
+# after, for the recording and for the replay, so the two can be diffed:
+#
+#   python3 -m gpsdro.replay capture.txt --original orig.txt --decisions new.txt
+#   diff orig.txt new.txt
+#
+# The tape only plays back what the oscillator did under the original
+# decisions, a changed algorithm sees the same PPS deltas whatever DDS
+# values it sets.
+#
+import time
+
+from gpsdro.transport import FRAME_MARKERS, register_base
+
+REPLAY_CLOCK_CMDS	= "j"
+REPLAY_QUERY_CMDS	= "iwjp"
+REPLAY_SLACK		= 500000000
+
+
+#
+# Tape wasn't long enough for the replay to go on
+#
+class ReplayFinished( Exception ):
+    pass
+
+
+#
+# Wraps a SerialTransport and writes down everything it does.  Anything
+# else (framer, stats, pipeline) goes straight through to the transport.
+#
+class CaptureTransport:
+
+    def __init__( self, transport, captureFile ):
+        self.transport = transport;
+        self.captureFile = captureFile;
+        self.pendingCmd = None;
+        self.sentTime = 0;
+
+    def __getattr__( self, name ):
+        return getattr(self.transport, name);
+
+    def __setattr__( self, name, value ):
+        if ( name in ("transport", "captureFile", "pendingCmd", "sentTime") ):
+            object.__setattr__(self, name, value);
+        else:
+            setattr(self.transport, name, value);
+
+    def log( self, stamp, cmd, lines ):
+        self.captureFile.write("{}\t{}\t{}\n".format(stamp, cmd.strip(), "|".join(lines)));
+        self.captureFile.flush();
+
+    def send( self, cmd ):
+        self.pendingCmd = cmd;
+        self.sentTime = time.monotonic_ns();
+        self.transport.send(cmd);
+
+    def receive( self ):
+        lines = self.transport.receive();
+        if ( self.pendingCmd is not None ):
+            self.log(self.sentTime, self.pendingCmd, lines);
+            self.pendingCmd = None;
+        return lines;
+
+    def query( self, cmd ):
+        self.send(cmd);
+        return self.receive();
+
+    def query_many( self, cmds ):
+        stamp = time.monotonic_ns();
+        responses = self.transport.query_many(cmds);
+        for index in range(len(responses)):
+            self.log(stamp, cmds[index], responses[index]);
+        return responses;
+
+    #
+    # The lines are needed for the capture, so this goes the string way
+    #
+    def query_registers( self, cmds, values, decimal="" ):
+        for cmd in cmds:
+            if ( cmd not in FRAME_MARKERS ):
+                return False;
+
+        responses = self.query_many(cmds);
+        for index in range(len(cmds)):
+            values[index] = None;
+            for line in responses[index]:
+                start = line.find(FRAME_MARKERS[cmds[index]]);
+                if ( start >= 0 ):
+                    try:
+                        values[index] = int(line[start + len(FRAME_MARKERS[cmds[index]]):], register_base(cmds[index], decimal));
+                    except ValueError:
+                        pass;
+                    break;
+        return True;
+
+
+def read_capture( path ):
+    with open(path) as captureFile:
+        for text in captureFile:
+            fields = text.rstrip("\n").split("\t");
+            if ( len(fields) < 3 ):
+                continue;
+            lines = [];
+            if ( fields[2] ):
+                lines = fields[2].split("|");
+            yield int(fields[0]), fields[1], lines;
+
+
+#
+# Recorded responses, read as the replay needs them so a week long capture
+# doesn't have to fit in memory
+#
+class ReplayTape:
+
+    def __init__( self, path, slack=REPLAY_SLACK ):
+        self.records = read_capture(path);
+        self.slack = slack;
+        self.ahead = None;
+        self.clockRecords = [];
+        self.latest = {};
+        self.clockIndex = -1;
+        self.read_next();
+        self.start = 0;
+        if ( self.ahead is not None ):
+            self.start = self.ahead[0];
+
+    def read_next( self ):
+        try:
+            self.ahead = next(self.records);
+        except StopIteration:
+            self.ahead = None;
+
+    #
+    # Take in the record looked ahead at, "j" ones are queued and the rest
+    # only keep the latest per command
+    #
+    def take( self ):
+        stamp, cmd, lines = self.ahead;
+        if ( cmd[:1] in REPLAY_CLOCK_CMDS ):
+            self.clockIndex += 1;
+            self.clockRecords.append((stamp, self.clockIndex, lines));
+        elif ( cmd[:1] in REPLAY_QUERY_CMDS ):
+            self.latest[cmd[:1]] = lines;
+        self.read_next();
+
+    def clock_response( self, now ):
+        while True:
+            while ( len(self.clockRecords) ):
+                stamp, index, lines = self.clockRecords.pop(0);
+                if ( stamp >= now - self.slack ):
+                    return stamp, index, lines;
+            if ( self.ahead is None ):
+                raise ReplayFinished();
+            self.take();
+
+    def query_response( self, cmd, now ):
+        while ( (self.ahead is not None) and (self.ahead[0] <= now + self.slack) ):
+            self.take();
+        # Nothing yet, use the first one on the tape
+        while ( (cmd not in self.latest) and (self.ahead is not None) ):
+            self.take();
+        return self.latest.get(cmd, []);
+
+
+#
+# The pyserial calls SerialTransport makes, answered from the tape
+#
+class ReplayPort:
+
+    def __init__( self, tape, clock, decisionFile=None ):
+        self.tape = tape;
+        self.clock = clock;
+        self.decisionFile = decisionFile;
+        self.lines = [];
+        self.pending = b"";
+        self.clockIndex = -1;
+        self.responses = 0;
+        self.timeout = 0;
+
+    def write( self, data ):
+        text = data.decode("ascii");
+        cmds = [];
+        for c in text:
+            if ( "a" <= c <= "z" ):
+                cmds.append(c);
+            elif ( len(cmds) and (c not in "\r\n") ):
+                cmds[-1] += c;
+
+        for cmd in cmds:
+            if ( cmd[0] in REPLAY_CLOCK_CMDS ):
+                stamp, self.clockIndex, lines = self.tape.clock_response(self.clock.monotonic_ns());
+                self.clock.advance_to(stamp);
+            elif ( cmd[0] in REPLAY_QUERY_CMDS ):
+                lines = self.tape.query_response(cmd[0], self.clock.monotonic_ns());
+            else:
+                lines = [];
+                if ( self.decisionFile is not None ):
+                    self.decisionFile.write("{}\t{}\n".format(self.clockIndex, cmd.strip()));
+            self.responses += 1;
+            self.lines.extend(lines);
+        return len(data);
+
+    #
+    # An empty read takes the port's read timeout, like a real one
+    #
+    @property
+    def in_waiting( self ):
+        return len(self.pending) + sum(len(line) + 2 for line in self.lines);
+
+    def readinto( self, buffer ):
+        if ( (len(self.pending) == 0) and len(self.lines) ):
+            self.pending = (self.lines.pop(0) + "\r\n").encode("ascii");
+        if ( len(self.pending) == 0 ):
+            self.clock.sleep(self.timeout);
+            return 0;
+        count = min(len(buffer), len(self.pending));
+        buffer[:count] = self.pending[:count];
+        self.pending = self.pending[count:];
+        return count;
+
+    def reset_input_buffer( self ):
+        self.lines = [];
+        self.pending = b"";
+
+    def flush( self ):
+        pass;
+
+    def close( self ):
+        pass;
+
+
+#
+# Just enough of the pyserial module for the script, every port it opens
+# is the replay port
+#
+class ReplaySerialModule:
+
+    PARITY_NONE = "N";
+
+    def __init__( self, port ):
+        self.port = port;
+
+    def Serial( self, *args, **kwargs ):
+        self.port.timeout = kwargs.get("timeout") or 0;
+        return self.port;
+
+
+#
+# Same format as the replay decisions, from the capture file
+#
+def capture_decisions( path, outFile ):
+    clockIndex = -1;
+    for stamp, cmd, lines in read_capture(path):
+        if ( cmd[:1] in REPLAY_CLOCK_CMDS ):
+            clockIndex += 1;
+        elif ( cmd[:1] not in REPLAY_QUERY_CMDS ):
+            outFile.write("{}\t{}\n".format(clockIndex, cmd));
+
+
+#
+# Load the discipliner script without starting it, with the replay port
+# and the virtual clock swapped in.  The transport's response timeouts go
+# on the virtual clock too.
+#
+def load_script( scriptPath, port, clock, speedup=1 ):
+    import importlib.util, os, sys
+    import gpsdro.transport
+
+    gpsdro.transport.ticks_us = clock.ticks_us;
+
+    # Nothing from the replay should touch the real state files
+    for name in ( "GPSDRO_PROFILE", "GPSDRO_CHECKPOINT", "GPSDRO_CAPTURE" ):
+        os.environ[name] = "";
+    os.environ["GPSDRO_METRICS"] = "0";
+    os.environ["GPSDRO_SPEEDUP"] = str(speedup);
+
+    sys.modules["serial"] = ReplaySerialModule(port);
+    spec = importlib.util.spec_from_file_location("gpsdro_replayed", scriptPath);
+    script = importlib.util.module_from_spec(spec);
+    spec.loader.exec_module(script);
+    script.time = clock;
+    script.ticks_us = clock.ticks_us;
+    return script;
+
+
+def main( argv=None ):
+    import argparse, contextlib, os
+
+    from gpsdro.clock import VirtualClock
+
+    parser = argparse.ArgumentParser(description="Replay a GPSDRO capture through the discipliner on virtual time");
+    parser.add_argument("capture");
+    parser.add_argument("--script", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "discipline.py"));
+    parser.add_argument("--decisions", help="write the replay's decisions here");
+    parser.add_argument("--original", help="write the recorded decisions here");
+    parser.add_argument("--speedup", type=float, default=1, help="GPSDRO_SPEEDUP the capture was made with");
+    parser.add_argument("--verbose", action="store_true", help="show the discipliner output");
+    args = parser.parse_args(argv);
+
+    if ( args.original ):
+        with open(args.original, "w") as outFile:
+            capture_decisions(args.capture, outFile);
+
+    tape = ReplayTape(args.capture, int(REPLAY_SLACK / args.speedup));
+    clock = VirtualClock(tape.start);
+    decisionFile = None;
+    if ( args.decisions ):
+        decisionFile = open(args.decisions, "w");
+    port = ReplayPort(tape, clock, decisionFile);
+    script = load_script(args.script, port, clock, args.speedup);
+
+    started = time.monotonic();
+    output = None;
+    try:
+        if ( args.verbose ):
+            script.main();
+        else:
+            output = open(os.devnull, "w");
+            with contextlib.redirect_stdout(output):
+                script.main();
+    except ReplayFinished:
+        pass;
+    finally:
+        if ( output is not None ):
+            output.close();
+        if ( decisionFile is not None ):
+            decisionFile.close();
+
+    print ("Replayed {:.0f} s of recording ({} responses) in {:.1f} s".format((clock.monotonic_ns() - tape.start) / 1e9,
+                port.responses, time.monotonic() - started));
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
@@ -0,0 +1,83 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Running Sum Ring Buffer
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Ring buffer of PPS values that keeps the sum of the last N entries for
+# one or more window lengths as values are pushed in.
+#
+# Reading a window sum is a lookup, there is no slicing or sum() and nothing
+# is allocated after the buffer is created -- the values live in an
+# array('l') and the sums stay Python ints, so a window of hours can't
+# overflow them.
+#
+#   symPPS = RingSum(600, (60, 600))
+#   symPPS.push(value)
+#   symPPS.window_sum(60)
+#
+from array import array
+
+from gpsdro.hotpath import ring_push
+
+
+class RingSum:
+
+    #
+    # size has to be at least as big as the largest window
+    #
+    def __init__( self, size, windows ):
+        if ( max(windows) > size ):
+            raise ValueError("window larger than the ring");
+
+        self.size = size;
+        self.windows = tuple(windows);
+        self.data = array('l', [0] * size);
+        self.sums = [0] * len(self.windows);
+        self.pos = 0;
+        self.count = 0;
+
+    #
+    # Add a value, each window drops the entry that just fell out of it.
+    # The slots start zeroed so a part filled window sums correctly too.
+    #
+    def push( self, value ):
+        ring_push(self.data, self.sums, self.windows, len(self.windows), self.pos, self.size, value);
+        self.pos += 1;
+        if ( self.pos == self.size ):
+            self.pos = 0;
+        if ( self.count < self.size ):
+            self.count += 1;
+
+    def window_sum( self, window ):
+        return self.sums[self.windows.index(window)];
+
+    #
+    # Value pushed "age" entries ago, 0 is the newest
+    #
+    def recent( self, age=0 ):
+        return self.data[(self.pos - 1 - age) % self.size];
+
+    def clear( self ):
+        for index in range(self.size):
+            self.data[index] = 0;
+        for index in range(len(self.sums)):
+            self.sums[index] = 0;
+        self.pos = 0;
+        self.count = 0;
@@ -0,0 +1,188 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Timer Scheduler
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Deadline scheduler for the main loop.  Tasks are just names with a
+# priority and a deadline, kept in a heap, and next() sleeps until the
+# earliest one is due instead of waking every 10ms to compare trackers:
+#
+#   sched = TimerScheduler(ticks_us, ticks_diff, sleep_us)
+#   sched.add("pps", 0, 1000000, 1000000)
+#   sched.add("health", 2, 5000000)
+#   while True:
+#       task = sched.next()
+#       if ( task == "pps" ):
+#           ...
+#           sched.repeat("pps")         # next one on the 1s grid
+#       elif ( task == "health" ):
+#           ...
+#           sched.at("health", 10000000)
+#
+# Everything is in microseconds.  The clock functions are handed in so the
+# same code runs on utime ticks_us() / ticks_diff() on a board, on
+# monotonic_ns() based ones on Linux and on the replay's virtual clock.
+# The ticks are added up into a time that doesn't wrap, so the heap can
+# compare deadlines directly.
+#
+# A task that has fired isn't scheduled again until the caller says when.
+# When several are due at once the lowest priority number goes first.
+#
+try:
+    import heapq
+except ImportError:
+    import uheapq as heapq
+
+# Longest single sleep in us, keeps ticks_us() read often enough not to
+# lose a wrap on MicroPython
+SCHED_MAX_WAIT		= 1000000
+
+# Task list entries
+SCHED_POS_PRIORITY	= 0
+SCHED_POS_DEADLINE	= 1
+SCHED_POS_PERIOD	= 2
+SCHED_POS_VERSION	= 3
+
+
+class TimerScheduler:
+
+    def __init__( self, ticks, diff, sleep ):
+        self.ticks = ticks;
+        self.diff = diff;
+        self.sleep = sleep;
+        self.lastTick = ticks();
+        self.now = 0;
+        self.heap = [];
+        self.tasks = {};
+        self.late = 0;
+
+    #
+    # Microseconds since the scheduler was made
+    #
+    def clock( self ):
+        tick = self.ticks();
+        self.now += self.diff(tick, self.lastTick);
+        self.lastTick = tick;
+        return self.now;
+
+    #
+    # Register a task, or change one, first due "delay" us from now.  The
+    # period is only used by repeat().
+    #
+    def add( self, name, priority, delay, period=0 ):
+        version = 0;
+        if ( name in self.tasks ):
+            version = self.tasks[name][SCHED_POS_VERSION];
+        self.tasks[name] = [priority, 0, period, version];
+        self.at(name, delay);
+
+    def set_deadline( self, name, deadline ):
+        task = self.tasks[name];
+        task[SCHED_POS_DEADLINE] = deadline;
+        task[SCHED_POS_VERSION] += 1;
+        heapq.heappush(self.heap, (deadline, task[SCHED_POS_PRIORITY], task[SCHED_POS_VERSION], name));
+
+    #
+    # Due "delay" us from now, 0 makes it due straight away
+    #
+    def at( self, name, delay ):
+        self.set_deadline(name, self.clock() + delay);
+
+    #
+    # Due one period after its last deadline, so it stays on the grid
+    # however long the work took.  Whole periods that have already gone
+    # by are skipped.
+    #
+    def repeat( self, name ):
+        task = self.tasks[name];
+        period = task[SCHED_POS_PERIOD];
+        deadline = task[SCHED_POS_DEADLINE] + period;
+        now = self.clock();
+        if ( deadline <= now ):
+            deadline += ((now - deadline) // period + 1) * period;
+        self.set_deadline(name, deadline);
+
+    #
+    # Take the task off the schedule until at() or repeat()
+    #
+    def cancel( self, name ):
+        self.tasks[name][SCHED_POS_VERSION] += 1;
+
+    #
+    # us until the task is due, negative once it's overdue
+    #
+    def remaining( self, name ):
+        return self.tasks[name][SCHED_POS_DEADLINE] - self.clock();
+
+    def pending( self, entry ):
+        task = self.tasks.get(entry[3]);
+        return ( (task is not None) and (task[SCHED_POS_VERSION] == entry[2]) );
+
+    #
+    # Sleep until the next task is due and return its name, or None if
+    # nothing is scheduled.  "idle" is called instead of the sleep with the
+    # us to wait, it may come back early (e.g. after answering a metrics
+    # scrape).  How late the task is goes in self.late.
+    #
+    def next( self, idle=None ):
+        heap = self.heap;
+        while True:
+            while ( len(heap) and (not self.pending(heap[0])) ):
+                heapq.heappop(heap);
+            if ( not len(heap) ):
+                return None;
+
+            now = self.clock();
+            wait = heap[0][0] - now;
+            if ( wait > 0 ):
+                (idle or self.sleep)(min(wait, SCHED_MAX_WAIT));
+                continue;
+
+            # Everything that's due, the best priority goes
+            due = [];
+            while ( len(heap) and (heap[0][0] <= now) ):
+                entry = heapq.heappop(heap);
+                if ( self.pending(entry) ):
+                    due.append(entry);
+            best = due[0];
+            for entry in due:
+                if ( (entry[1], entry[0]) < (best[1], best[0]) ):
+                    best = entry;
+            for entry in due:
+                if ( entry is not best ):
+                    heapq.heappush(heap, entry);
+
+            self.cancel(best[3]);
+            self.late = now - best[0];
+            return best[3];
+
+    #
+    # Sleep until one task is due, whatever else is scheduled, and take it
+    # off the schedule.  Returns how late it is.
+    #
+    def wait( self, name, idle=None ):
+        while True:
+            wait = self.remaining(name);
+            if ( wait <= 0 ):
+                break;
+            (idle or self.sleep)(min(wait, SCHED_MAX_WAIT));
+        self.cancel(name);
+        self.late = -wait;
+        return self.late;
@@ -0,0 +1,232 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Response Schemas
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Per model field tables for the "w" health dump and the "i" settings lines.
+#
+# Every field maps to a fixed decoder so a dump is parsed in one pass with
+# no guessing what a value is on each call.  The SA22C and X72 print their
+# integers in hex and their floats as the 8 hex digits of the IEEE single
+# followed by a ".", the X99 prints plain decimal.
+#
+# A field that isn't in the table is worked out once from the first value
+# seen, the same way the old per-call code did it, and then kept.  Fields
+# not in "wanted" aren't decoded at all.
+#
+#   schema = ResponseSchema(SCHEMA_HEALTH, SYM_SA22C)
+#   schema.parse(lines, symStatusArray)
+#
+import struct
+
+SYM_SA22C	    	= 22
+SYM_X72		    	= 72
+SYM_X99		    	= 99
+
+DEC_SKIP			= 0
+DEC_TEXT			= 1
+DEC_INT				= 2
+DEC_HEX				= 3
+DEC_FLOAT			= 4
+DEC_HEX_FLOAT		= 5
+DEC_HZ				= 6
+
+SCHEMA_HEX_HEALTH	= { "IFPGACTL": DEC_HEX, "DMP17": DEC_HEX_FLOAT, "DMP5": DEC_HEX_FLOAT,
+                        "DHTRVOLT": DEC_HEX_FLOAT, "DLVTHERM": DEC_HEX_FLOAT, "DLVOUT": DEC_HEX_FLOAT,
+                        "DRVTHERM": DEC_HEX_FLOAT, "DRVOUT": DEC_HEX_FLOAT, "DCURTEMP": DEC_HEX_FLOAT,
+                        "DCIPLOCK": DEC_HEX, "PWRHRS": DEC_HEX, "PWRTICKS": DEC_HEX, "LMPSTRTS": DEC_HEX };
+
+SCHEMA_DEC_HEALTH	= { "IFPGACTL": DEC_HEX, "DMP17": DEC_FLOAT, "DMP5": DEC_FLOAT,
+                        "DHTRVOLT": DEC_FLOAT, "DLVTHERM": DEC_FLOAT, "DLVOUT": DEC_FLOAT,
+                        "DRVTHERM": DEC_FLOAT, "DRVOUT": DEC_FLOAT, "DCURTEMP": DEC_FLOAT,
+                        "DCIPLOCK": DEC_INT, "PWRHRS": DEC_INT, "PWRTICKS": DEC_INT, "LMPSTRTS": DEC_INT };
+
+SCHEMA_HEX_MODEL	= { "CRYSTAL": DEC_HZ, "CTL REG": DEC_HEX, "TIC": DEC_HEX,
+                        "1PPS": DEC_TEXT, "SRVC": DEC_TEXT, "FC": DEC_TEXT };
+
+SCHEMA_DEC_MODEL	= { "CRYSTAL": DEC_HZ, "CTL REG": DEC_HEX, "TIC": DEC_INT,
+                        "1PPS": DEC_TEXT, "SRVC": DEC_TEXT, "FC": DEC_TEXT };
+
+SCHEMA_HEALTH		= { SYM_SA22C: SCHEMA_HEX_HEALTH, SYM_X72: SCHEMA_HEX_HEALTH, SYM_X99: SCHEMA_DEC_HEALTH };
+SCHEMA_MODEL		= { SYM_SA22C: SCHEMA_HEX_MODEL, SYM_X72: SCHEMA_HEX_MODEL, SYM_X99: SCHEMA_DEC_MODEL };
+
+HEX_DIGITS			= "0123456789ABCDEFabcdef"
+DEC_DIGITS			= "0123456789+-"
+
+
+#
+# "41580000." -> 13.5, None if it isn't 8 hex digits
+#
+def hex_float( text ):
+    text = text.strip('.');
+    if ( len(text) != 8 ):
+        return None;
+    return struct.unpack('>f', struct.pack('>I', int(text, 16)))[0];
+
+
+#
+# Pick a decoder for a field that isn't in the table from how its value
+# looks, the rules the old parser applied on every call
+#
+def guess_decoder( value, hexModel ):
+    if ( value.find(".") >= 0 ):
+        if ( hexModel and (len(value.strip('.')) == 8) and all(c in HEX_DIGITS for c in value.strip('.')) ):
+            return DEC_HEX_FLOAT;
+        return DEC_FLOAT;
+    if ( hexModel and all(c in HEX_DIGITS for c in value) ):
+        return DEC_HEX;
+    if ( all(c in DEC_DIGITS for c in value) ):
+        return DEC_INT;
+    return DEC_TEXT;
+
+
+class ResponseSchema:
+
+    def __init__( self, table, model, wanted=None ):
+        self.hexModel = ( model != SYM_X99 );
+        self.wanted = wanted;
+        self.fields = {};
+        for key in table.get(model, {}):
+            if ( (wanted is None) or (key in wanted) ):
+                self.fields[key] = table[model][key];
+            else:
+                self.fields[key] = DEC_SKIP;
+
+    def decoder( self, key, value ):
+        kind = self.fields.get(key);
+        if ( kind is None ):
+            if ( (self.wanted is not None) and (key not in self.wanted) ):
+                kind = DEC_SKIP;
+            else:
+                kind = guess_decoder(value, self.hexModel);
+            self.fields[key] = kind;
+        return kind;
+
+    def decode( self, kind, value ):
+        if ( kind == DEC_HEX_FLOAT ):
+            return hex_float(value);
+        if ( kind == DEC_FLOAT ):
+            return float(value);
+        if ( kind == DEC_HEX ):
+            return int(value, 16);
+        if ( kind == DEC_INT ):
+            return int(value);
+        if ( kind == DEC_HZ ):
+            # Hex models give "3938700.0HZ", the X99 "60000000HZ"
+            if ( value.find("HZ") >= 0 ):
+                value = value[:value.find("HZ")];
+            if ( self.hexModel ):
+                if ( value.find(".") >= 0 ):
+                    value = value[:value.find(".")];
+                return int(value, 16);
+            return int(float(value));
+        return value;
+
+    #
+    # One "KEY: VALUE" per line, the "w" dump
+    #
+    def parse( self, lineArray, out ):
+        for line in lineArray:
+            split = line.find(": ");
+            if ( split < 0 ):
+                continue;
+            self.store(line[:split].strip(), line[split+2:].strip(), out);
+
+    #
+    # "KEY: VALUE, KEY: VALUE" on one line, the "i" settings lines
+    #
+    def parse_items( self, line, out ):
+        for item in line.split(", "):
+            split = item.find(": ");
+            if ( split >= 0 ):
+                self.store(item[:split].strip(), item[split+2:].strip(), out);
+
+    def store( self, key, value, out ):
+        kind = self.decoder(key, value);
+        if ( kind == DEC_SKIP ):
+            return;
+        try:
+            decoded = self.decode(kind, value);
+        except ValueError:
+            # Garbled line, keep the last good value
+            return;
+        if ( decoded is not None ):
+            out[key] = decoded;
+
+
+#
+# The "i" banner into a model dict: MODELTEXT, MODELENUM, FRIMWARE, S/N and
+# the settings lines.  The dict is returned for convenience.
+#
+def parse_banner( lineArray, out ):
+    modelSchema = None;
+    for x in lineArray:
+        if ( x.find("BY SYMMETRICOM,") >= 0 ):
+            tempVal = x[:x.find("BY SYMMETRICOM,")];
+            if (tempVal.find("22") >=0 ):
+                tempType = SYM_SA22C;
+            elif (tempVal.find("X 9") >= 0):
+                tempType = SYM_X99;
+            else:
+                tempType = SYM_X72;
+            out["MODELTEXT"] = tempVal.strip();
+            out["MODELENUM"] = tempType;
+            modelSchema = ResponseSchema(SCHEMA_MODEL, tempType);
+
+        if ( (x.find("VERSION ") >= 0) and (x.find(" OF") >= 0) ):
+            out["FRIMWARE"] = x[x.find("VERSION ",)+8:x.find(" OF")];
+
+        if ( (x.find("SERIAL CODE IS ") >= 0) and (x.find("-H,") >= 0) ):
+            out["S/N"] = str(x[x.find("SERIAL CODE IS ",)+15:x.find("-H,")])+"-H";
+
+        if ( modelSchema is None ):
+            continue;
+
+        if ( ( (x.find("CRYSTAL: ") >= 0) or (x.find("CTL REG: ") >= 0) ) and (x.find(", ") >= 0) ):
+            modelSchema.parse_items(x, out);
+
+        if ( ( (x.find(" SRVC: ") >= 0) and (x.find("FC: ") >= 0) ) and (x.find(", ") >= 0) ):
+            modelSchema.parse_items(x, out);
+    return out;
+
+
+#
+# Value of the "j" delta register, None if it isn't in the response
+#
+def parse_delta_reg( lineArray, model ):
+    for x in lineArray:
+        if ( x.find("DELTA REG:") >= 0):
+            element = x.split(": ");
+            if ( model == SYM_X99 ):
+                return int(element[1]);
+            return int(element[1], 16);
+    return None;
+
+
+#
+# Value of the "p" control register, None if it isn't in the response
+#
+def parse_control_reg( lineArray ):
+    for x in lineArray:
+        if ( x.find("ONTROL REG:") >= 0):
+            element = x.split(": ");
+            if (element[0].find("ONTROL REG") >= 0):
+                return int(element[1], 16);
+    return None;
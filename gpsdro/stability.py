@@ -0,0 +1,456 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Stability Analysis
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Overlapping Allan deviation, modified Allan deviation, time deviation and
+# TIE / MTIE of the oscillator against the 1PPS, from the PPS delta.
+#
+# The PPS delta is the phase of the oscillator against the 1PPS in crystal
+# counts, but it wraps at the crystal frequency and the "Adjusted" value is
+# moved by PPSOFFSET every time the DDS is nudged.  pps_phase() undoes
+# both: the offset is added back, the value is rollover corrected the same
+# way as pps_rollover_correction() and any wrap between two samples is
+# unwrapped, leaving one continuous phase in counts.
+#
+# Everything is worked out on the integer phase and only scaled to seconds
+# (1/crystal) at the end, with x the phase, m samples per tau and N samples
+#
+#   ADEV^2 = sum( x[i+2m] - 2x[i+m] + x[i] )^2 / (2 tau^2 (N-2m))
+#   MDEV^2 = sum( S[j+3m] - 3S[j+2m] + 3S[j+m] - S[j] )^2 / (2 m^2 tau^2 (N-3m+1))
+#   TDEV   = tau MDEV / sqrt(3)
+#   MTIE   = largest max - min of x over any m+1 samples
+#
+# S being the running sum of x, so every tau is one pass over the data
+# whatever its length.  The batch functions need NumPy, StabilityTracker
+# keeps the same sums going one sample at a time in plain Python and only
+# remembers 3 x the longest tau, it can run on the board:
+#
+#   python3 -m gpsdro.stability gpsdro-telemetry.tick
+#
+#   tracker = StabilityTracker(60000000, (1, 10, 100, 1000))
+#   tracker.push(pps_rollover_correction(delta))
+#   tracker.adev(100)
+#
+# The phase is whole crystal counts everywhere, a fraction of a count is
+# refused with a ValueError rather than rounded away.  When the tic counter
+# is reset the phase jumps, tracker.restart() starts a new segment so no
+# term is taken across the jump.
+#
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+STAB_TAU0			= 1.0
+STAB_CRYSTAL		= 60000000
+
+
+#
+# The phase as an int64 array, ValueError if it isn't whole counts
+#
+def phase_counts( phase ):
+    x = numpy.asarray(phase);
+    if ( x.dtype.kind == "f" ):
+        if ( not numpy.all(numpy.floor(x) == x) ):
+            raise ValueError("phase has to be in whole crystal counts");
+    elif ( x.dtype.kind not in "iu" ):
+        raise ValueError("phase has to be in whole crystal counts");
+    return x.astype(numpy.int64);
+
+
+#
+# Continuous phase in crystal counts from PPS delta readings (raw or
+# already rollover corrected), or from "Adjusted" values plus their
+# PPSOFFSET
+#
+def pps_phase( deltas, crystal, offsets=None ):
+    crystal = int(crystal);
+    x = numpy.asarray(deltas, dtype=numpy.int64);
+    if ( offsets is not None ):
+        x = x + numpy.asarray(offsets, dtype=numpy.int64);
+    x = numpy.where(x > (crystal // 2), x - crystal, x);
+    if ( len(x) < 2 ):
+        return x;
+
+    step = numpy.diff(x);
+    step -= crystal * ((step + (crystal // 2)) // crystal);
+    phase = numpy.empty(len(x), dtype=numpy.int64);
+    phase[0] = x[0];
+    numpy.cumsum(step, out=phase[1:]);
+    phase[1:] += x[0];
+    return phase;
+
+
+#
+# Samples per tau, 1 2 4 8 ... or 1 2 5 10 20 ..., as long as there are
+# enough samples for the modified Allan deviation (3m+1)
+#
+def octave_taus( count ):
+    taus = [];
+    m = 1;
+    while ( (3 * m + 1) <= count ):
+        taus.append(m);
+        m *= 2;
+    return taus;
+
+
+def decade_taus( count ):
+    taus = [];
+    decade = 1;
+    while True:
+        for step in ( 1, 2, 5 ):
+            m = step * decade;
+            if ( (3 * m + 1) > count ):
+                return taus;
+            taus.append(m);
+        decade *= 10;
+
+
+def adev( phase, crystal, taus, tau0=STAB_TAU0 ):
+    # Counts are whole numbers well inside 2^53, exact as doubles too
+    x = phase_counts(phase).astype(numpy.float64);
+    d2 = numpy.empty(len(x), dtype=numpy.float64);
+    result = [];
+    for m in taus:
+        count = len(x) - 2 * m;
+        if ( count < 1 ):
+            result.append(float("nan"));
+            continue;
+        d2 = d2[:count];
+        numpy.subtract(x[2 * m:], x[m:len(x) - m], out=d2);
+        d2 -= x[m:len(x) - m];
+        d2 += x[:count];
+        tau = m * tau0;
+        result.append(math.sqrt(numpy.dot(d2, d2) / (2 * count * tau * tau)) / crystal);
+    return result;
+
+
+def mdev( phase, crystal, taus, tau0=STAB_TAU0 ):
+    x = phase_counts(phase);
+    n = len(x);
+    s = numpy.zeros(n + 1, dtype=numpy.int64);
+    numpy.cumsum(x, out=s[1:]);
+    w = numpy.empty(n, dtype=numpy.int64);
+    result = [];
+    for m in taus:
+        count = n - 3 * m + 1;
+        if ( count < 1 ):
+            result.append(float("nan"));
+            continue;
+        numpy.subtract(s[2 * m:n + 1 - m], s[m:n + 1 - 2 * m], out=w[:count]);
+        w[:count] *= -3;
+        w[:count] += s[3 * m:];
+        w[:count] -= s[:count];
+        wide = w[:count].astype(numpy.float64);
+        tau = m * tau0;
+        result.append(math.sqrt(numpy.dot(wide, wide) / (2 * m * m * tau * tau * count)) / crystal);
+    return result;
+
+
+def tdev( phase, crystal, taus, tau0=STAB_TAU0 ):
+    modified = mdev(phase, crystal, taus, tau0);
+    return [m * tau0 * modified[index] / math.sqrt(3) for index, m in enumerate(taus)];
+
+
+#
+# Time interval error in seconds, the phase against the first sample
+#
+def tie( phase, crystal ):
+    x = phase_counts(phase);
+    return (x - x[0]) / float(crystal);
+
+
+#
+# The window max / min for m+1 samples comes from two overlapping windows
+# of the largest power of two that fits, those are built up by doubling
+# as the taus get longer, so it needs the taus in order
+#
+def mtie( phase, crystal, taus ):
+    x = phase_counts(phase);
+    high = x;
+    low = x;
+    width = 1;
+    windowHigh = numpy.empty(len(x), dtype=numpy.int64);
+    windowLow = numpy.empty(len(x), dtype=numpy.int64);
+    result = [];
+    for m in taus:
+        span = m + 1;
+        if ( span > len(x) ):
+            result.append(float("nan"));
+            continue;
+        while ( (width * 2) <= span ):
+            high = numpy.maximum(high[:-width], high[width:]);
+            low = numpy.minimum(low[:-width], low[width:]);
+            width *= 2;
+        count = len(x) - span + 1;
+        shift = span - width;
+        spread = windowHigh[:count];
+        numpy.maximum(high[:count], high[shift:shift + count], out=spread);
+        numpy.minimum(low[:count], low[shift:shift + count], out=windowLow[:count]);
+        spread -= windowLow[:count];
+        result.append(int(spread.max()) / float(crystal));
+    return result;
+
+
+#
+# Everything for one run, the taus in seconds and a list per deviation
+#
+def analyze( phase, crystal, taus=None, tau0=STAB_TAU0 ):
+    if ( taus is None ):
+        taus = octave_taus(len(phase));
+    taus = sorted(taus);
+    modified = mdev(phase, crystal, taus, tau0);
+    return { "N": len(phase),
+             "TAU": [m * tau0 for m in taus],
+             "ADEV": adev(phase, crystal, taus, tau0),
+             "MDEV": modified,
+             "TDEV": [m * tau0 * modified[index] / math.sqrt(3) for index, m in enumerate(taus)],
+             "MTIE": mtie(phase, crystal, taus) };
+
+
+#
+# Same estimates updated one PPS reading at a time.  Only the last
+# 3 x the longest tau phase values are kept, plus a few integer sums per
+# tau, so the memory doesn't grow however long it runs.
+#
+# The sums carry on over restart(), only the terms inside one segment go
+# in and each tau counts its own terms, so a run with re-zeroes in it
+# gives the same result as the segments analysed together.
+#
+class StabilityTracker:
+
+    def __init__( self, crystal, taus, tau0=STAB_TAU0 ):
+        self.crystal = int(crystal);
+        self.taus = tuple(sorted(taus));
+        self.tau0 = tau0;
+        self.size = 3 * max(self.taus) + 1;
+        self.data = [0] * self.size;
+        self.count = 0;
+        self.start = 0;
+        self.last = 0;
+        self.first = 0;
+        self.tieMax = 0;
+
+        taus = len(self.taus);
+        self.sumA = [0] * taus;
+        self.sumM = [0] * taus;
+        self.countA = [0] * taus;
+        self.countM = [0] * taus;
+        self.inner = [0] * taus;
+        # MTIE, a circular queue of sample numbers per tau for the window
+        # high and low, each with its head and tail
+        self.highQueue = [[0] * (m + 3) for m in self.taus];
+        self.lowQueue = [[0] * (m + 3) for m in self.taus];
+        self.queueEnds = [[0, 0, 0, 0] for m in self.taus];
+        self.mtieMax = [0] * taus;
+
+    #
+    # New segment, the next value pushed starts the phase over.  For when
+    # the tic counter is reset or readings were skipped.
+    #
+    def restart( self ):
+        self.start = self.count;
+        for index in range(len(self.taus)):
+            self.inner[index] = 0;
+            ends = self.queueEnds[index];
+            for end in range(4):
+                ends[end] = 0;
+
+    #
+    # Take one rollover corrected PPS delta in crystal counts
+    #
+    def push( self, value ):
+        x = int(value);
+        if ( x != value ):
+            raise ValueError("phase has to be in whole crystal counts");
+
+        crystal = self.crystal;
+        k = self.count;
+        j = k - self.start;
+        if ( j ):
+            step = x - self.last;
+            step -= crystal * ((step + (crystal // 2)) // crystal);
+            x = self.last + step;
+        else:
+            self.first = x;
+        self.last = x;
+
+        data = self.data;
+        size = self.size;
+        data[k % size] = x;
+        self.count = k + 1;
+
+        tieNow = abs(x - self.first);
+        if ( tieNow > self.tieMax ):
+            self.tieMax = tieNow;
+
+        for index in range(len(self.taus)):
+            m = self.taus[index];
+            if ( j >= 2 * m ):
+                d2 = x - 2 * data[(k - m) % size] + data[(k - 2 * m) % size];
+                self.sumA[index] += d2 * d2;
+                self.countA[index] += 1;
+                inner = self.inner[index] + d2;
+                if ( j >= 3 * m ):
+                    inner -= data[(k - m) % size] - 2 * data[(k - 2 * m) % size] + data[(k - 3 * m) % size];
+                self.inner[index] = inner;
+                if ( j >= (3 * m - 1) ):
+                    self.sumM[index] += inner * inner;
+                    self.countM[index] += 1;
+            self.track_mtie(index, m, k, j, x);
+
+    #
+    # Monotonic queues of the window high and low, the front is dropped
+    # once it is more than m samples old
+    #
+    def track_mtie( self, index, m, k, j, x ):
+        data = self.data;
+        size = self.size;
+        length = m + 3;
+        ends = self.queueEnds[index];
+
+        for side in ( 0, 1 ):
+            queue = self.lowQueue[index];
+            if ( side == 0 ):
+                queue = self.highQueue[index];
+            head = ends[2 * side];
+            tail = ends[2 * side + 1];
+            while ( tail != head ):
+                previous = data[queue[(tail - 1) % length] % size];
+                if ( ((side == 0) and (previous > x)) or ((side == 1) and (previous < x)) ):
+                    break;
+                tail = (tail - 1) % length;
+            queue[tail] = k;
+            tail = (tail + 1) % length;
+            if ( queue[head] < (k - m) ):
+                head = (head + 1) % length;
+            ends[2 * side] = head;
+            ends[2 * side + 1] = tail;
+
+        if ( j >= m ):
+            spread = data[self.highQueue[index][ends[0]] % size] - data[self.lowQueue[index][ends[2]] % size];
+            if ( spread > self.mtieMax[index] ):
+                self.mtieMax[index] = spread;
+
+    #
+    # Deviations for a tau (in samples), 0 until there is enough data
+    #
+    def adev( self, m ):
+        index = self.taus.index(m);
+        count = self.countA[index];
+        if ( count < 1 ):
+            return float(0.0);
+        tau = m * self.tau0;
+        return math.sqrt(self.sumA[index] / (2 * count * tau * tau)) / self.crystal;
+
+    def mdev( self, m ):
+        index = self.taus.index(m);
+        count = self.countM[index];
+        if ( count < 1 ):
+            return float(0.0);
+        tau = m * self.tau0;
+        return math.sqrt(self.sumM[index] / (2 * m * m * tau * tau * count)) / self.crystal;
+
+    def tdev( self, m ):
+        return m * self.tau0 * self.mdev(m) / math.sqrt(3);
+
+    def mtie( self, m ):
+        return self.mtieMax[self.taus.index(m)] / self.crystal;
+
+    #
+    # Current and largest time interval error, in seconds
+    #
+    def tie( self ):
+        return (self.last - self.first) / self.crystal;
+
+    def tie_max( self ):
+        return self.tieMax / self.crystal;
+
+    def results( self ):
+        return { "N": self.count,
+                 "TAU": [m * self.tau0 for m in self.taus],
+                 "ADEV": [self.adev(m) for m in self.taus],
+                 "MDEV": [self.mdev(m) for m in self.taus],
+                 "TDEV": [self.tdev(m) for m in self.taus],
+                 "MTIE": [self.mtie(m) for m in self.taus] };
+
+
+#
+# PPS deltas from a telemetry .tick file (through a memory map) or a text
+# file with one value per line
+#
+def load_deltas( path, column ):
+    if ( path.endswith(".tick") ):
+        from gpsdro.telemetry import TelemetryReader
+
+        reader = TelemetryReader(path);
+        deltas = numpy.array(reader.column(column), dtype=numpy.int64);
+        reader.close();
+        return deltas;
+    return numpy.loadtxt(path, dtype=numpy.int64, ndmin=1);
+
+
+def main( argv=None ):
+    import argparse, time
+
+    parser = argparse.ArgumentParser(description="ADEV / MDEV / TDEV / MTIE of a GPSDRO PPS delta log");
+    parser.add_argument("file", help="telemetry .tick file or text file of PPS deltas, one per line");
+    parser.add_argument("--crystal", type=int, default=STAB_CRYSTAL, help="oscillator crystal frequency in Hz (Crystal: in the i banner)");
+    parser.add_argument("--column", default="delta", choices=("raw", "delta"), help="telemetry column to use");
+    parser.add_argument("--taus", default="octave", choices=("octave", "decade"));
+    parser.add_argument("--stream", action="store_true", help="run the sample at a time tracker instead, to check it");
+    args = parser.parse_args(argv);
+
+    if ( numpy is None ):
+        print ("NumPy is needed for the analysis");
+        return 1;
+
+    started = time.monotonic();
+    deltas = load_deltas(args.file, args.column);
+    phase = pps_phase(deltas, args.crystal);
+    taus = octave_taus(len(phase));
+    if ( args.taus == "decade" ):
+        taus = decade_taus(len(phase));
+    if ( not taus ):
+        print ("Not enough samples:", len(phase));
+        return 1;
+
+    if ( args.stream ):
+        tracker = StabilityTracker(args.crystal, taus);
+        for value in numpy.where(deltas > (args.crystal // 2), deltas - args.crystal, deltas).tolist():
+            tracker.push(value);
+        result = tracker.results();
+    else:
+        result = analyze(phase, args.crystal, taus);
+
+    print ("{} samples, TIE {:.3e} s (max {:.3e} s), {:.2f} s".format(len(phase), (phase[-1] - phase[0]) / args.crystal,
+                numpy.abs(phase - phase[0]).max() / args.crystal, time.monotonic() - started));
+    print ("{:>10} {:>12} {:>12} {:>12} {:>12}".format("Tau (s)", "ADEV", "MDEV", "TDEV (s)", "MTIE (s)"));
+    for index in range(len(result["TAU"])):
+        print ("{:>10g} {:12.4e} {:12.4e} {:12.4e} {:12.4e}".format(result["TAU"][index], result["ADEV"][index],
+                    result["MDEV"][index], result["TDEV"][index], result["MTIE"][index]));
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
@@ -0,0 +1,225 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Binary Telemetry
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Fixed size binary records, one per PPS tick plus a health record every
+# time the "w" dump is read, appended to two files next to each other:
+#
+#   <base>.tick    tick, raw delta, corrected delta, PPS offset, DDS,
+#                  holdover state, flags                       24 bytes
+#   <base>.health  tick, temperature, lamp voltage, heater voltage
+#                                                               16 bytes
+#
+# Records are packed into a preallocated buffer and written out a batch at
+# a time, so there is one flash write per minute rather than one per tick
+# and nothing is allocated per record.
+#
+# On the host side TelemetryReader maps a file and hands out the columns
+# without copying, NumPy views if NumPy is there.  They stay valid after
+# the reader is closed:
+#
+#   python3 -m gpsdro.telemetry gpsdro-telemetry
+#
+#   reader = TelemetryReader("gpsdro-telemetry.tick")
+#   reader.column("delta")
+#
+import struct
+
+TLM_TICK_FORMAT		= "<iiiifBBH"
+TLM_HEALTH_FORMAT	= "<ifff"
+TLM_TICK_SIZE		= 24
+TLM_HEALTH_SIZE		= 16
+
+TLM_TICK_FIELDS		= ( "tick", "raw", "delta", "offset", "dds", "holdover", "flags", "spare" )
+TLM_HEALTH_FIELDS	= ( "tick", "temperature", "lamp", "heater" )
+
+TLM_TICK_DTYPE		= [ ("tick", "<i4"), ("raw", "<i4"), ("delta", "<i4"), ("offset", "<i4"),
+                        ("dds", "<f4"), ("holdover", "u1"), ("flags", "u1"), ("spare", "<u2") ]
+TLM_HEALTH_DTYPE	= [ ("tick", "<i4"), ("temperature", "<f4"), ("lamp", "<f4"), ("heater", "<f4") ]
+
+TLM_FLAG_LOCK_BAD	= 0x01
+
+TLM_BATCH			= 60
+
+
+#
+# Appends to one file through a fixed buffer of "batch" records
+#
+class RecordBuffer:
+
+    def __init__( self, path, recordSize, batch ):
+        self.file = open(path, "ab");
+        self.recordSize = recordSize;
+        self.buffer = bytearray(recordSize * batch);
+        self.view = memoryview(self.buffer);
+        self.used = 0;
+
+    #
+    # Offset to pack the next record at, the buffer is written out first
+    # if it is full
+    #
+    def next_offset( self ):
+        if ( self.used >= len(self.buffer) ):
+            self.flush();
+        offset = self.used;
+        self.used += self.recordSize;
+        return offset;
+
+    def flush( self ):
+        if ( self.used ):
+            self.file.write(self.view[:self.used]);
+            self.file.flush();
+            self.used = 0;
+
+    def close( self ):
+        self.flush();
+        self.file.close();
+
+
+class TelemetryWriter:
+
+    def __init__( self, base, batch=TLM_BATCH ):
+        self.ticks = RecordBuffer(base + ".tick", TLM_TICK_SIZE, batch);
+        self.health = RecordBuffer(base + ".health", TLM_HEALTH_SIZE, max(1, batch // 10));
+
+    def tick( self, counter, raw, delta, offset, dds, holdover, lockBad ):
+        flags = 0;
+        if ( lockBad ):
+            flags |= TLM_FLAG_LOCK_BAD;
+        ticks = self.ticks;
+        struct.pack_into(TLM_TICK_FORMAT, ticks.buffer, ticks.next_offset(), counter, raw, delta, offset, dds, holdover, flags, 0);
+
+    def health_record( self, counter, temperature, lamp, heater ):
+        health = self.health;
+        struct.pack_into(TLM_HEALTH_FORMAT, health.buffer, health.next_offset(), counter, temperature, lamp, heater);
+
+    def flush( self ):
+        self.ticks.flush();
+        self.health.flush();
+
+    def close( self ):
+        self.ticks.close();
+        self.health.close();
+
+
+#
+# Host side, maps a .tick or .health file read only.  A partly written
+# record at the end (power lost mid write) is left out.
+#
+class TelemetryReader:
+
+    def __init__( self, path ):
+        import mmap
+
+        if ( path.endswith(".health") ):
+            self.format, self.size, self.fields, self.dtype = TLM_HEALTH_FORMAT, TLM_HEALTH_SIZE, TLM_HEALTH_FIELDS, TLM_HEALTH_DTYPE;
+        else:
+            self.format, self.size, self.fields, self.dtype = TLM_TICK_FORMAT, TLM_TICK_SIZE, TLM_TICK_FIELDS, TLM_TICK_DTYPE;
+
+        self.file = open(path, "rb");
+        self.map = None;
+        self.count = 0;
+        self.view = memoryview(b"");
+        length = self.file.seek(0, 2);
+        if ( length >= self.size ):
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ);
+            self.count = length // self.size;
+            self.view = memoryview(self.map)[:self.count * self.size];
+
+    def __len__( self ):
+        return self.count;
+
+    def record( self, index ):
+        if ( index < 0 ):
+            index += self.count;
+        return struct.unpack_from(self.format, self.view, index * self.size);
+
+    def records( self ):
+        return struct.iter_unpack(self.format, self.view);
+
+    #
+    # All records as a NumPy structured array over the map, no copy
+    #
+    def array( self ):
+        import numpy
+
+        return numpy.frombuffer(self.view, dtype=numpy.dtype(self.dtype), count=self.count);
+
+    #
+    # One column, a NumPy view when NumPy is installed and a list otherwise
+    #
+    def column( self, name ):
+        try:
+            return self.array()[name];
+        except ImportError:
+            index = self.fields.index(name);
+            return [record[index] for record in self.records()];
+
+    #
+    # Arrays from array() and column() point into the map and stay valid
+    # after this, the map is then left to go with the last of them
+    #
+    def close( self ):
+        try:
+            self.view.release();
+            if ( self.map is not None ):
+                self.map.close();
+        except BufferError:
+            pass;
+        self.view = memoryview(b"");
+        self.map = None;
+        self.count = 0;
+        self.file.close();
+
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise or dump GPSDRO telemetry files");
+    parser.add_argument("base", help="file name without the .tick / .health extension");
+    parser.add_argument("--csv", choices=("tick", "health"), help="dump every record of one file as CSV");
+    args = parser.parse_args(argv);
+
+    if ( args.csv ):
+        reader = TelemetryReader(args.base + "." + args.csv);
+        print (",".join(reader.fields));
+        for record in reader.records():
+            print (",".join([str(value) for value in record]));
+        reader.close();
+        return 0;
+
+    for extension in ( "tick", "health" ):
+        try:
+            reader = TelemetryReader(args.base + "." + extension);
+        except OSError as error:
+            print (extension + ":", error);
+            continue;
+        if ( len(reader) == 0 ):
+            print (extension + ": empty");
+        else:
+            print ("{}: {} records, ticks {} to {}".format(extension, len(reader), reader.record(0)[0], reader.record(-1)[0]));
+            print ("  last: " + ", ".join(["{}={}".format(name, value) for name, value in zip(reader.fields, reader.record(-1))]));
+        reader.close();
+    return 0;
+
+
+if __name__ == "__main__":
+    raise SystemExit(main());
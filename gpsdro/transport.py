@@ -0,0 +1,550 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Serial Transport
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Framed request/response handling for the Symmetricom serial port.
+#
+# Instead of waiting out a fixed read timeout after every command a response
+# is finished as soon as its last line shows up.  "j" and "p" always answer
+# with a single known line, everything else is learned: the first exchange
+# of a command ends on a short idle gap and the key of the last line it
+# returned becomes the end marker for that command from then on.
+#
+# Several queries can also be written in one go with query_many(), their
+# responses are split back up using the same end markers.  Firmware that
+# drops commands sent while it is still answering is detected on the first
+# batch and everything goes back to one command at a time.
+#
+# Works with a pyserial Serial on Linux and a machine.UART on MicroPython,
+# both only need write(), readinto() that gives up after the idle gap and
+# in_waiting / any().
+#
+# Everything is read into one preallocated buffer (LineBuffer) and split
+# into lines in place.  query_registers() goes one step further for "j"
+# and "p": the end marker is matched and the value decoded straight from
+# the buffer, so a PPS tick doesn't allocate anything on MicroPython and
+# the garbage collector doesn't end up running in the middle of one.
+#
+import time
+
+from gpsdro.histogram import TimingStats
+
+# Seconds / milliseconds of silence that end a response still being learned
+FRAME_IDLE			= 0.02
+FRAME_IDLE_MS		= 20
+
+# Longest we wait for any response
+FRAME_TIMEOUT		= 0.5
+
+# Commands that always answer, they never learn an empty response
+FRAME_QUERIES		= "iwjp"
+
+# Known end markers, "" means the command doesn't answer
+FRAME_MARKERS		= { "j": "DELTA REG:", "p": "ONTROL REG:" }
+
+LAT_COUNT			= 0
+LAT_LAST			= 1
+LAT_MIN				= 2
+LAT_MAX				= 3
+LAT_TOTAL			= 4
+
+# Commands that get a latency histogram as well
+LAT_COMMANDS		= "iwjkfpq"
+
+# Bytes kept of one line, anything past it is dropped
+FRAME_LINE			= 128
+
+# Most bytes taken from the port in one read
+FRAME_CHUNK			= 64
+
+#
+#  Microsecond ticks that work on both MicroPython and regular python
+#
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    def ticks_us():
+        return time.monotonic_ns() // 1000;
+
+    def ticks_diff( newTick, oldTick ):
+        return newTick - oldTick;
+
+
+#
+# Digit value of an upper case ASCII character, -1 if it isn't one
+#
+def digit_value( char, base ):
+    if ( 48 <= char <= 57 ):
+        value = char - 48;
+    elif ( 65 <= char <= 70 ):
+        value = char - 55;
+    else:
+        return -1;
+    if ( value >= base ):
+        return -1;
+    return value;
+
+
+#
+# Integer in buf[start:end] without making a string of it, spaces either
+# side are skipped like int() does.  None if it isn't a number.
+#
+def decode_int( buf, start, end, base ):
+    while ( (start < end) and (buf[start] == 32) ):
+        start += 1;
+    while ( (end > start) and (buf[end-1] == 32) ):
+        end -= 1;
+    negative = False;
+    if ( (start < end) and (buf[start] == 45) ):
+        negative = True;
+        start += 1;
+    if ( start >= end ):
+        return None;
+
+    value = 0;
+    for index in range(start, end):
+        digit = digit_value(buf[index], base);
+        if ( digit < 0 ):
+            return None;
+        value = (value * base) + digit;
+    if ( negative ):
+        return -value;
+    return value;
+
+
+#
+# Where "marker" (bytes) starts in buf[:length], -1 if it isn't there
+#
+def find_bytes( buf, length, marker ):
+    size = len(marker);
+    for start in range(length - size + 1):
+        index = 0;
+        while ( (index < size) and (buf[start+index] == marker[index]) ):
+            index += 1;
+        if ( index == size ):
+            return start;
+    return -1;
+
+
+def register_base( cmd, decimal ):
+    if ( cmd in decimal ):
+        return 10;
+    return 16;
+
+
+#
+# Receive buffer.  The port is read in chunks into a preallocated
+# bytearray and the bytes are copied across into the line, upper cased,
+# until a CR or LF.  The memoryview slices readinto() needs are all made
+# up front so reading doesn't allocate either.
+#
+class LineBuffer:
+
+    def __init__( self, port, size=FRAME_LINE, chunk=FRAME_CHUNK ):
+        self.port = port;
+        self.line = bytearray(size);
+        self.chunk = bytearray(chunk);
+        view = memoryview(self.chunk);
+        self.views = [view[:count] for count in range(chunk + 1)];
+        self.length = 0;
+        self.pos = 0;
+        self.count = 0;
+        if ( hasattr(port, "any") ):
+            self.waiting = port.any;
+        else:
+            self.waiting = self.in_waiting;
+
+    def in_waiting( self ):
+        return self.port.in_waiting;
+
+    def reset( self ):
+        self.length = 0;
+        self.pos = 0;
+        self.count = 0;
+
+    #
+    # Everything the port has buffered, without waiting for more
+    #
+    def drain( self ):
+        self.reset();
+        while ( self.waiting() ):
+            self.port.readinto(self.chunk);
+
+    #
+    # Next chunk, whatever is waiting or else one byte as soon as it comes.
+    # False after the idle gap, or straight away if nothing is waiting and
+    # "block" is off.
+    #
+    def fill( self, block=True ):
+        count = self.waiting();
+        if ( count < 1 ):
+            if ( not block ):
+                return False;
+            count = 1;
+        elif ( count > len(self.chunk) ):
+            count = len(self.chunk);
+        self.pos = 0;
+        self.count = self.port.readinto(self.views[count]) or 0;
+        return ( self.count > 0 );
+
+    #
+    # Moves the rest of the last chunk into the line until a CR or LF ends
+    # it.  Returns its length, or 0 once the chunk is used up with the part
+    # line kept for the next one.
+    #
+    def scan( self ):
+        line = self.line;
+        chunk = self.chunk;
+        while ( self.pos < self.count ):
+            char = chunk[self.pos];
+            self.pos += 1;
+            if ( (char == 10) or (char == 13) ):
+                if ( self.length ):
+                    return self.take();
+                continue;
+            if ( self.length < len(line) ):
+                if ( 97 <= char <= 122 ):
+                    char -= 32;
+                line[self.length] = char;
+                self.length += 1;
+        return 0;
+
+    #
+    # Hands over the line so far, even without its line end
+    #
+    def take( self ):
+        length = self.length;
+        self.length = 0;
+        return length;
+
+    #
+    # Length of the next line, which is then in self.line, or 0 after the
+    # idle gap.  A part line before the gap counts as a line, like
+    # readline() does.
+    #
+    def readline( self ):
+        while True:
+            length = self.scan();
+            if ( length ):
+                return length;
+            if ( not self.fill() ):
+                return self.take();
+
+    #
+    # The line as a stripped string, only for the responses that need one
+    #
+    def text( self, length ):
+        return bytes(self.line[:length]).decode('ascii').strip();
+
+
+#
+# Works out when a response is complete.
+#
+class ResponseFramer:
+
+    def __init__( self, prompt=None ):
+        self.markers = dict(FRAME_MARKERS);
+        self.prompt = prompt;
+
+    #
+    # None if the end of this command's response hasn't been learned yet
+    #
+    def marker( self, cmd ):
+        return self.markers.get(cmd[0]);
+
+    def is_last( self, marker, line ):
+        if ( (self.prompt is not None) and line.endswith(self.prompt) ):
+            return True;
+        return ( bool(marker) and (line.find(marker) >= 0) );
+
+    #
+    # Remember the last line of a response that ended on the idle gap.
+    # Only the part up to the first ": " is kept, the value changes.
+    #
+    def learn( self, cmd, lines ):
+        if ( len(lines) == 0 ):
+            if ( cmd[0] not in FRAME_QUERIES ):
+                self.markers[cmd[0]] = "";
+            return;
+
+        line = lines[-1];
+        if ( line.find(": ") >= 0 ):
+            line = line[:line.find(": ")+1];
+        self.markers[cmd[0]] = line;
+
+    def forget( self, cmd ):
+        if ( (cmd[0] in self.markers) and (cmd[0] not in FRAME_MARKERS) ):
+            del self.markers[cmd[0]];
+
+
+#
+# Per command round trip latency in microseconds, kept per command letter,
+# plus a histogram for each of the LAT_COMMANDS.
+#
+class LatencyStats:
+
+    def __init__( self ):
+        self.stats = {};
+        self.histograms = TimingStats(LAT_COMMANDS);
+
+    def record( self, cmd, micros ):
+        histogram = self.histograms.get(cmd[0]);
+        if ( histogram is not None ):
+            histogram.record(micros);
+
+        entry = self.stats.get(cmd[0]);
+        if ( entry is None ):
+            self.stats[cmd[0]] = [1, micros, micros, micros, micros];
+            return;
+
+        entry[LAT_COUNT] += 1;
+        entry[LAT_LAST] = micros;
+        entry[LAT_TOTAL] += micros;
+        if ( micros < entry[LAT_MIN] ): entry[LAT_MIN] = micros;
+        if ( micros > entry[LAT_MAX] ): entry[LAT_MAX] = micros;
+
+    def last( self, cmd ):
+        entry = self.stats.get(cmd[0]);
+        if ( entry is None ):
+            return 0;
+        return entry[LAT_LAST];
+
+    #
+    # One line summary, last (min/avg/max) in ms
+    #
+    def report( self ):
+        text = "";
+        for cmd in sorted(self.stats):
+            entry = self.stats[cmd];
+            text += "{} {:.2f} ({:.2f}/{:.2f}/{:.2f})ms  ".format(cmd, entry[LAT_LAST] / 1000,
+                        entry[LAT_MIN] / 1000, entry[LAT_TOTAL] / entry[LAT_COUNT] / 1000, entry[LAT_MAX] / 1000);
+        return text.strip();
+
+
+#
+# Blocking transport, returns as soon as the framer says the response is
+# complete instead of waiting for the read timeout.
+#
+class SerialTransport:
+
+    def __init__( self, port, framer=None, stats=None, timeout=FRAME_TIMEOUT ):
+        self.port = port;
+        self.framer = framer or ResponseFramer();
+        self.stats = stats or LatencyStats();
+        self.timeout = int(timeout * 1000000);
+        self.pending = None;
+        self.sentTick = 0;
+        self.pipeline = True;
+        self.buffer = LineBuffer(port);
+        self.encoded = {};
+        self.markerBytes = {};
+
+    #
+    # Drop anything left over from a previous command so it can't be taken
+    # as part of the next response
+    #
+    def discard( self ):
+        if ( hasattr(self.port, "reset_input_buffer") ):
+            self.buffer.reset();
+            self.port.reset_input_buffer();
+        else:
+            self.buffer.drain();
+
+    #
+    # Command bytes, kept so the ones sent every tick are only encoded once
+    #
+    def encode( self, cmd ):
+        data = self.encoded.get(cmd);
+        if ( data is None ):
+            data = cmd.encode();
+            if ( cmd[0] in FRAME_MARKERS ):
+                self.encoded[cmd] = data;
+        return data;
+
+    def send( self, cmd ):
+        self.discard();
+        self.pending = cmd;
+        self.sentTick = ticks_us();
+        self.port.write(self.encode(cmd));
+
+    #
+    # Next non empty line of a response as a string, "" after the idle gap
+    # and None if it wasn't ASCII
+    #
+    def next_line( self ):
+        while True:
+            length = self.buffer.readline();
+            if ( length == 0 ):
+                return "";
+            try:
+                line = self.buffer.text(length);
+            except:
+                return None;
+            if ( len(line) ):
+                return line;
+
+    #
+    # Reads the response of the last command sent, upper cased and stripped
+    # like the rest of the code expects.
+    #
+    def receive( self ):
+        cmd = self.pending;
+        lines = [];
+        if ( cmd is None ):
+            return lines;
+        self.pending = None;
+
+        marker = self.framer.marker(cmd);
+        if ( marker == "" ):
+            self.stats.record(cmd, ticks_diff(ticks_us(), self.sentTick));
+            return lines;
+
+        complete = False;
+        while ( ticks_diff(ticks_us(), self.sentTick) < self.timeout ):
+            line = self.next_line();
+            if ( line is None ):
+                continue;
+            if ( len(line) == 0 ):
+                # Idle gap, only the end of a response we are still learning
+                if ( (marker is None) and len(lines) ):
+                    break;
+                continue;
+            lines.append(line);
+            if ( self.framer.is_last(marker, line) ):
+                complete = True;
+                break;
+
+        if ( not complete ):
+            # Learned marker never turned up, learn it again from this one
+            if ( marker is not None ):
+                self.framer.forget(cmd);
+            self.framer.learn(cmd, lines);
+
+        self.stats.record(cmd, ticks_diff(ticks_us(), self.sentTick));
+        return lines;
+
+    def query( self, cmd ):
+        self.send(cmd);
+        return self.receive();
+
+    #
+    # Write all the queries at once and split up the combined response, one
+    # list of lines per command.  Needs every end marker to be known, so
+    # the first time round (or with firmware that can't queue) it is done
+    # one command at a time.
+    #
+    def query_many( self, cmds ):
+        if ( (not self.pipeline) or (len(cmds) < 2) ):
+            return [self.query(cmd) for cmd in cmds];
+        for cmd in cmds:
+            if ( not self.framer.marker(cmd) ):
+                return [self.query(cmd) for cmd in cmds];
+
+        self.discard();
+        self.sentTick = ticks_us();
+        self.port.write(self.encode("".join(cmds)));
+
+        responses = [];
+        lines = [];
+        index = 0;
+        marker = self.framer.marker(cmds[0]);
+        timeout = self.timeout * len(cmds);
+        while ( (index < len(cmds)) and (ticks_diff(ticks_us(), self.sentTick) < timeout) ):
+            line = self.next_line();
+            if ( not line ):
+                continue;
+            lines.append(line);
+            if ( self.framer.is_last(marker, line) ):
+                self.stats.record(cmds[index], ticks_diff(ticks_us(), self.sentTick));
+                responses.append(lines);
+                lines = [];
+                index += 1;
+                if ( index < len(cmds) ):
+                    marker = self.framer.marker(cmds[index]);
+
+        if ( index < len(cmds) ):
+            # First one answered but not the rest, the firmware can't take
+            # queued commands
+            if ( index > 0 ):
+                self.pipeline = False;
+            for cmd in cmds[index:]:
+                responses.append(self.query(cmd));
+
+        return responses;
+
+    #
+    # Read up to the register line of "cmd" and put its value in
+    # values[index], None if it wasn't a number.  False if the line didn't
+    # turn up within "timeout" us of the send.
+    #
+    def read_register( self, cmd, timeout, base, values, index ):
+        marker = self.markerBytes.get(cmd);
+        if ( marker is None ):
+            marker = FRAME_MARKERS[cmd].encode();
+            self.markerBytes[cmd] = marker;
+
+        buffer = self.buffer;
+        while ( ticks_diff(ticks_us(), self.sentTick) < timeout ):
+            length = buffer.readline();
+            if ( length == 0 ):
+                continue;
+            start = find_bytes(buffer.line, length, marker);
+            if ( start < 0 ):
+                continue;
+            values[index] = decode_int(buffer.line, start + len(marker), length, base);
+            self.stats.record(cmd, ticks_diff(ticks_us(), self.sentTick));
+            return True;
+        return False;
+
+    #
+    # query_many() for commands that answer with a single register line
+    # ("j" and "p"), the values go in "values" instead of lists of strings.
+    # "decimal" lists the commands whose register isn't in hex.  False if
+    # one of them isn't a register command, use query_many() then.
+    #
+    def query_registers( self, cmds, values, decimal="" ):
+        for cmd in cmds:
+            if ( cmd not in FRAME_MARKERS ):
+                return False;
+
+        first = 0;
+        if ( self.pipeline and (len(cmds) > 1) ):
+            self.discard();
+            self.sentTick = ticks_us();
+            self.port.write(self.encode(cmds));
+            while ( first < len(cmds) ):
+                values[first] = None;
+                if ( not self.read_register(cmds[first], self.timeout * (first + 1), register_base(cmds[first], decimal), values, first) ):
+                    break;
+                first += 1;
+
+            # Same as query_many(), the firmware can't take queued commands
+            if ( (first > 0) and (first < len(cmds)) ):
+                self.pipeline = False;
+
+        for index in range(first, len(cmds)):
+            values[index] = None;
+            self.send(cmds[index]);
+            self.pending = None;
+            if ( not self.read_register(cmds[index], self.timeout, register_base(cmds[index], decimal), values, index) ):
+                self.stats.record(cmds[index], ticks_diff(ticks_us(), self.sentTick));
+        return True;
@@ -0,0 +1,110 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Sliding Window Slope
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Least squares slope of the PPS delta over the last N samples, for several
+# N at once, e.g. the last 100, 1000 and 10000 seconds.
+#
+# x is the position inside the window (0 is the oldest sample) so only the
+# sum of y and the sum of x*y are needed per window, the x sums are fixed
+# by the fill level m:
+#
+#   Sx = m(m-1)/2     Sxx (centred) = m(m^2-1)/12
+#
+# When a full window moves along by one every remaining sample moves one x
+# to the left, so with y0 the sample dropping out and y the new one
+#
+#   Sxy' = Sxy - (Sy - y0) + (N-1)*y      Sy' = Sy - y0 + y
+#
+# Both are integer sums, they never drift no matter how long it runs and a
+# push is the same handful of operations whatever the window lengths are.
+#
+#   symSlopes = WindowSlope((100, 1000, 10000))
+#   symSlopes.push(delta)
+#   symSlopes.slope(1000)
+#
+from array import array
+
+
+class WindowSlope:
+
+    def __init__( self, windows ):
+        self.windows = tuple(windows);
+        self.size = max(self.windows);
+        self.data = array('l', [0] * self.size);
+        self.sumY = [0] * len(self.windows);
+        self.sumXY = [0] * len(self.windows);
+        self.pos = 0;
+        self.count = 0;
+
+    def push( self, value ):
+        data = self.data;
+        pos = self.pos;
+        size = self.size;
+        count = self.count;
+        sumY = self.sumY;
+        sumXY = self.sumXY;
+
+        for index in range(len(self.windows)):
+            window = self.windows[index];
+            if ( count < window ):
+                # Still filling, the new sample goes in at x = count
+                sumXY[index] += count * value;
+                sumY[index] += value;
+            else:
+                oldest = data[(pos - window) % size];
+                sumXY[index] += (window - 1) * value - (sumY[index] - oldest);
+                sumY[index] += value - oldest;
+
+        data[pos] = value;
+        self.pos = (pos + 1) % size;
+        if ( count < size ):
+            self.count = count + 1;
+
+    #
+    # Number of samples in the window so far
+    #
+    def fill( self, window ):
+        if ( self.count < window ):
+            return self.count;
+        return window;
+
+    def full( self, window ):
+        return ( self.count >= window );
+
+    #
+    # Slope in PPS counts per sample, 0 until there are two samples
+    #
+    def slope( self, window ):
+        index = self.windows.index(window);
+        m = self.fill(window);
+        if ( m < 2 ):
+            return float(0.0);
+        return (12 * self.sumXY[index] - 6 * (m - 1) * self.sumY[index]) / (m * (m * m - 1));
+
+    def clear( self ):
+        for index in range(self.size):
+            self.data[index] = 0;
+        for index in range(len(self.windows)):
+            self.sumY[index] = 0;
+            self.sumXY[index] = 0;
+        self.pos = 0;
+        self.count = 0;
@@ -0,0 +1,157 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Asyncio Transport Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The asyncio transport on a fake UART and on a pty
+#
+import asyncio
+import os
+import tty
+
+from gpsdro.aio import AsyncTransport, TtyPort, UartPort
+
+
+#
+# A UART whose receive side the test fills in
+#
+class FakeUart:
+
+    def __init__( self, responses=None ):
+        self.rx = bytearray();
+        self.tx = bytearray();
+        self.responses = responses or {};
+
+    def any( self ):
+        return len(self.rx);
+
+    def readinto( self, buffer ):
+        count = min(len(buffer), len(self.rx));
+        buffer[:count] = self.rx[:count];
+        del self.rx[:count];
+        return count;
+
+    def write( self, data ):
+        self.tx += data;
+        for cmd in data.decode():
+            self.rx += self.responses.get(cmd, b"");
+
+
+#
+# A line that stops half way through a wait comes back whole on the next
+# readline(), the first part isn't dropped with the timeout
+#
+def test_part_line_kept():
+    async def body():
+        uart = FakeUart();
+        transport = AsyncTransport(UartPort(uart));
+        uart.rx += b"1PPS Delta";
+        assert await transport.readline(0.01) is None;
+        uart.rx += b" Reg: 12\r\nControl";
+        assert await transport.readline(0.01) == "1PPS DELTA REG: 12";
+        assert await transport.readline(0.01) is None;
+        uart.rx += b" Reg: 0000\r\n";
+        assert await transport.readline(0.01) == "CONTROL REG: 0000";
+
+    asyncio.run(body());
+
+#
+# Lines end at a bare CR too, and a prompt with no line end at all is a
+# line once the port has gone quiet for the idle gap, like the blocking
+# transport
+#
+def test_line_ends():
+    async def body():
+        uart = FakeUart();
+        transport = AsyncTransport(UartPort(uart));
+        uart.rx += b"\r1PPS Delta Reg: 12\rControl Reg: 0000\n\r\n>";
+        assert await transport.readline(0.1) == "1PPS DELTA REG: 12";
+        assert await transport.readline(0.1) == "CONTROL REG: 0000";
+        assert await transport.readline(0.1) == ">";
+        assert await transport.readline(0.05) is None;
+
+        prompted = AsyncTransport(UartPort(FakeUart({ "i": b"OK\r\n>" })));
+        prompted.framer.prompt = ">";
+        assert await prompted.query("i") == ["OK", ">"];
+
+    asyncio.run(body());
+
+def test_query_framing():
+    async def body():
+        uart = FakeUart({ "j": b"1PPS Delta Reg: 5FFFFFF\r\n", "p": b"Control Reg: 0002\r\n",
+                          "w": b"Health\r\nDCURTEMP: 54.25\r\nPWRHRS: 12\r\n" });
+        transport = AsyncTransport(UartPort(uart));
+
+        assert await transport.query("j") == ["1PPS DELTA REG: 5FFFFFF"];
+
+        # Learned on the idle gap the first time, from the marker after
+
+        responses = await transport.query_many(["j", "p", "w"]);
+        assert responses == [["1PPS DELTA REG: 5FFFFFF"], ["CONTROL REG: 0002"], ["HEALTH", "DCURTEMP: 54.25", "PWRHRS: 12"]];
+        assert uart.tx.endswith(b"jpw");
+        assert transport.pipeline;
+        assert transport.framer.marker("w") == "PWRHRS:";
+
+        responses = await transport.query_many(["j", "p", "w"]);
+        assert responses == [["1PPS DELTA REG: 5FFFFFF"], ["CONTROL REG: 0002"], ["HEALTH", "DCURTEMP: 54.25", "PWRHRS: 12"]];
+        assert uart.tx.endswith(b"jpw");
+        assert transport.pipeline;
+
+        # Stale bytes from before a command aren't taken as its response
+        uart.rx += b"1PPS Delta Reg: 1\r\n";
+        assert await transport.query("p") == ["CONTROL REG: 0002"];
+
+    asyncio.run(body());
+
+#
+# Nothing answers a "k", it learns that it doesn't answer
+#
+def test_query_no_answer():
+    async def body():
+        uart = FakeUart();
+        transport = AsyncTransport(UartPort(uart), timeout=0.05);
+        assert await transport.query("k0") == [];
+        assert transport.framer.marker("k") == "";
+
+    asyncio.run(body());
+
+def test_tty_port():
+    master, slave = os.openpty();
+    tty.setraw(slave);
+    os.set_blocking(master, False);
+
+    async def body():
+        transport = AsyncTransport(TtyPort(master));
+        loop = asyncio.get_running_loop();
+
+        def answer():
+            if ( os.read(slave, 64).find(b"j") >= 0 ):
+                os.write(slave, b"1PPS Delta ");
+                loop.call_later(0.01, os.write, slave, b"Reg: 7\r\n");
+
+        loop.add_reader(slave, answer);
+        try:
+            assert await transport.query("j") == ["1PPS DELTA REG: 7"];
+        finally:
+            loop.remove_reader(slave);
+            transport.close();
+
+    asyncio.run(body());
+    os.close(slave);
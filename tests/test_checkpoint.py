@@ -0,0 +1,68 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Checkpoint Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Checkpoint files saved and read back, the ones that can't be used, and
+# the temp file left by a reset in the middle of a save on FAT
+#
+import os
+
+from gpsdro.checkpoint import checkpoint_load, checkpoint_save
+
+STATE		= { "S/N": "X99-1234", "PWRHRS": 1000, "DDS": 123450, "SUMS": [[1, 2, 3], [4, 5, 6]] }
+
+
+def test_checkpoint_round_trip( tmp_path ):
+    path = str(tmp_path / "checkpoint.json");
+    checkpoint_save(dict(STATE), path);
+    state = checkpoint_load("X99-1234", 1010, 24, path);
+    assert state["DDS"] == 123450;
+    assert state["SUMS"] == [[1, 2, 3], [4, 5, 6]];
+    assert not os.path.exists(path + ".tmp");
+
+def test_checkpoint_rejected( tmp_path ):
+    path = str(tmp_path / "checkpoint.json");
+    checkpoint_save(dict(STATE), path);
+    assert checkpoint_load("X99-9999", 1010, 24, path) is None;
+    assert checkpoint_load("X99-1234", 1100, 24, path) is None;
+    assert checkpoint_load("X99-1234", 990, 24, path) is None;
+    assert checkpoint_load("X99-1234", None, 24, path) is None;
+    assert checkpoint_load("X99-1234", 1010, 24, str(tmp_path / "missing.json")) is None;
+
+    with open(path, "w") as checkpointFile:
+        checkpointFile.write("{\"S/N\": ");
+    assert checkpoint_load("X99-1234", 1010, 24, path) is None;
+
+#
+# The old file was removed but the temp file not renamed yet
+#
+def test_checkpoint_temp_file( tmp_path ):
+    path = str(tmp_path / "checkpoint.json");
+    checkpoint_save(dict(STATE), path);
+    os.rename(path, path + ".tmp");
+    assert checkpoint_load("X99-1234", 1010, 24, path)["DDS"] == 123450;
+
+    # and the next save puts the file back
+    state = dict(STATE);
+    state["DDS"] = 123460;
+    checkpoint_save(state, path);
+    assert not os.path.exists(path + ".tmp");
+    assert checkpoint_load("X99-1234", 1010, 24, path)["DDS"] == 123460;
@@ -0,0 +1,138 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Control Engine Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The PI and Kalman engines on their own, then closed loop on the emulated
+# oscillator, both in the benchmark's simulate() and driving the script
+#
+import os
+import sys
+
+import pytest
+
+import gpsdro.transport
+from gpsdro import replay
+from gpsdro.clock import VirtualClock
+from gpsdro.control import PIEngine, KalmanEngine, StepEngine, simulate, phase_summary, DDS_BASE_VALUE, DDS_INCR_VALUE
+from gpsdro.emulator import EMU_CRYSTAL, EmulatedPort, SymOscillator
+
+SCRIPT		= os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpsdro", "discipline.py")
+
+# One crystal count of phase
+COUNT		= 1.0 / EMU_CRYSTAL
+
+
+#
+# A whole count either way on a zero phase is GPS noise, not something to
+# chase with the DDS
+#
+def test_pi_deadband():
+    engine = PIEngine();
+    engine.reset(-74.2);
+    for second in range(3000):
+        assert engine.update(COUNT * ((0, 1, -1)[second % 3])) == -74.2;
+
+#
+# While the output is clamped the integral keeps what it had, without the
+# clamp the same phase keeps adding to it
+#
+def test_pi_anti_windup():
+    clamped = PIEngine(limit=1e-10);
+    free = PIEngine(limit=1.0);
+    for engine in ( clamped, free ):
+        engine.reset(0.0);
+        engine.update(1e-4);
+    integral = clamped.integral;
+    for second in range(100):
+        assert clamped.update(1e-4) == pytest.approx(1e-10 / DDS_BASE_VALUE);
+        assert clamped.integral == integral;
+        free.update(1e-4);
+    assert free.integral > 100 * integral;
+
+#
+# A positive phase is a PPS delta that grows, the oscillator is slow and the
+# DDS goes up, the same way the step adjuster moves it
+#
+@pytest.mark.parametrize("engine", ( PIEngine(), KalmanEngine(), StepEngine(EMU_CRYSTAL) ))
+def test_sign( engine ):
+    for sign in ( 1, -1 ):
+        engine.reset(10.0);
+        for second in range(120):
+            dds = engine.update(sign * 20 * COUNT * (second + 1) / 10);
+        assert (dds - 10.0) * sign >= DDS_INCR_VALUE;
+
+#
+# Closed loop from a DDS 1e-10 off, the phase is pulled back and held
+#
+@pytest.mark.parametrize("engine", ( PIEngine(), KalmanEngine() ))
+def test_simulate( engine ):
+    phases, truePhases, commands, freq = simulate(engine, 8000, seed=1, startError=10.0);
+    settled, rms, peak = phase_summary(phases, 10e-9);
+    assert settled < 4000;
+    assert rms < 15e-9;
+    assert abs(freq) < 1e-12;
+
+
+#
+# Stops the script once the clock gets to "end" seconds
+#
+class StoppingPort( EmulatedPort ):
+
+    def __init__( self, oscillator, clock, end ):
+        EmulatedPort.__init__(self, oscillator, clock);
+        self.end = end;
+
+    def write( self, data ):
+        if ( self.clock.monotonic() > self.end ):
+            raise replay.ReplayFinished();
+        return EmulatedPort.write(self, data);
+
+
+#
+# GPSDRO_ENGINE=pi / kalman on the script, the phase the engine is handed
+# once it has taken over from the initial discipline
+#
+@pytest.mark.parametrize("name", ( "pi", "kalman" ))
+def test_script_engine( name, monkeypatch ):
+    # load_script() swaps these for the run, put them back afterwards
+    monkeypatch.setattr(gpsdro.transport, "ticks_us", gpsdro.transport.ticks_us);
+    monkeypatch.setitem(sys.modules, "serial", None);
+    for setting in ( "GPSDRO_PROFILE", "GPSDRO_CHECKPOINT", "GPSDRO_CAPTURE", "GPSDRO_SPEEDUP", "GPSDRO_METRICS" ):
+        monkeypatch.setenv(setting, "");
+    monkeypatch.setenv("GPSDRO_ENGINE", name);
+
+    clock = VirtualClock(5000000000);
+    script = replay.load_script(SCRIPT, StoppingPort(SymOscillator(seed=3, freqOffset=3e-10), clock, 9000), clock);
+    phases = [];
+    engineAdjust = script.engine_adjust;
+    def recorded():
+        adjusted = engineAdjust();
+        phases.append(script.symEngine.phase);
+        return adjusted;
+    script.engine_adjust = recorded;
+
+    with pytest.raises(replay.ReplayFinished):
+        script.main();
+    assert script.symEngine.__class__.__name__ == { "pi": "PIEngine", "kalman": "KalmanEngine" }[name];
+    assert len(phases) > 4000;
+    tail = phases[-2000:];
+    assert abs(sum(tail) / len(tail)) < 10e-9;
+    assert max(abs(phase) for phase in tail) < 60e-9;
@@ -0,0 +1,87 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Emulator Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The oscillator model and the in process port that answers for it
+#
+from gpsdro.emulator import SymOscillator, EmulatedPort, SYM_X99, command_response
+
+
+class StepClock:
+
+    def __init__( self ):
+        self.now = 0.0;
+
+    def monotonic( self ):
+        return self.now;
+
+    def sleep( self, seconds ):
+        self.now += seconds;
+
+
+def test_dds_cancels_offset():
+    osc = SymOscillator(seed=1, aging=0.0, randomWalk=0.0, sawtooth=0.0, jitter=0.0);
+    osc.set_dds(-74.2);
+    for index in range(1000):
+        osc.second();
+    assert abs(osc.frequency()) < 1e-13;
+
+def test_responses():
+    osc = SymOscillator(seed=1);
+    assert command_response(osc, "j", "") == "1PPS Delta Reg: 0\r\n".encode("ascii");
+    assert command_response(osc, "p", "").startswith(b"Control Reg: ");
+    assert command_response(osc, "i", "").count(b"\r\n") == 5;
+    assert command_response(osc, "f", "-12.4") == b"";
+    assert osc.dds == -12.4;
+    assert command_response(osc, "f", "junk") == b"";
+    assert osc.dds == -12.4;
+
+    x99 = SymOscillator(SYM_X99, seed=1);
+    assert b"Crystal: 60000000Hz" in command_response(x99, "i", "");
+
+def test_dropout_freezes_register():
+    osc = SymOscillator(seed=1, dropoutRate=1.0, dropoutLength=5);
+    osc.second();
+    frozen = osc.register;
+    for index in range(4):
+        osc.second();
+        assert osc.register == frozen;
+
+def test_port_follows_clock():
+    clock = StepClock();
+    osc = SymOscillator(seed=1);
+    port = EmulatedPort(osc, clock);
+
+    # An empty read waits out the timeout on the clock
+    assert port.read(16) == b"";
+    assert clock.now == port.timeout;
+
+    clock.now = 10.5;
+    port.write(b"jf-1.2\r\n");
+    assert osc.simTime == 10;
+    assert osc.dds == -1.2;
+    assert port.counts == { "j": 1, "f": 1 };
+    line = command_response(osc, "j", "");
+    assert port.in_waiting == len(line);
+    buffer = bytearray(64);
+    assert port.readinto(buffer) == len(line);
+    assert bytes(buffer[:len(line)]) == line;
+    assert port.in_waiting == 0;
@@ -0,0 +1,78 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Fixed Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The integer DDS values and slope sums against the float arithmetic they
+# replace
+#
+import numpy
+
+from gpsdro.fixed import dds_fixed, dds_float, dds_text, div_round, ireg_new, ireg_slope, ireg_stderr
+from gpsdro.hotpath import HOTPATH_BYTECODE, HOTPATH_SELECTED
+
+
+#
+# dds_text() is what str() of the float gives, without the float
+#
+def test_dds_text():
+    for fixed in range(-2000, 2001):
+        assert dds_text(fixed) == str(dds_float(fixed));
+        assert dds_fixed(float(dds_text(fixed))) == fixed;
+    assert dds_fixed(-74.2) == -742;
+    assert dds_fixed(0.04) == 0;
+
+def test_div_round():
+    for num in range(-50, 51):
+        for den in ( 1, 2, 3, 4, 10 ):
+            assert div_round(num, den) == round(num / den);
+
+#
+# Slope and standard error against a float fit, both hot path builds.  The
+# y values are PPS deltas in counts, big enough that float sums would lose
+# the residual.
+#
+def test_ireg_against_polyfit():
+    rng = numpy.random.default_rng(3);
+    x = numpy.arange(5000);
+    y = 59999000 + (x * 3) // 7 + rng.integers(-20, 20, len(x));
+    slope, intercept = numpy.polyfit(x, y.astype(float), 1);
+    residual = y - (slope * x + intercept);
+    stderr = (numpy.sum(residual * residual) / (len(x) - 2) / numpy.sum((x - x.mean()) ** 2)) ** 0.5;
+
+    for functions in ( HOTPATH_BYTECODE, HOTPATH_SELECTED ):
+        ireg_add = functions[2];
+        reg = ireg_new();
+        for index in range(len(x)):
+            ireg_add(reg, int(x[index]), int(y[index]));
+        assert abs(functions[3](reg) - slope) < 1e-9;
+        assert abs(ireg_slope(reg) - slope) < 1e-9;
+        assert abs(ireg_stderr(reg) - stderr) < 1e-9;
+
+def test_ireg_degenerate():
+    reg = ireg_new();
+    assert ireg_slope(reg) == 0.0;
+    assert ireg_stderr(reg) == 0.0;
+    ireg_add = HOTPATH_BYTECODE[2];
+    ireg_add(reg, 5, 1);
+    ireg_add(reg, 5, 2);
+    ireg_add(reg, 5, 3);
+    assert ireg_slope(reg) == 0.0;
+    assert ireg_stderr(reg) == 0.0;
@@ -0,0 +1,78 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Histogram Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Power of two buckets, percentiles to within the bucket they land in
+#
+from gpsdro.histogram import Histogram, TimingStats, HIST_BUCKETS
+from gpsdro.transport import LatencyStats
+
+
+def test_buckets():
+    histogram = Histogram();
+    for micros in ( 0, 1, 2, 3, 4, 7, 8, 1000, -5 ):
+        histogram.record(micros);
+    # 0 and the negative one, then 1, 2-3, 4-7, 8-15, 512-1023
+    assert list(histogram.counts[:11]) == [ 2, 1, 2, 2, 1, 0, 0, 0, 0, 0, 1 ];
+    assert histogram.count == 9;
+    assert histogram.minimum == 0;
+    assert histogram.maximum == 1000;
+
+    # Anything past the last bucket goes in it
+    histogram.record(1 << 40);
+    assert histogram.counts[HIST_BUCKETS - 1] == 1;
+
+def test_percentiles():
+    histogram = Histogram();
+    assert histogram.percentile(0.5) == 0;
+    for micros in range(1, 1001):
+        histogram.record(micros);
+    assert histogram.percentile(0.5) == 511;
+    assert histogram.percentile(0.9) == 1000;
+    assert histogram.percentile(0.01) == 15;
+    assert histogram.percentile(1.0) == 1000;
+
+    histogram.clear();
+    assert histogram.count == 0;
+    assert sum(histogram.counts) == 0;
+    histogram.record(300);
+    assert histogram.percentile(0.5) == 300;
+    assert histogram.minimum == 300;
+
+def test_timing_stats():
+    timing = TimingStats(( "late", "status" ));
+    timing.record("late", 1250);
+    timing.record("late", 2500);
+    assert timing.get("late").count == 2;
+    assert timing.get("other") is None;
+    report = timing.report().splitlines();
+    assert len(report) == 2;
+    assert report[1].split()[:3] == [ "late", "2", "1.250" ];
+    timing.clear();
+    assert len(timing.report().splitlines()) == 1;
+
+def test_latency_histograms():
+    stats = LatencyStats();
+    for micros in ( 900, 1100, 5000 ):
+        stats.record("j", micros);
+    assert stats.last("j") == 5000;
+    assert stats.histograms.get("j").count == 3;
+    assert stats.histograms.get("j").maximum == 5000;
@@ -0,0 +1,150 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Holdover Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The drift model on synthetic samples, then a PPS outage of the script on
+# the emulated oscillator
+#
+import os
+import random
+import sys
+
+import pytest
+
+import gpsdro.transport
+from gpsdro import replay
+from gpsdro.clock import VirtualClock
+from gpsdro.emulator import EMU_CRYSTAL, EmulatedPort, SymOscillator
+from gpsdro.fixed import dds_float
+from gpsdro.holdover import DriftModel, DDS_INCR_VALUE, FIT_AGING, HOLDOVER_INTERVAL
+
+SCRIPT		= os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpsdro", "discipline.py")
+
+
+#
+# "count" samples HOLDOVER_INTERVAL apart of a DDS value drifting by
+# "aging" per second, with white noise
+#
+def drift_model( count, aging, noise, seed=1 ):
+    rand = random.Random(seed);
+    model = DriftModel(EMU_CRYSTAL);
+    for index in range(count):
+        when = index * HOLDOVER_INTERVAL;
+        model.add(when, -74.0 + (aging * when) + rand.gauss(0.0, noise));
+    return model;
+
+
+def test_fit_aging():
+    # 0.5 DDS units a day
+    aging = 0.5 / 86400;
+    model = drift_model(200, aging, 0.05);
+    assert model.fit(200 * HOLDOVER_INTERVAL);
+    assert model.fitted[FIT_AGING] == pytest.approx(aging, rel=0.05);
+    assert model.predict(200 * HOLDOVER_INTERVAL) == pytest.approx(-74.0 + (aging * 200 * HOLDOVER_INTERVAL), abs=0.05);
+
+def test_aging_not_significant():
+    model = drift_model(200, 0.0, 0.05);
+    assert model.fit(200 * HOLDOVER_INTERVAL);
+    assert model.fitted[FIT_AGING] == 0.0;
+    assert model.predict(200 * HOLDOVER_INTERVAL) == pytest.approx(-74.0, abs=0.02);
+
+def test_not_enough_samples():
+    model = DriftModel(EMU_CRYSTAL);
+    assert not model.begin(1000);
+    assert model.time_error_bound(3600) == 0.0;
+
+#
+# Whole DDS steps only, averaging out to the prediction
+#
+def test_dither():
+    model = drift_model(200, 0.5 / 86400, 0.05);
+    start = 200 * HOLDOVER_INTERVAL;
+    assert model.begin(start);
+    values = [ model.holdover_dds(start + (second * 10)) for second in range(1000) ];
+    for value in values:
+        assert abs((value / DDS_INCR_VALUE) - round(value / DDS_INCR_VALUE)) < 1e-9;
+    wanted = [ model.predict(start + (second * 10)) for second in range(1000) ];
+    assert len(set(values)) > 1;
+    assert sum(values) / len(values) == pytest.approx(sum(wanted) / len(wanted), abs=1e-3);
+
+#
+# The DDS error grows the time error linearly, the aging error and the
+# wander faster than that
+#
+def test_bound_growth():
+    model = drift_model(200, 0.5 / 86400, 0.05);
+    assert model.begin(200 * HOLDOVER_INTERVAL);
+    bounds = [ model.time_error_bound(elapsed) for elapsed in ( 0, 600, 3600, 14400, 86400 ) ];
+    assert bounds[0] == 0.0;
+    for index in range(2, len(bounds)):
+        assert bounds[index] > bounds[index - 1];
+    assert bounds[4] / bounds[3] >= 86400 / 14400;
+
+
+#
+# Drops the PPS for "length" seconds once the clock gets to "start", and
+# stops the script at "end"
+#
+class DropoutPort( EmulatedPort ):
+
+    def __init__( self, oscillator, clock, start, end ):
+        EmulatedPort.__init__(self, oscillator, clock);
+        self.start = start;
+        self.end = end;
+
+    def write( self, data ):
+        if ( self.clock.monotonic() > self.end ):
+            raise replay.ReplayFinished();
+        if ( self.start and (self.clock.monotonic() > self.start) ):
+            self.osc.dropoutRate = 1.0;
+        written = EmulatedPort.write(self, data);
+        if ( self.osc.dropout ):
+            self.osc.dropoutRate = 0.0;
+            self.start = 0;
+        return written;
+
+
+def test_script_outage( monkeypatch, capsys ):
+    # load_script() swaps these for the run, put them back afterwards
+    monkeypatch.setattr(gpsdro.transport, "ticks_us", gpsdro.transport.ticks_us);
+    monkeypatch.setitem(sys.modules, "serial", None);
+    for setting in ( "GPSDRO_PROFILE", "GPSDRO_CHECKPOINT", "GPSDRO_CAPTURE", "GPSDRO_SPEEDUP", "GPSDRO_METRICS" ):
+        monkeypatch.setenv(setting, "");
+
+    clock = VirtualClock(5000000000);
+    port = DropoutPort(SymOscillator(seed=2, freqOffset=3e-10, dropoutLength=600), clock, 8000, 10000);
+    script = replay.load_script(SCRIPT, port, clock);
+    adjusts = [];
+    holdoverAdjust = script.holdover_adjust;
+    def recorded( elapsed ):
+        adjusts.append(( elapsed, holdoverAdjust(elapsed), dds_float(script.ddsAdjValue) ));
+    script.holdover_adjust = recorded;
+
+    with pytest.raises(replay.ReplayFinished):
+        script.main();
+    output = capsys.readouterr().out;
+    assert "PPS Spike / Loss detected, going into Holdover" in output;
+    assert "Holdover model:" in output;
+    assert "PPS is back after" in output;
+    assert 550 < len(adjusts) < 650;
+    # Steered from the model every HOLDOVER_STEP, close to where the
+    # discipline had it
+    assert abs(sum(dds for elapsed, adjusted, dds in adjusts) / len(adjusts) + 30.0) < 0.5;
@@ -0,0 +1,147 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Metrics Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Prometheus and JSON bodies from the cached snapshot, and a polled server
+# that a slow client cannot hold up
+#
+import json
+import socket
+import threading
+import time
+
+from gpsdro.histogram import TimingStats
+from gpsdro.metrics import MetricsSnapshot, MetricsServer, METRICS_REQUEST_MS
+
+
+def snapshot_state():
+    timing = TimingStats(( "loop", "idle" ));
+    for micros in ( 100, 200, 300, 5000 ):
+        timing.record("loop", micros);
+    return { "MODEL": { "S/N": "12\"34", "MODELTEXT": "X72" },
+             "STATUS": { "1PPSDELTA": -12, "LOCKED": 1, "TEXT": "ok", "FLAG": True },
+             "SLOPES": { "INITIAL": ( 1.5e-11, 2e-12 ) },
+             "DDS": -340, "HOLDOVER": 0, "COUNTER": 42, "TIMING": timing };
+
+
+def test_prometheus():
+    snapshot = MetricsSnapshot();
+    snapshot.update(snapshot_state());
+    server = MetricsServer(snapshot);
+    response = server.response(b"GET /metrics HTTP/1.1\r");
+    header, body = response.split(b"\r\n\r\n", 1);
+    assert header.startswith(b"HTTP/1.0 200 OK");
+    assert (b"Content-Length: " + str(len(body)).encode()) in header;
+
+    lines = body.decode().split("\n");
+    serial = "serial=\"12\\\"34\"";
+    assert ("gpsdro_info{" + serial + ",model=\"X72\"} 1.0") in lines;
+    assert ("gpsdro_status{" + serial + ",field=\"1PPSDELTA\"} -12.0") in lines;
+    assert ("gpsdro_status{" + serial + ",field=\"LOCKED\"} 1.0") in lines;
+    # Strings and flags are not numbers
+    assert not [ line for line in lines if ("TEXT" in line) or ("FLAG" in line) ];
+    assert ("gpsdro_slope{" + serial + ",state=\"INITIAL\"} 1.5e-11") in lines;
+    assert ("gpsdro_dds{" + serial + "} -340.0") in lines;
+    assert ("gpsdro_pps_counter{" + serial + "} 42.0") in lines;
+    assert ("gpsdro_timing_count{" + serial + ",name=\"loop\"} 4.0") in lines;
+    assert ("gpsdro_timing_seconds{" + serial + ",name=\"loop\",quantile=\"1\"} 0.005") in lines;
+    # Names with nothing recorded are left out
+    assert not [ line for line in lines if "name=\"idle\"" in line ];
+
+
+def test_json():
+    snapshot = MetricsSnapshot();
+    snapshot.update(snapshot_state());
+    server = MetricsServer(snapshot);
+    for path in ( b"/status", b"/status.json?x=1" ):
+        header, body = server.response(b"GET " + path + b" HTTP/1.0").split(b"\r\n\r\n", 1);
+        assert b"application/json" in header;
+        status = json.loads(body);
+        assert status["STATUS"] == { "1PPSDELTA": -12, "LOCKED": 1, "TEXT": "ok" };
+        assert status["SLOPES"]["INITIAL"] == { "SLOPE": 1.5e-11, "STDERR": 2e-12 };
+        assert status["DDS"] == -340;
+        assert status["TIMING"]["loop"]["COUNT"] == 4;
+        assert status["TIMING"]["loop"]["MAX_US"] == 5000;
+        assert "idle" not in status["TIMING"];
+        assert "SERIAL" not in status;
+
+    # The bodies are only rendered on update
+    snapshot.metrics = b"cached";
+    assert server.response(b"GET /metrics HTTP/1.0").endswith(b"\r\n\r\ncached");
+    assert server.response(b"GET /other HTTP/1.0").startswith(b"HTTP/1.0 404");
+    assert server.response(b"").startswith(b"HTTP/1.0 404");
+
+
+def connect( server ):
+    client = socket.create_connection(server.listener.getsockname()[:2]);
+    client.settimeout(5);
+    return client;
+
+
+def test_poll():
+    snapshot = MetricsSnapshot();
+    snapshot.update(snapshot_state());
+    server = MetricsServer(snapshot);
+    server.listen(0, "127.0.0.1");
+    try:
+        assert server.poll(0) == 0;
+        client = connect(server);
+        client.sendall(b"GET /metrics HTTP/1.0\r\n\r\n");
+        assert server.poll(1000) == 1;
+        response = b"";
+        while True:
+            data = client.recv(4096);
+            if ( not data ):
+                break;
+            response += data;
+        client.close();
+        assert response.endswith(snapshot.metrics);
+    finally:
+        server.close();
+
+
+def test_trickle():
+    server = MetricsServer(MetricsSnapshot());
+    server.listen(0, "127.0.0.1");
+    client = connect(server);
+    stop = threading.Event();
+
+    # One byte at a time, each well inside the deadline, never a blank line
+    def trickle():
+        try:
+            while ( not stop.is_set() ):
+                client.send(b"G");
+                time.sleep(0.01);
+        except OSError:
+            pass;
+
+    thread = threading.Thread(target=trickle);
+    thread.start();
+    try:
+        start = time.monotonic();
+        assert server.poll(1000) == 1;
+        elapsed = time.monotonic() - start;
+        assert elapsed < (METRICS_REQUEST_MS / 1000) + 0.1;
+    finally:
+        stop.set();
+        thread.join();
+        client.close();
+        server.close();
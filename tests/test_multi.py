@@ -0,0 +1,80 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Multi Unit Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Two emulated oscillators with different offsets run by gpsdro.multi, each
+# unit has to come out with the DDS setting for its own
+#
+import sys
+import threading
+
+import gpsdro.transport
+from gpsdro import multi, replay
+from gpsdro.clock import VirtualClock
+from gpsdro.emulator import EmulatedPort, SymOscillator, SYM_SA22C, SYM_X72
+from gpsdro.fixed import dds_float
+
+
+#
+# Stops the unit once its clock gets to "end" seconds
+#
+class StoppingPort( EmulatedPort ):
+
+    def __init__( self, oscillator, clock, end ):
+        EmulatedPort.__init__(self, oscillator, clock);
+        self.end = end;
+
+    def write( self, data ):
+        if ( self.clock.monotonic() > self.end ):
+            raise replay.ReplayFinished();
+        return EmulatedPort.write(self, data);
+
+
+def test_units( monkeypatch ):
+    # Each unit on a virtual clock of its own, the units are on threads
+    # and their time must not run on together.  The transport's timeouts
+    # go by the clock of the unit whose thread it is.
+    clocks = {};
+    monkeypatch.setattr(gpsdro.transport, "ticks_us", lambda: clocks[threading.current_thread().name].ticks_us());
+
+    names = [];
+    scripts = [];
+    for name, model, freqOffset in ( ("sa22c", SYM_SA22C, 7.4e-10), ("x72", SYM_X72, -3e-10) ):
+        clock = VirtualClock(5000000000);
+        clocks[name] = clock;
+        port = StoppingPort(SymOscillator(model, seed=2, freqOffset=freqOffset, serialCode=name.upper()), clock, 5000);
+        monkeypatch.setitem(sys.modules, "serial", replay.ReplaySerialModule(port));
+        script = multi.load_unit("/dev/" + name, quiet=True);
+        script.time = clock;
+        script.ticks_us = clock.ticks_us;
+        names.append(name);
+        scripts.append(script);
+
+    results = multi.asyncio.run(multi.run_units(names, scripts, 3600));
+    assert [ type(error) for error in results ] == [ replay.ReplayFinished, replay.ReplayFinished ];
+
+    assert scripts[0].SERIAL_PORT == "/dev/sa22c";
+    assert scripts[0].symModelArray["S/N"] == "SA22C-H";
+    assert scripts[1].symModelArray["S/N"] == "X72-H";
+    assert abs(dds_float(scripts[0].ddsAdjValue) + 74.0) < 0.21;
+    assert abs(dds_float(scripts[1].ddsAdjValue) - 30.0) < 0.21;
+    for script in scripts:
+        assert script.symTiming.get("late").count > 3000;
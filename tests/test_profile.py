@@ -0,0 +1,65 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Profile Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Profiles saved per port and read back, and the temp file left by a reset
+# in the middle of a save on FAT
+#
+import os
+
+from gpsdro.profile import profile_load, profile_load_all, profile_save, read_atomic, write_atomic
+
+
+def test_profile_round_trip( tmp_path ):
+    path = str(tmp_path / "profile.json");
+    assert profile_load("/dev/ttyS4", path) is None;
+    profile_save("/dev/ttyS4", { "BAUD": 57600, "MODEL": { "CRYSTAL": 60000000 } }, path);
+    profile_save("/dev/ttyS5", { "BAUD": 9600, "MODEL": { "CRYSTAL": 58982400 } }, path);
+    assert profile_load("/dev/ttyS4", path)["BAUD"] == 57600;
+    assert profile_load("/dev/ttyS5", path)["MODEL"]["CRYSTAL"] == 58982400;
+    assert sorted(profile_load_all(path)) == [ "/dev/ttyS4", "/dev/ttyS5" ];
+    assert not os.path.exists(path + ".tmp");
+
+#
+# The old file was removed but the temp file not renamed yet
+#
+def test_profile_temp_file( tmp_path ):
+    path = str(tmp_path / "profile.json");
+    profile_save("/dev/ttyS5", { "BAUD": 9600, "MODEL": {} }, path);
+    os.rename(path, path + ".tmp");
+    assert profile_load("/dev/ttyS5", path)["BAUD"] == 9600;
+
+    profile_save("/dev/ttyS5", { "BAUD": 57600, "MODEL": {} }, path);
+    assert not os.path.exists(path + ".tmp");
+    assert profile_load("/dev/ttyS5", path)["BAUD"] == 57600;
+
+def test_unreadable( tmp_path ):
+    path = str(tmp_path / "profile.json");
+    assert read_atomic(path) is None;
+    with open(path, "w") as profileFile:
+        profileFile.write("{\"/dev/ttyS4\": ");
+    assert profile_load_all(path) == {};
+    profile_save("/dev/ttyS4", { "BAUD": 57600 }, path);
+    assert profile_load("/dev/ttyS4", path) is None;
+
+    write_atomic(path, "[1, 2]");
+    assert read_atomic(path) == [ 1, 2 ];
+    assert profile_load_all(path) == {};
@@ -0,0 +1,63 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Regression Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The streaming Welford slope and its standard error against a least
+# squares fit of the same points
+#
+import numpy
+
+from gpsdro.regression import reg_new, reg_add, reg_slope, reg_stderr, REG_SAMPLES
+
+
+#
+# The counter and the deltas are big and the slope is small, where the old
+# raw sums lost it
+#
+def test_against_polyfit():
+    rng = numpy.random.default_rng(5);
+    x = numpy.arange(100000, 110000);
+    y = 59999000 + x * 0.00037 + rng.normal(0.0, 12.0, len(x));
+    slope, intercept = numpy.polyfit(x, y, 1);
+    residual = y - (slope * x + intercept);
+    stderr = (numpy.sum(residual * residual) / (len(x) - 2) / numpy.sum((x - x.mean()) ** 2)) ** 0.5;
+
+    reg = reg_new();
+    for index in range(len(x)):
+        reg_add(reg, int(x[index]), float(y[index]));
+    assert reg[REG_SAMPLES] == len(x);
+    assert abs(reg_slope(reg) - slope) < 1e-9;
+    assert abs(reg_stderr(reg) - stderr) < 1e-9;
+
+def test_degenerate():
+    reg = reg_new();
+    assert reg_slope(reg) == 0.0;
+    assert reg_stderr(reg) == 0.0;
+    reg_add(reg, 3, 1.0);
+    reg_add(reg, 3, 2.0);
+    assert reg_slope(reg) == 0.0;
+
+    # Three points on a line, the slope with no error
+    reg = reg_new();
+    for x in range(3):
+        reg_add(reg, x, 2.0 * x + 1.0);
+    assert abs(reg_slope(reg) - 2.0) < 1e-12;
+    assert reg_stderr(reg) == 0.0;
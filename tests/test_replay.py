@@ -0,0 +1,113 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Replay Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The tape on its own, then a capture of the script running against the
+# emulated oscillator replayed to the same decisions
+#
+import os
+import sys
+
+import pytest
+
+import gpsdro.transport
+from gpsdro import replay
+from gpsdro.clock import VirtualClock
+from gpsdro.emulator import EmulatedPort, SymOscillator
+
+SCRIPT		= os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpsdro", "discipline.py")
+
+TAPE		= ( "1000000000\tj\t1PPS DELTA REG: 5\n"
+                "1000200000\tw\tDCURTEMP: 54.25|PWRHRS: 12\n"
+                "1000300000\tf-74.2\t\n"
+                "2000000000\tj\t1PPS DELTA REG: 6\n"
+                "2000100000\tp\tCONTROL REG: 0000\n"
+                "3000000000\tj\t1PPS DELTA REG: 7\n"
+                "3000200000\tw\tDCURTEMP: 54.5|PWRHRS: 12\n" )
+
+
+#
+# Stops the script once the clock gets to "end" seconds, it would
+# otherwise run forever
+#
+class StoppingPort( EmulatedPort ):
+
+    def __init__( self, oscillator, clock, end ):
+        EmulatedPort.__init__(self, oscillator, clock);
+        self.end = end;
+
+    def write( self, data ):
+        if ( self.clock.monotonic() > self.end ):
+            raise replay.ReplayFinished();
+        return EmulatedPort.write(self, data);
+
+
+def test_tape( tmp_path ):
+    path = str(tmp_path / "capture.txt");
+    with open(path, "w") as captureFile:
+        captureFile.write(TAPE);
+    tape = replay.ReplayTape(path, 500000000);
+    assert tape.start == 1000000000;
+
+    # The first "w" is handed out even before its time
+    assert tape.query_response("w", 0) == [ "DCURTEMP: 54.25", "PWRHRS: 12" ];
+    assert tape.clock_response(1000000000) == ( 1000000000, 0, [ "1PPS DELTA REG: 5" ] );
+
+    # A "j" too far behind the clock is skipped, and the latest "w" is
+    # the one up to the slack ahead
+    assert tape.clock_response(2600000000)[1] == 2;
+    assert tape.query_response("w", 2600000000) == [ "DCURTEMP: 54.5", "PWRHRS: 12" ];
+    with pytest.raises(replay.ReplayFinished):
+        tape.clock_response(3000000000);
+
+    decisions = str(tmp_path / "decisions.txt");
+    with open(decisions, "w") as outFile:
+        replay.capture_decisions(path, outFile);
+    with open(decisions) as inFile:
+        assert inFile.read() == "0\tf-74.2\n";
+
+def test_replay_decisions( tmp_path, monkeypatch ):
+    # load_script() swaps these for the run, put them back afterwards
+    monkeypatch.setattr(gpsdro.transport, "ticks_us", gpsdro.transport.ticks_us);
+    monkeypatch.setitem(sys.modules, "serial", None);
+    for name in ( "GPSDRO_PROFILE", "GPSDRO_CHECKPOINT", "GPSDRO_CAPTURE", "GPSDRO_SPEEDUP" ):
+        monkeypatch.setenv(name, "");
+
+    capture = str(tmp_path / "capture.txt");
+    clock = VirtualClock(5000000000);
+    # The capture's time stamps have to be on the virtual clock too
+    monkeypatch.setattr(replay, "time", clock);
+    script = replay.load_script(SCRIPT, StoppingPort(SymOscillator(seed=2, freqOffset=3e-10), clock, 5000), clock);
+    script.CAPTURE_FILE = capture;
+    with pytest.raises(replay.ReplayFinished):
+        script.main();
+    script.symCapture.close();
+    monkeypatch.setattr(replay, "time", __import__("time"));
+
+    original = str(tmp_path / "original.txt");
+    decisions = str(tmp_path / "decisions.txt");
+    assert replay.main([capture, "--original", original, "--decisions", decisions]) == 0;
+    with open(original) as originalFile:
+        expected = originalFile.read();
+    with open(decisions) as decisionFile:
+        assert decisionFile.read() == expected;
+    settings = [ line.split("\t")[1][1:] for line in expected.splitlines() if line.split("\t")[1][0] == "f" ];
+    assert abs(float(settings[-1]) + 30.0) < 0.21;
@@ -0,0 +1,75 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Ring Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The running window sums against sum() of the last N values
+#
+import random
+
+import pytest
+
+from gpsdro.ringsum import RingSum
+
+
+def test_window_sums():
+    rand = random.Random(1);
+    ring = RingSum(600, (60, 600));
+    values = [];
+    for index in range(2000):
+        value = rand.randrange(-5000, 5000);
+        ring.push(value);
+        values.append(value);
+        assert ring.window_sum(60) == sum(values[-60:]);
+        assert ring.window_sum(600) == sum(values[-600:]);
+        assert ring.recent() == value;
+    assert ring.recent(59) == values[-60];
+    assert ring.count == 600;
+
+    ring.clear();
+    assert ring.window_sum(60) == 0;
+    ring.push(7);
+    assert ring.window_sum(600) == 7;
+
+#
+# Whole PPS delta readings add up past 32 bits within a minute and the
+# entries themselves are close to it, the sums are exact however big
+#
+def test_no_overflow():
+    crystal = 60000000;
+    ring = RingSum(3600, (60, 3600));
+    values = [];
+    for index in range(7200):
+        values.append(crystal - 1 + (index % 3));
+        ring.push(values[-1]);
+    assert ring.window_sum(60) == 60 * crystal;
+    assert ring.window_sum(3600) == 216000000000;
+
+    # Entries at the limits of a 32 bit long
+    for value in ( 2147483647, -2147483648, 2147483647 ):
+        values.append(value);
+        ring.push(value);
+    assert ring.recent(1) == -2147483648;
+    assert ring.window_sum(60) == sum(values[-60:]);
+    assert ring.window_sum(3600) == sum(values[-3600:]);
+
+def test_window_larger_than_ring():
+    with pytest.raises(ValueError):
+        RingSum(60, (60, 600));
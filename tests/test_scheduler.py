@@ -0,0 +1,113 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Scheduler Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The deadline scheduler on a virtual clock, so the sleeps are exact and
+# take no time
+#
+from gpsdro.clock import VirtualClock
+from gpsdro.scheduler import TimerScheduler, SCHED_MAX_WAIT
+from gpsdro.transport import ticks_diff
+
+
+class SchedulerClock( VirtualClock ):
+
+    def ticks_diff( self, newTick, oldTick ):
+        return ticks_diff(newTick, oldTick);
+
+    def sleep_us( self, micros ):
+        self.now += int(micros) * 1000;
+
+
+def new_scheduler():
+    clock = SchedulerClock();
+    return clock, TimerScheduler(clock.ticks_us, clock.ticks_diff, clock.sleep_us);
+
+
+def test_order_and_grid():
+    clock, sched = new_scheduler();
+    sched.add("pps", 0, 1000000, 1000000);
+    sched.add("health", 2, 5000000);
+    fired = [];
+    while ( clock.ticks_us() < 12000000 ):
+        task = sched.next();
+        fired.append(( task, clock.ticks_us() ));
+        if ( task == "pps" ):
+            # Some work, the next tick still comes on the 1s grid
+            clock.sleep_us(150000);
+            sched.repeat("pps");
+        elif ( task == "health" ):
+            sched.at("health", 5000000);
+    assert [ when for task, when in fired if task == "pps" ] == [ second * 1000000 for second in range(1, 13) ];
+    assert [ when for task, when in fired if task == "health" ] == [ 5150000, 10150000 ];
+
+#
+# Due at the same time, the lowest priority number goes first and the
+# other one straight after
+#
+def test_priority():
+    clock, sched = new_scheduler();
+    sched.add("health", 2, 1000000);
+    sched.add("pps", 0, 1000000);
+    assert sched.next() == "pps";
+    assert sched.next() == "health";
+    assert sched.late == 0;
+    assert sched.next() is None;
+
+#
+# Ticks that were missed are skipped, not run back to back
+#
+def test_repeat_skips_missed():
+    clock, sched = new_scheduler();
+    sched.add("pps", 0, 1000000, 1000000);
+    assert sched.next() == "pps";
+    clock.sleep_us(3500000);
+    sched.repeat("pps");
+    assert sched.remaining("pps") == 500000;
+    assert sched.next() == "pps";
+    assert clock.ticks_us() == 5000000;
+
+def test_cancel_and_reschedule():
+    clock, sched = new_scheduler();
+    sched.add("pps", 0, 1000000, 1000000);
+    sched.add("health", 2, 2000000);
+    sched.cancel("pps");
+    assert sched.next() == "health";
+    assert clock.ticks_us() == 2000000;
+    sched.at("pps", 0);
+    assert sched.next() == "pps";
+    assert clock.ticks_us() == 2000000;
+
+#
+# A long wait is done in pieces no longer than SCHED_MAX_WAIT, and an idle
+# function that comes back early doesn't make the task fire early
+#
+def test_wait_pieces():
+    clock, sched = new_scheduler();
+    sleeps = [];
+    def idle( micros ):
+        sleeps.append(micros);
+        clock.sleep_us(min(micros, 300000));
+    sched.add("health", 2, 2500000);
+    assert sched.wait("health", idle) == 0;
+    assert clock.ticks_us() == 2500000;
+    assert max(sleeps) == SCHED_MAX_WAIT;
+    assert len(sleeps) == 9;
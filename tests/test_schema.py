@@ -0,0 +1,105 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Schema Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The "i", "w", "j" and "p" responses of each model, as the emulator prints
+# them, decoded back to the values it printed
+#
+import pytest
+
+from gpsdro.emulator import SymOscillator, command_response
+from gpsdro.schema import ResponseSchema, SCHEMA_HEALTH, SYM_SA22C, SYM_X72, SYM_X99, hex_float, parse_banner, \
+                          parse_control_reg, parse_delta_reg
+
+MODELS		= ( SYM_SA22C, SYM_X72, SYM_X99 )
+
+
+#
+# Response lines upper cased and stripped, the way the transport hands
+# them over
+#
+def response_lines( osc, cmd, arg="" ):
+    return [ line.strip().upper() for line in command_response(osc, cmd, arg).decode("ascii").splitlines() if line.strip() ];
+
+
+def test_hex_float():
+    assert hex_float("41580000.") == 13.5;
+    assert hex_float("C1580000") == -13.5;
+    assert hex_float("4158000.") is None;
+
+#
+# health() draws its noise from the oscillator's generator, so the values
+# printed come from a second one in the same state.  Always unlocked, so
+# the lock fields aren't just the defaults.
+#
+@pytest.mark.parametrize("model", MODELS)
+def test_health( model ):
+    osc = SymOscillator(model, seed=1, unlockRate=1.0);
+    for second in range(5000):
+        osc.second();
+    expected = dict((name, value) for name, kind, value in osc.health());
+    osc = SymOscillator(model, seed=1, unlockRate=1.0);
+    for second in range(5000):
+        osc.second();
+
+    health = {};
+    ResponseSchema(SCHEMA_HEALTH, model).parse(response_lines(osc, "w"), health);
+    assert sorted(health) == sorted(expected);
+    for name in expected:
+        if ( isinstance(expected[name], float) ):
+            assert health[name] == pytest.approx(expected[name], abs=1e-5, rel=1e-6);
+        else:
+            assert health[name] == expected[name];
+    assert health["DCIPLOCK"] == 0;
+    assert health["PWRTICKS"] == 5000 % 3600;
+
+@pytest.mark.parametrize("model", MODELS)
+def test_wanted_only( model ):
+    health = {};
+    ResponseSchema(SCHEMA_HEALTH, model, ( "DCURTEMP", "DCIPLOCK" )).parse(response_lines(SymOscillator(model, seed=1), "w"), health);
+    assert sorted(health) == [ "DCIPLOCK", "DCURTEMP" ];
+
+@pytest.mark.parametrize("model", MODELS)
+def test_banner( model ):
+    osc = SymOscillator(model, seed=1, serialCode="0A1B2C3D");
+    banner = parse_banner(response_lines(osc, "i"), {});
+    assert banner["MODELENUM"] == model;
+    assert banner["CRYSTAL"] == 60000000;
+    assert banner["S/N"] == "0A1B2C3D-H";
+    assert banner["1PPS"] == "ON";
+
+@pytest.mark.parametrize("model", MODELS)
+def test_registers( model ):
+    osc = SymOscillator(model, seed=1);
+    osc.second();
+    assert parse_delta_reg(response_lines(osc, "j"), model) == osc.register;
+    command_response(osc, "q", "1C");
+    assert parse_control_reg(response_lines(osc, "p")) == 0x1C;
+
+#
+# A garbled value keeps the last good one
+#
+def test_garbled_value():
+    health = {};
+    schema = ResponseSchema(SCHEMA_HEALTH, SYM_X99);
+    schema.parse([ "DCURTEMP: 54.25000", "PWRHRS: 1234" ], health);
+    schema.parse([ "DCURTEMP: 54.2#000", "PWRHRS: 12X4" ], health);
+    assert health == { "DCURTEMP": 54.25, "PWRHRS": 1234 };
@@ -0,0 +1,106 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Slope Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The adaptive initial slope calculation of the script, run against the
+# emulated oscillator on a clock that only moves when the script waits
+#
+import importlib.util
+import os
+import sys
+
+import pytest
+
+import gpsdro.transport
+from gpsdro.emulator import EmulatedPort, SymOscillator
+
+SCRIPT		= os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gpsdro", "discipline.py")
+
+
+#
+# Stands in for the time module the script uses
+#
+class ScriptClock:
+
+    def __init__( self ):
+        self.ns = 0;
+
+    def monotonic_ns( self ):
+        return self.ns;
+
+    def monotonic( self ):
+        return self.ns / 1000000000;
+
+    def ticks_us( self ):
+        return self.ns // 1000;
+
+    def sleep( self, seconds ):
+        self.ns += int(seconds * 1000000000);
+
+
+class SerialModule:
+
+    PARITY_NONE = "N"
+
+    def __init__( self, port ):
+        self.port = port;
+
+    def Serial( self, *args, **kwargs ):
+        return self.port;
+
+
+#
+# Entries calculate_slope() took before it settled on a DDS value, the
+# sample task mustn't be left on the schedule
+#
+def slope_entries( monkeypatch, oscillator ):
+    clock = ScriptClock();
+    monkeypatch.setattr(gpsdro.transport, "ticks_us", clock.ticks_us);
+    monkeypatch.setitem(sys.modules, "serial", SerialModule(EmulatedPort(oscillator, clock)));
+    for name in ( "GPSDRO_PROFILE", "GPSDRO_CHECKPOINT" ):
+        monkeypatch.setenv(name, "");
+
+    spec = importlib.util.spec_from_file_location("gpsdro_slope", SCRIPT);
+    script = importlib.util.module_from_spec(spec);
+    spec.loader.exec_module(script);
+    script.time = clock;
+
+    script.symScheduler = script.TimerScheduler(script.ticks_us, script.ticks_diff, script.sleep_us);
+    script.platform_setup();
+    script.get_symmetricom_model();
+    script.get_status_message();
+    script.redefine_constants();
+    script.set_control_reg_message(0);
+    script.symStatusArray["1PPSDELTA"] = 0;
+    script.symStatusArray["PPSOFFSET"] = 0;
+    script.calculate_slope(script.STATE_INITIAL, 0.0, script.DISCIPLINE_ENTRIES);
+    scheduler = script.symScheduler;
+    assert not [ entry for entry in scheduler.heap if (entry[3] == script.TASK_SAMPLE) and scheduler.pending(entry) ];
+    return script.symSumsArray[script.STATE_INITIAL][script.STATE_POS_COUNTER];
+
+
+def test_quiet_pps_settles_early( monkeypatch ):
+    entries = slope_entries(monkeypatch, SymOscillator(seed=1, sawtooth=2e-9, jitter=0.5e-9));
+    assert entries < 1200;
+
+def test_noisy_pps_runs_longer( monkeypatch ):
+    entries = slope_entries(monkeypatch, SymOscillator(seed=1, sawtooth=40e-9, jitter=20e-9));
+    assert 2200 < entries <= 4 * 2200;
@@ -0,0 +1,107 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Stability Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The tracker against the batch functions, and a tic counter re-zero in the
+# middle of a run
+#
+import numpy
+import pytest
+
+from gpsdro import stability
+from gpsdro.stability import StabilityTracker
+
+CRYSTAL		= 60000000
+TAUS		= ( 1, 10, 100 )
+
+
+#
+# White phase noise of a few counts on a slow frequency offset
+#
+def random_phase( count, seed=1 ):
+    rng = numpy.random.default_rng(seed);
+    drift = numpy.arange(count) * 3 // 7;
+    return drift + rng.integers(-2, 3, count);
+
+def test_tracker_matches_batch():
+    phase = random_phase(3000);
+    tracker = StabilityTracker(CRYSTAL, TAUS);
+    for value in phase:
+        tracker.push(int(value));
+
+    adev = stability.adev(phase, CRYSTAL, TAUS);
+    mdev = stability.mdev(phase, CRYSTAL, TAUS);
+    mtie = stability.mtie(phase, CRYSTAL, TAUS);
+    for index in range(len(TAUS)):
+        assert tracker.adev(TAUS[index]) == pytest.approx(adev[index], rel=1e-9);
+        assert tracker.mdev(TAUS[index]) == pytest.approx(mdev[index], rel=1e-9);
+        assert tracker.mtie(TAUS[index]) == pytest.approx(mtie[index], rel=1e-12);
+    assert tracker.tie() == pytest.approx(stability.tie(phase, CRYSTAL)[-1]);
+
+def test_tracker_rollover():
+    phase = random_phase(500);
+    tracker = StabilityTracker(CRYSTAL, TAUS);
+    for value in phase:
+        tracker.push(int(value) % CRYSTAL);
+    assert tracker.adev(10) == pytest.approx(stability.adev(phase, CRYSTAL, (10,))[0], rel=1e-9);
+
+#
+# A day of +/-1 count jitter with the tic counter reset half way, the phase
+# jumps by millions of counts.  With restart() it's the two halves analysed
+# on their own, without it the jump swamps everything.
+#
+def test_tracker_restart_on_rezero():
+    rng = numpy.random.default_rng(2);
+    phase = rng.integers(-1, 2, 86400);
+    half = len(phase) // 2;
+
+    clean = StabilityTracker(CRYSTAL, TAUS);
+    rezeroed = StabilityTracker(CRYSTAL, TAUS);
+    for k in range(len(phase)):
+        value = int(phase[k]);
+        clean.push(value);
+        if ( k == half ):
+            rezeroed.restart();
+        if ( k >= half ):
+            value += 3000000;
+        rezeroed.push(value);
+
+    for tau in TAUS:
+        assert rezeroed.adev(tau) == pytest.approx(clean.adev(tau), rel=0.01);
+        assert rezeroed.mdev(tau) == pytest.approx(clean.mdev(tau), rel=0.01);
+        assert rezeroed.mtie(tau) <= clean.mtie(tau);
+    assert rezeroed.adev(1) < 5e-8;
+
+    first = stability.adev(phase[:half], CRYSTAL, TAUS);
+    second = stability.adev(phase[half:] + 3000000, CRYSTAL, TAUS);
+    for index in range(len(TAUS)):
+        assert rezeroed.adev(TAUS[index]) == pytest.approx(numpy.sqrt((first[index] ** 2 + second[index] ** 2) / 2), rel=0.01);
+
+def test_whole_counts_only():
+    tracker = StabilityTracker(CRYSTAL, TAUS);
+    tracker.push(5.0);
+    with pytest.raises(ValueError):
+        tracker.push(5.5);
+    with pytest.raises(ValueError):
+        stability.adev([0, 1.5, 2, 3], CRYSTAL, (1,));
+    with pytest.raises(ValueError):
+        stability.mdev([0, 1.5, 2, 3], CRYSTAL, (1,));
+    assert stability.adev([0.0, 1.0, 0.0, 1.0], CRYSTAL, (1,))[0] == stability.adev([0, 1, 0, 1], CRYSTAL, (1,))[0];
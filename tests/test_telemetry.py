@@ -0,0 +1,96 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Telemetry Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Records written in batches and read back through the map
+#
+import pytest
+
+from gpsdro.telemetry import TelemetryWriter, TelemetryReader, TLM_TICK_SIZE, TLM_FLAG_LOCK_BAD
+
+
+def write_records( base, count, batch=60 ):
+    writer = TelemetryWriter(base, batch);
+    for tick in range(count):
+        writer.tick(tick, 59999990 + tick, tick - 5, 3, -74.2, tick % 2, tick == 7);
+        if ( (tick % 10) == 0 ):
+            writer.health_record(tick, 54.25, 13.52, 14.89);
+    return writer;
+
+
+def test_round_trip( tmp_path ):
+    base = str(tmp_path / "telemetry");
+    write_records(base, 150).close();
+
+    reader = TelemetryReader(base + ".tick");
+    assert len(reader) == 150;
+    first = reader.record(0);
+    assert first[:4] == ( 0, 59999990, -5, 3 );
+    assert first[4] == pytest.approx(-74.2);
+    assert reader.record(7)[6] == TLM_FLAG_LOCK_BAD;
+    assert reader.record(-1)[0] == 149;
+    assert [ record[0] for record in reader.records() ] == list(range(150));
+    reader.close();
+
+    health = TelemetryReader(base + ".health");
+    assert [ record[0] for record in health.records() ] == list(range(0, 150, 10));
+    assert health.record(3)[1] == pytest.approx(54.25);
+    health.close();
+
+#
+# Only whole batches are on disk until the writer is flushed or closed
+#
+def test_batches( tmp_path ):
+    base = str(tmp_path / "telemetry");
+    writer = write_records(base, 130);
+    reader = TelemetryReader(base + ".tick");
+    assert len(reader) == 120;
+    reader.close();
+
+    writer.close();
+    reader = TelemetryReader(base + ".tick");
+    assert len(reader) == 130;
+    reader.close();
+
+#
+# A record cut short by a reset is left out
+#
+def test_part_record( tmp_path ):
+    base = str(tmp_path / "telemetry");
+    write_records(base, 5).close();
+    with open(base + ".tick", "ab") as tickFile:
+        tickFile.write(b"\x00" * (TLM_TICK_SIZE // 2));
+    reader = TelemetryReader(base + ".tick");
+    assert len(reader) == 5;
+    reader.close();
+
+def test_arrays_outlive_reader( tmp_path ):
+    numpy = pytest.importorskip("numpy");
+    base = str(tmp_path / "telemetry");
+    write_records(base, 100).close();
+
+    reader = TelemetryReader(base + ".tick");
+    delta = reader.column("delta");
+    records = reader.array();
+    reader.close();
+    assert numpy.array_equal(delta, numpy.arange(100) - 5);
+    assert records["tick"][-1] == 99;
+    assert len(reader) == 0;
@@ -0,0 +1,196 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Transport Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# Response framing: the end markers on their own, then learned from the
+# emulated oscillator, batched queries split back up, registers decoded
+# from the buffer, and firmware that can't take queued commands
+#
+from gpsdro.emulator import EmulatedPort, SymOscillator
+from gpsdro.schema import SYM_SA22C, SYM_X99
+from gpsdro.transport import SerialTransport, ResponseFramer, LineBuffer, FRAME_LINE, decode_int, find_bytes
+
+
+class StepClock:
+
+    def __init__( self ):
+        self.now = 0.0;
+
+    def monotonic( self ):
+        return self.now;
+
+    def sleep( self, seconds ):
+        self.now += seconds;
+
+
+#
+# Only takes the first command of a write, like firmware that drops what
+# is sent while it is answering
+#
+class SingleCommandPort( EmulatedPort ):
+
+    def write( self, data ):
+        for index in range(1, len(data)):
+            if ( 0x61 <= data[index] <= 0x7a ):
+                data = data[:index];
+                break;
+        return EmulatedPort.write(self, data);
+
+
+def new_transport( model=SYM_SA22C, portClass=EmulatedPort ):
+    clock = StepClock();
+    osc = SymOscillator(model, seed=1);
+    osc.second();
+    port = portClass(osc, clock);
+    return clock, osc, port, SerialTransport(port, timeout=0.05);
+
+#
+# A port that hands out fixed bytes a few at a time
+#
+class BytesPort:
+
+    def __init__( self, data ):
+        self.data = bytearray(data);
+
+    @property
+    def in_waiting( self ):
+        return min(len(self.data), 3);
+
+    def readinto( self, buffer ):
+        count = min(len(buffer), len(self.data), 3);
+        buffer[:count] = self.data[:count];
+        del self.data[:count];
+        return count;
+
+
+def test_framer():
+    framer = ResponseFramer();
+    assert framer.marker("j") == "DELTA REG:";
+    assert framer.marker("p") == "ONTROL REG:";
+    assert framer.is_last("DELTA REG:", "1PPS DELTA REG: 3A");
+    assert not framer.is_last("DELTA REG:", "CONTROL REG: 0000");
+
+    # Only the key of the last line is kept, the value changes
+    assert framer.marker("w") is None;
+    framer.learn("w", [ "IFPGACTL: 0000", "LMPSTRTS: 1A" ]);
+    assert framer.marker("w") == "LMPSTRTS:";
+    assert framer.is_last("LMPSTRTS:", "LMPSTRTS: 1B");
+    framer.forget("w");
+    assert framer.marker("w") is None;
+
+    # Set commands that said nothing learn that they never answer, the
+    # queries and the fixed markers always wait for an answer
+    framer.learn("f-74.2", []);
+    assert framer.marker("f") == "";
+    framer.learn("w", []);
+    assert framer.marker("w") is None;
+    framer.forget("j");
+    assert framer.marker("j") == "DELTA REG:";
+
+    prompted = ResponseFramer(prompt=">");
+    assert prompted.is_last(None, "OK >");
+
+#
+# Lines end at CR or LF, are upper cased and cut at FRAME_LINE, and a part
+# line is handed over once nothing more comes
+#
+def test_line_buffer():
+    buffer = LineBuffer(BytesPort(b"\r\n1pps Delta Reg: 3a\r\n\n" + (b"x" * 200) + b"\rpart"));
+    length = buffer.readline();
+    assert buffer.text(length) == "1PPS DELTA REG: 3A";
+    length = buffer.readline();
+    assert length == FRAME_LINE;
+    assert buffer.text(length) == "X" * FRAME_LINE;
+    length = buffer.readline();
+    assert buffer.text(length) == "PART";
+    assert buffer.readline() == 0;
+
+    # Without blocking a part line stays put until it is taken
+    buffer = LineBuffer(BytesPort(b"1PPS DEL"));
+    assert buffer.fill(False);
+    assert buffer.scan() == 0;
+    assert buffer.fill(False);
+    assert buffer.scan() == 0;
+    assert buffer.fill(False);
+    assert buffer.scan() == 0;
+    assert not buffer.fill(False);
+    assert buffer.text(buffer.take()) == "1PPS DEL";
+
+def test_decode_int():
+    line = b"1PPS DELTA REG: 3A9C ";
+    start = find_bytes(line, len(line), b"DELTA REG:");
+    assert start == 5;
+    assert decode_int(line, start + 10, len(line), 16) == 0x3A9C;
+    assert decode_int(b" -42", 0, 4, 10) == -42;
+    assert decode_int(b"4G", 0, 2, 16) is None;
+    assert decode_int(b"  ", 0, 2, 10) is None;
+    assert find_bytes(line, 10, b"DELTA REG:") == -1;
+
+#
+# The first "w" ends on the idle gap and learns its last line, after that
+# it ends as soon as that line is in
+#
+def test_learned_marker():
+    clock, osc, port, transport = new_transport();
+    first = transport.query("w");
+    learning = clock.monotonic();
+    assert len(first) == 13;
+    assert first[-1].startswith("LMPSTRTS: ");
+    assert transport.framer.marker("w") == "LMPSTRTS:";
+
+    second = transport.query("w");
+    assert [ line.split(": ")[0] for line in second ] == [ line.split(": ")[0] for line in first ];
+    assert clock.monotonic() == learning;
+
+    assert transport.query("j") == [ "1PPS DELTA REG: {:X}".format(osc.register) ];
+
+    # Commands that don't answer learn that too
+    assert transport.query("k") == [];
+    assert transport.framer.marker("k") == "";
+
+def test_query_registers():
+    for model, decimal in ( ( SYM_SA22C, "" ), ( SYM_X99, "j" ) ):
+        clock, osc, port, transport = new_transport(model);
+        transport.send("q1C");
+        transport.receive();
+        values = [None, None];
+        assert transport.query_registers("jp", values, decimal);
+        assert values == [ osc.register, 0x1C ];
+        assert not transport.query_registers("jw", values, decimal);
+
+def test_query_many():
+    clock, osc, port, transport = new_transport();
+    transport.query("w");
+    responses = transport.query_many([ "j", "w", "p" ]);
+    assert port.counts["j"] == 1;
+    assert responses[0] == [ "1PPS DELTA REG: {:X}".format(osc.register) ];
+    assert len(responses[1]) == 13;
+    assert responses[2] == [ "CONTROL REG: 0000" ];
+    assert transport.pipeline;
+
+def test_not_queued():
+    clock, osc, port, transport = new_transport(portClass=SingleCommandPort);
+    transport.query("w");
+    responses = transport.query_many([ "j", "w", "p" ]);
+    assert not transport.pipeline;
+    assert responses[0][0].startswith("1PPS DELTA REG: ");
+    assert len(responses[1]) == 13;
+    assert responses[2] == [ "CONTROL REG: 0000" ];
@@ -0,0 +1,65 @@
+##
+## GPSDRO - Symmetricom Rubidium Oscillator Window Tests
+## Copyright (C) 2025 RandomThings00
+##
+##    This program is free software: you can redistribute it and/or modify
+##    it under the terms of the GNU General Public License as published by
+##    the Free Software Foundation, either version 3 of the License, or
+##    (at your option) any later version.
+##
+##    This program is distributed in the hope that it will be useful,
+##    but WITHOUT ANY WARRANTY; without even the implied warranty of
+##    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##    GNU General Public License for more details.
+##
+##    You should have received a copy of the GNU General Public License
+##    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+##############################################################################
+##    Github: https://github.com/randomthings00/gpsdro-symmetricom
+##    EEVBlog Forum: https://www.eevblog.com/forum/metrology/symmetricom-x99-rubidium-oscillator/
+##
+#
+# The sliding window slopes against a least squares fit of the same samples
+#
+import numpy
+
+from gpsdro.window import WindowSlope
+
+WINDOWS		= ( 10, 100, 1000 )
+
+
+def fitted_slope( values ):
+    if ( len(values) < 2 ):
+        return 0.0;
+    return numpy.polyfit(numpy.arange(len(values)), numpy.array(values, dtype=float), 1)[0];
+
+
+#
+# Filling and then sliding, long enough for every window to wrap the ring
+# a few times
+#
+def test_against_polyfit():
+    rng = numpy.random.default_rng(2);
+    values = [ int(value) for value in (numpy.arange(3500) // 3) + rng.integers(-50, 50, 3500) ];
+    slopes = WindowSlope(WINDOWS);
+    for index in range(len(values)):
+        slopes.push(values[index]);
+        if ( (index < 20) or ((index % 97) == 0) ):
+            for window in WINDOWS:
+                expected = fitted_slope(values[max(index + 1 - window, 0):index + 1]);
+                assert abs(slopes.slope(window) - expected) < 1e-9;
+    assert slopes.full(1000);
+    assert slopes.fill(1000) == 1000;
+
+def test_clear():
+    slopes = WindowSlope(WINDOWS);
+    for index in range(50):
+        slopes.push(index * 4);
+    assert abs(slopes.slope(10) - 4.0) < 1e-12;
+    slopes.clear();
+    assert slopes.slope(10) == 0.0;
+    assert not slopes.full(10);
+    slopes.push(5);
+    slopes.push(3);
+    assert slopes.slope(10) == -2.0;